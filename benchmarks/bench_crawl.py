@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+"""
+End-to-end crawl benchmark for sitemap2posts against a local fixture site.
+
+Starts benchmarks/fixture_server.py in a child process (so its memory does
+not count), crawls it with sitemap2posts() and reports URLs/s, time per
+stage and the peak RSS of the crawling process. Stage timings come from
+wrapping the module's stage functions; sitemap fetches that hit
+sitemap_cache are counted in the stage that made them.
+
+Example:
+    python benchmarks/bench_crawl.py --urls 100000 --fetch-limit 2000 --latency 0.02
+"""
+
+import argparse
+import itertools
+import json
+import logging
+import multiprocessing
+import resource
+import sys
+import threading
+import time
+from functools import wraps
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import sitemap2posts  # noqa: E402
+from fixture_server import add_site_arguments, serve, site_options  # noqa: E402
+
+# Stage name -> sitemap2posts function timed for it, in pipeline order
+STAGES = {
+    "robots": "get_sitemaps_from_robots",
+    "sitemaps": "crawl_sitemaps",
+    "filter": "filter_post_urls",
+}
+
+
+class StageTimer:
+    """Wall time per stage, summed per-thread CPU time of extraction and HTTP status counts."""
+
+    def __init__(self):
+        self.wall = {}
+        self.extract_cpu = 0.0
+        self.extract_calls = 0
+        self.statuses = {}
+        self.lock = threading.Lock()
+
+    def add(self, stage, seconds):
+        with self.lock:
+            self.wall[stage] = self.wall.get(stage, 0.0) + seconds
+
+    def wrap(self, stage, func):
+        depth = threading.local()
+
+        @wraps(func)
+        def timed(*args, **kwargs):
+            # crawl_sitemaps() recurses into sitemap indexes; time the outer call
+            outer = not getattr(depth, "value", 0)
+            depth.value = getattr(depth, "value", 0) + 1
+            start = time.perf_counter()
+            try:
+                result = func(*args, **kwargs)
+                # Generators are timed until exhausted
+                if hasattr(result, "__next__"):
+                    result = list(result)
+                return result
+            finally:
+                depth.value -= 1
+                if outer:
+                    self.add(stage, time.perf_counter() - start)
+
+        return timed
+
+    def wrap_fetch(self, func):
+        @wraps(func)
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                yield from func(*args, **kwargs)
+            finally:
+                self.add("fetch", time.perf_counter() - start)
+
+        return timed
+
+    def wrap_extract(self, func):
+        @wraps(func)
+        def timed(*args, **kwargs):
+            start = time.thread_time()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                with self.lock:
+                    self.extract_cpu += time.thread_time() - start
+                    self.extract_calls += 1
+
+        return timed
+
+    def wrap_fetch_url(self, func):
+        @wraps(func)
+        def counted(*args, **kwargs):
+            response = func(*args, **kwargs)
+            with self.lock:
+                status = response.status_code
+                self.statuses[status] = self.statuses.get(status, 0) + 1
+            return response
+
+        return counted
+
+    def install(self):
+        for stage, name in STAGES.items():
+            setattr(sitemap2posts, name, self.wrap(stage, getattr(sitemap2posts, name)))
+        sitemap2posts.iter_post_titles = self.wrap_fetch(sitemap2posts.iter_post_titles)
+        sitemap2posts.extract_post_data = self.wrap_extract(sitemap2posts.extract_post_data)
+        sitemap2posts.fetch_url = self.wrap_fetch_url(sitemap2posts.fetch_url)
+
+
+class LevelCounter(logging.Handler):
+    """Count log records at WARNING and above, e.g. failed fetches."""
+
+    def __init__(self):
+        super().__init__(logging.WARNING)
+        self.counts = {}
+
+    def emit(self, record):
+        self.counts[record.levelname] = self.counts.get(record.levelname, 0) + 1
+
+
+def start_site(args):
+    """Start the fixture server in a child process and return (process, base URL)."""
+    ctx = multiprocessing.get_context("spawn")
+    ready = ctx.Queue()
+    process = ctx.Process(
+        target=serve, args=(site_options(args), "127.0.0.1", 0, ready), daemon=True
+    )
+    process.start()
+    return process, ready.get(timeout=30)
+
+
+def peak_rss_mib():
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+
+def run_benchmark(args):
+    process, base_url = start_site(args)
+    timer = StageTimer()
+    timer.install()
+    root = logging.getLogger()
+    if not args.verbose:
+        for handler in root.handlers:
+            handler.setLevel(logging.CRITICAL)
+    counter = LevelCounter()
+    root.addHandler(counter)
+
+    collected = {}
+    original_filter = sitemap2posts.filter_post_urls
+
+    def filter_and_count(*a, **kw):
+        urls = original_filter(*a, **kw)
+        collected["urls"] = len(urls)
+        return urls
+
+    sitemap2posts.filter_post_urls = filter_and_count
+
+    crawl_kwargs = dict(
+        use_robots_txt=args.robots != "missing",
+        sitemap_urls=None if args.robots != "missing" else [f"{base_url}/sitemap_index.xml"],
+        path_allow_list=[f"{base_url}/blog/*"],
+        remove_404_records=True,
+        max_in_flight=args.max_in_flight,
+    )
+    start = time.perf_counter()
+    try:
+        if args.fetch_limit:
+            posts = sum(
+                1
+                for _ in itertools.islice(
+                    sitemap2posts.iter_posts(f"{base_url}/blog/", **crawl_kwargs),
+                    args.fetch_limit,
+                )
+            )
+        else:
+            posts = sitemap2posts.sitemap2posts(
+                f"{base_url}/blog/", sink=lambda post: None, **crawl_kwargs
+            )
+    finally:
+        total = time.perf_counter() - start
+        process.terminate()
+
+    stages = {stage: timer.wall.get(stage, 0.0) for stage in [*STAGES, "fetch"]}
+    sitemap_time = sum(stages[stage] for stage in STAGES)
+    return {
+        "config": {
+            key: value
+            for key, value in vars(args).items()
+            if key not in ("json", "verbose")
+        },
+        "sitemap_urls": collected.get("urls", 0),
+        "posts": posts,
+        "total_seconds": round(total, 3),
+        "stage_seconds": {stage: round(seconds, 3) for stage, seconds in stages.items()},
+        "sitemap_urls_per_second": round(collected.get("urls", 0) / sitemap_time, 1)
+        if sitemap_time
+        else None,
+        "posts_per_second": round(posts / stages["fetch"], 1) if stages["fetch"] else None,
+        "extract_cpu_seconds": round(timer.extract_cpu, 3),
+        "extract_ms_per_post": round(1000 * timer.extract_cpu / timer.extract_calls, 2)
+        if timer.extract_calls
+        else None,
+        "http_statuses": dict(sorted(timer.statuses.items())),
+        "log_counts": counter.counts,
+        "peak_rss_mib": round(peak_rss_mib(), 1),
+    }
+
+
+def print_report(result):
+    print(f"Sitemap URLs      {result['sitemap_urls']:>12}")
+    print(f"Posts fetched     {result['posts']:>12}")
+    print(f"Total             {result['total_seconds']:>11.3f}s")
+    for stage, seconds in result["stage_seconds"].items():
+        print(f"  {stage:<16}{seconds:>11.3f}s")
+    print(f"Sitemap URLs/s    {result['sitemap_urls_per_second'] or 0:>12.1f}")
+    print(f"Posts/s           {result['posts_per_second'] or 0:>12.1f}")
+    print(f"Extract CPU       {result['extract_cpu_seconds']:>11.3f}s ({result['extract_ms_per_post'] or 0} ms/post)")
+    print(f"Peak RSS          {result['peak_rss_mib']:>9.1f} MiB")
+    print(f"HTTP statuses     {result['http_statuses']}")
+    if result["log_counts"]:
+        print(f"Log counts        {result['log_counts']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    add_site_arguments(parser)
+    parser.add_argument(
+        "--fetch-limit",
+        type=int,
+        default=1000,
+        help="Stop after this many posts; 0 fetches every URL (default: 1000)",
+    )
+    parser.add_argument(
+        "--max-in-flight",
+        type=int,
+        default=sitemap2posts.DEFAULT_MAX_IN_FLIGHT,
+        help=f"Article fetches queued or running at once (default: {sitemap2posts.DEFAULT_MAX_IN_FLIGHT})",
+    )
+    parser.add_argument("--json", metavar="FILE", help="Also write the results as JSON")
+    parser.add_argument("--verbose", action="store_true", help="Show crawler logs")
+    args = parser.parse_args()
+
+    result = run_benchmark(args)
+    print_report(result)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(result, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Import-time benchmark for the scripts, each imported in a fresh interpreter.
+
+Reports the best and median import time of --repeat runs per target and the
+slowest packages it pulls in (from python -X importtime). The run fails
+(exit status 1) when importing sitemap2posts or obstracts_sync loads one of
+the extraction libraries, which are only imported once a page is extracted,
+or aiohttp, which only the async API imports, or when a target takes longer
+than --max-seconds.
+
+Example:
+    python benchmarks/bench_import.py --repeat 10 --top 5
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Target name -> (import statement, sys.path entries)
+TARGETS = {
+    "sitemap2posts": ("import sitemap2posts", [ROOT]),
+    "obstracts_sync": ("import obstracts_sync", [ROOT]),
+    "discover_feeds": ("import discover_feeds", [ROOT / "obstracts"]),
+    # What the lazy imports defer until the first extraction
+    "extraction libraries": (
+        "import newspaper, htmldate, dateutil.parser",
+        [],
+    ),
+}
+
+# Must not be imported by the targets below until a page is extracted or the
+# async API is used
+LAZY_MODULES = ("newspaper", "htmldate", "dateutil", "aiohttp")
+LAZY_TARGETS = ("sitemap2posts", "obstracts_sync")
+
+CHILD = """
+import json, sys, time
+sys.path[:0] = {paths!r}
+start = time.perf_counter()
+{statement}
+seconds = time.perf_counter() - start
+print(json.dumps({{"seconds": seconds, "modules": sorted(sys.modules)}}))
+"""
+
+
+def run_child(statement, paths, importtime=False):
+    """Run statement in a fresh interpreter; returns (child result, stderr)."""
+    code = CHILD.format(statement=statement, paths=[str(path) for path in paths])
+    command = [sys.executable, *(["-X", "importtime"] if importtime else []), "-c", code]
+    completed = subprocess.run(command, capture_output=True, text=True, cwd=ROOT)
+    if completed.returncode:
+        raise RuntimeError(f"{statement!r} failed:\n{completed.stderr}")
+    return json.loads(completed.stdout.splitlines()[-1]), completed.stderr
+
+
+def slowest_packages(importtime_log, top):
+    """Packages imported by the target, by cumulative import time (-X importtime output).
+
+    A package nested in another one counts in both.
+    """
+    packages = {}
+    for line in importtime_log.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if not cumulative.strip().isdigit():
+            continue
+        # Each nesting level adds two spaces; the target itself is at one
+        depth = len(name) - len(name.lstrip())
+        package = name.strip()
+        if depth >= 3 and "." not in package:
+            packages[package] = max(packages.get(package, 0), int(cumulative) / 1e6)
+    return sorted(packages.items(), key=lambda item: -item[1])[:top]
+
+
+def run_benchmarks(targets, repeat, top):
+    results = {}
+    for name in targets:
+        statement, paths = TARGETS[name]
+        runs = [run_child(statement, paths)[0] for _ in range(repeat)]
+        seconds = [run["seconds"] for run in runs]
+        _, log = run_child(statement, paths, importtime=True)
+        results[name] = {
+            "best_seconds": round(min(seconds), 4),
+            "median_seconds": round(statistics.median(seconds), 4),
+            "modules": len(runs[0]["modules"]),
+            "lazy_modules_loaded": sorted(
+                {
+                    module.split(".")[0]
+                    for module in runs[0]["modules"]
+                    if module.split(".")[0] in LAZY_MODULES
+                }
+            ),
+            "slowest_packages": [
+                {"package": package, "seconds": round(package_seconds, 4)}
+                for package, package_seconds in slowest_packages(log, top)
+            ],
+        }
+    return results
+
+
+def print_report(results):
+    print(f"{'target':<22}{'best':>9}{'median':>9}{'modules':>9}  slowest packages")
+    for name, result in results.items():
+        packages = ", ".join(
+            f"{entry['package']} {entry['seconds']:.3f}s" for entry in result["slowest_packages"]
+        )
+        print(
+            f"{name:<22}{result['best_seconds']:>8.3f}s{result['median_seconds']:>8.3f}s"
+            f"{result['modules']:>9}  {packages}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--targets",
+        default=",".join(TARGETS),
+        help="Comma-separated targets to import (default: all)",
+    )
+    parser.add_argument(
+        "--repeat", type=int, default=5, help="Fresh interpreters per target (default: 5)"
+    )
+    parser.add_argument(
+        "--top", type=int, default=5, help="Slowest packages listed per target (default: 5)"
+    )
+    parser.add_argument(
+        "--max-seconds",
+        type=float,
+        default=None,
+        help="Fail if the best import time of sitemap2posts or obstracts_sync exceeds this",
+    )
+    parser.add_argument("--json", metavar="FILE", help="Also write the results as JSON")
+    args = parser.parse_args()
+
+    targets = [name.strip() for name in args.targets.split(",") if name.strip()]
+    for name in targets:
+        if name not in TARGETS:
+            parser.error(f"unknown target {name!r}")
+
+    results = run_benchmarks(targets, args.repeat, args.top)
+    print_report(results)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"python": sys.version.split()[0], "results": results}, f, indent=2)
+
+    failures = []
+    for name in LAZY_TARGETS:
+        result = results.get(name)
+        if result is None:
+            continue
+        if result["lazy_modules_loaded"]:
+            failures.append(f"{name}: imports {', '.join(result['lazy_modules_loaded'])} eagerly")
+        if args.max_seconds is not None and result["best_seconds"] > args.max_seconds:
+            failures.append(
+                f"{name}: {result['best_seconds']:.3f}s to import, limit {args.max_seconds:.3f}s"
+            )
+    for failure in failures:
+        print(f"REGRESSION {failure}", file=sys.stderr)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,337 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmarks for the pure pipeline functions, with regression gates.
+
+Each case runs on generated inputs of every --scales size and records
+items/s (best of --repeat timed runs) and peak traced memory (one extra run
+under tracemalloc). The run fails (exit status 1) when:
+
+* a case is slower or uses more memory than --baseline by more than
+  --threshold, or
+* the time per item of a case grows more than --max-scaling times from one
+  scale to the next, which catches quadratic behaviour on any machine.
+
+Example:
+    python benchmarks/bench_micro.py --scales 1k,100k --save-baseline benchmarks/micro_baseline.json
+    python benchmarks/bench_micro.py --scales 1k,100k --baseline benchmarks/micro_baseline.json
+"""
+
+import argparse
+import gc
+import gzip
+import json
+import logging
+import random
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import obstracts_sync  # noqa: E402
+import sitemap2posts  # noqa: E402
+
+SCALES = {"1k": 1_000, "10k": 10_000, "100k": 100_000, "1m": 1_000_000}
+DEFAULT_BASELINE = Path(__file__).resolve().parent / "micro_baseline.json"
+START = datetime(2020, 1, 1, tzinfo=timezone.utc)
+SPREAD_MINUTES = 5 * 365 * 24 * 60
+# Naive, as parsed from --lastmod_min; URL dates and lastmods are UTC
+LASTMOD_MIN = datetime.fromisoformat("2023-01-01")
+
+
+def post_date(i):
+    """Date of post i, spread over 2020-2024 the same way at every scale."""
+    return START + timedelta(minutes=i * 7919 % SPREAD_MINUTES)
+
+
+def post_url(i):
+    return f"https://blog.example.com/{post_date(i):%Y/%m/%d}/post-{i}/"
+
+
+def url_records(n, duplicates=0.1):
+    """UrlRecords with lastmods; a fraction are http/www/utm variants of earlier URLs."""
+    rng = random.Random(n)
+    records = []
+    for i in range(n):
+        if i and rng.random() < duplicates:
+            j = rng.randrange(i)
+            url = post_url(j).replace("https://", "http://www.") + "?utm_source=x"
+        else:
+            j = i
+            url = post_url(i)
+        lastmod = post_date(j) + timedelta(minutes=rng.randrange(60))
+        records.append(sitemap2posts.UrlRecord(url, lastmod, "https://blog.example.com/post-sitemap.xml"))
+    return records
+
+
+def url_dict(n):
+    return {record.url: record for record in url_records(n, duplicates=0)}
+
+
+def sitemap_xml(n):
+    entries = "".join(
+        f"<url><loc>{post_url(i)}</loc>"
+        f"<lastmod>{post_date(i):%Y-%m-%dT%H:%M:%S+00:00}</lastmod></url>"
+        for i in range(n)
+    )
+    xml = (
+        '<?xml version="1.0" encoding="UTF-8"?>'
+        '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">'
+        f"{entries}</urlset>"
+    )
+    return xml.encode()
+
+
+def sitemap_gzip(n):
+    return gzip.compress(sitemap_xml(n), compresslevel=6)
+
+
+def crawled_posts(n):
+    """Posts in the shape sitemap2posts returns, with obstracts_sync's _extracted_date."""
+    posts = []
+    for i in range(n):
+        date = post_date(i)
+        posts.append(
+            {
+                "url": post_url(i),
+                "title": f"Post {i}",
+                "lastmod": date,
+                "htmldate": date if i % 3 else None,
+                "publish_date": date if i % 2 else None,
+                "modified_header": None,
+                "authors": [f"Analyst {i % 7}"],
+                "tags": [f"tag-{k}" for k in range(i % 40)],
+                "_extracted_date": date,
+            }
+        )
+    return posts
+
+
+def rejected_batch(n):
+    """A bulk submit batch and a 400 body rejecting every other post as "already exists"."""
+    posts = [
+        {"link": post_url(i), "title": f"Post {i}", "pubdate": START.isoformat()}
+        for i in range(n)
+    ]
+    errors = {
+        str(i): [f"post with link {posts[i]['link']} already exists"]
+        for i in range(0, n, 2)
+    }
+    return posts, {"posts": errors}
+
+
+# Case name -> (input builder, function run on the input, copy made before each run)
+CASES = {
+    "parse_sitemap_response": (
+        sitemap_xml,
+        lambda xml: sitemap2posts.parse_sitemap_response(xml, "bench.xml"),
+        None,
+    ),
+    "parse_sitemap_gzip": (
+        sitemap_gzip,
+        lambda body: sitemap2posts.parse_sitemap_response(body, "bench.xml.gz"),
+        None,
+    ),
+    "dedupe_urls": (url_records, sitemap2posts.dedupe_urls, None),
+    "filter_urls_by_lastmod": (
+        url_dict,
+        lambda urls: sitemap2posts.filter_urls_by_lastmod(
+            urls, LASTMOD_MIN, sitemap2posts.URL_DATE_PATTERNS
+        ),
+        None,
+    ),
+    "filter_urls_by_paths": (
+        url_dict,
+        lambda urls: sitemap2posts.filter_urls_by_paths(
+            urls,
+            ignore_paths=["*/tag/*", "*/category/*", "*/page/*"],
+            allow_paths=["https://blog.example.com/20*"],
+        ),
+        None,
+    ),
+    "extract_date_from_post": (
+        crawled_posts,
+        lambda posts: [obstracts_sync.extract_date_from_post(post, "PHLM") for post in posts],
+        None,
+    ),
+    "prepare_post_data": (
+        crawled_posts,
+        lambda posts: [obstracts_sync.prepare_post_data(post, False) for post in posts],
+        None,
+    ),
+    "collect_failed_posts": (
+        rejected_batch,
+        lambda batch: obstracts_sync.collect_failed_posts(*batch),
+        lambda batch: ([dict(post) for post in batch[0]], batch[1]),
+    ),
+}
+
+# sitemap2posts reads sitemaps one file at a time and sitemaps hold at most
+# 50,000 URLs, so larger inputs measure nothing real
+MAX_SCALE = {"parse_sitemap_response": 100_000, "parse_sitemap_gzip": 100_000}
+
+
+def run_case(func, data, copy, repeat):
+    """Return (best seconds, peak traced bytes) of func(data)."""
+    best = None
+    for _ in range(repeat):
+        arg = copy(data) if copy else data
+        gc.collect()
+        start = time.perf_counter()
+        func(arg)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+
+    arg = copy(data) if copy else data
+    gc.collect()
+    tracemalloc.start()
+    try:
+        func(arg)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return best, peak
+
+
+def run_benchmarks(cases, scales, repeat):
+    results = {}
+    for name in cases:
+        build, func, copy = CASES[name]
+        results[name] = {}
+        for label in scales:
+            n = SCALES[label]
+            if n > MAX_SCALE.get(name, n):
+                continue
+            data = build(n)
+            seconds, peak = run_case(func, data, copy, repeat)
+            del data
+            results[name][label] = {
+                "n": n,
+                "seconds": round(seconds, 6),
+                "items_per_second": round(n / seconds, 1) if seconds else None,
+                "peak_mib": round(peak / 2**20, 3),
+            }
+    return results
+
+
+def check_scaling(results, max_scaling):
+    """Flag cases whose time per item grows more than max_scaling between scales."""
+    failures = []
+    for name, by_scale in results.items():
+        runs = sorted(by_scale.items(), key=lambda item: item[1]["n"])
+        for (small_label, small), (large_label, large) in zip(runs, runs[1:]):
+            growth = (large["seconds"] / large["n"]) / (small["seconds"] / small["n"])
+            if growth > max_scaling:
+                failures.append(
+                    f"{name}: time per item grows {growth:.1f}x from {small_label} to {large_label}"
+                )
+    return failures
+
+
+def compare_baseline(results, baseline, threshold):
+    """Flag cases slower or bigger than the baseline by more than threshold."""
+    failures = []
+    for name, by_scale in results.items():
+        for label, run in by_scale.items():
+            base = baseline.get(name, {}).get(label)
+            if not base:
+                continue
+            if run["items_per_second"] < base["items_per_second"] * (1 - threshold):
+                failures.append(
+                    f"{name} {label}: {run['items_per_second']:.0f} items/s, "
+                    f"baseline {base['items_per_second']:.0f}"
+                )
+            # Ignore tiny allocations, where a few objects swing the ratio
+            if run["peak_mib"] > max(base["peak_mib"] * (1 + threshold), base["peak_mib"] + 1):
+                failures.append(
+                    f"{name} {label}: peak {run['peak_mib']:.1f} MiB, "
+                    f"baseline {base['peak_mib']:.1f} MiB"
+                )
+    return failures
+
+
+def print_report(results, baseline):
+    print(f"{'case':<24}{'scale':>6}{'items/s':>14}{'baseline':>14}{'peak MiB':>10}")
+    for name, by_scale in results.items():
+        for label, run in by_scale.items():
+            base = baseline.get(name, {}).get(label, {}).get("items_per_second")
+            print(
+                f"{name:<24}{label:>6}{run['items_per_second']:>14.0f}"
+                f"{base or 0:>14.0f}{run['peak_mib']:>10.1f}"
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--scales",
+        default="1k,100k",
+        help=f"Comma-separated input sizes out of {', '.join(SCALES)} (default: 1k,100k)",
+    )
+    parser.add_argument(
+        "--cases",
+        default=",".join(CASES),
+        help="Comma-separated cases to run (default: all)",
+    )
+    parser.add_argument(
+        "--repeat", type=int, default=3, help="Timed runs per case, best counts (default: 3)"
+    )
+    parser.add_argument(
+        "--baseline",
+        default=str(DEFAULT_BASELINE),
+        help="Baseline JSON to compare against, if it exists (default: benchmarks/micro_baseline.json)",
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.25,
+        help="Allowed slowdown or memory growth against the baseline (default: 0.25)",
+    )
+    parser.add_argument(
+        "--max-scaling",
+        type=float,
+        default=4.0,
+        help="Allowed growth of the time per item from one scale to the next (default: 4.0)",
+    )
+    parser.add_argument(
+        "--save-baseline", metavar="FILE", help="Write the results as a new baseline"
+    )
+    parser.add_argument("--json", metavar="FILE", help="Also write the results as JSON")
+    args = parser.parse_args()
+
+    scales = [label.strip().lower() for label in args.scales.split(",") if label.strip()]
+    cases = [name.strip() for name in args.cases.split(",") if name.strip()]
+    for label in scales:
+        if label not in SCALES:
+            parser.error(f"unknown scale {label!r}")
+    for name in cases:
+        if name not in CASES:
+            parser.error(f"unknown case {name!r}")
+
+    baseline = {}
+    if Path(args.baseline).exists() and not args.save_baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)["results"]
+
+    logging.disable(logging.WARNING)
+    results = run_benchmarks(cases, scales, args.repeat)
+    logging.disable(logging.NOTSET)
+
+    print_report(results, baseline)
+    output = {"python": sys.version.split()[0], "results": results}
+    for path in (args.json, args.save_baseline):
+        if path:
+            with open(path, "w") as f:
+                json.dump(output, f, indent=2)
+
+    failures = check_scaling(results, args.max_scaling)
+    failures += compare_baseline(results, baseline, args.threshold)
+    for failure in failures:
+        print(f"REGRESSION {failure}", file=sys.stderr)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""
+Sync throughput benchmark for obstracts_sync against the mock Obstracts API.
+
+Two modes:
+
+* upload: create_posts_bulk() for --feeds feeds of --posts synthetic posts
+  each, --concurrency feeds at a time (threads, or one event loop with
+  --async). Measures batching, job polling and API concurrency alone.
+* feed: process_feed() for feeds crawled from the local fixture blog
+  (benchmarks/fixture_server.py), i.e. the whole sync path.
+
+Reports end-to-end time, posts/s and API requests per endpoint.
+
+Example:
+    python benchmarks/bench_sync.py upload --feeds 8 --posts 1000 --concurrency 4 \\
+        --job-latency 1 --poll-interval 0.5 --exists-rate 0.05
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import logging
+import multiprocessing
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import obstracts_sync  # noqa: E402
+from fixture_server import add_site_arguments, serve, site_options  # noqa: E402
+from mock_obstracts_api import add_api_arguments, api_from_args, start_mock_api  # noqa: E402
+
+
+def make_client_class(base, poll_interval):
+    """Subclass an API client so that job polling uses poll_interval."""
+    if poll_interval is None:
+        return base
+
+    class BenchClient(base):
+        def wait_for_job(self, job_id, poll_interval=poll_interval, timeout=1200):
+            return super().wait_for_job(job_id, poll_interval, timeout)
+
+    return BenchClient
+
+
+def synthetic_posts(feed_index, count):
+    """Posts in the shape prepare_post_data() produces."""
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    return [
+        {
+            "link": f"https://feed{feed_index}.example.com/blog/post-{i}/",
+            "title": f"Synthetic post {i} of feed {feed_index}",
+            "pubdate": (start + timedelta(hours=i)).isoformat(),
+            "author": f"Analyst {i % 7}",
+            "categories": ["malware", "research"],
+        }
+        for i in range(count)
+    ]
+
+
+def run_upload(args, base_url):
+    feeds = [(f"bench-feed-{n}", synthetic_posts(n, args.posts)) for n in range(args.feeds)]
+
+    if args.use_async:
+        client_class = make_client_class(
+            obstracts_sync.AsyncObstractsAPIClient, args.poll_interval
+        )
+
+        async def run_all():
+            semaphore = asyncio.Semaphore(args.concurrency)
+            async with client_class(
+                base_url, "bench", gzip_requests=args.gzip_requests
+            ) as client:
+
+                async def one(feed_id, posts):
+                    async with semaphore:
+                        return await client.create_posts_bulk(
+                            feed_id, "bench-profile", posts, args.posts_per_job
+                        )
+
+                return await asyncio.gather(*(one(*feed) for feed in feeds))
+
+        return asyncio.run(run_all())
+
+    client_class = make_client_class(obstracts_sync.ObstractsAPIClient, args.poll_interval)
+    client = client_class(
+        base_url,
+        "bench",
+        gzip_requests=args.gzip_requests,
+        pool_size=max(args.concurrency, obstracts_sync.DEFAULT_API_POOL_SIZE),
+    )
+    with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+        return list(
+            executor.map(
+                lambda feed: client.create_posts_bulk(
+                    feed[0], "bench-profile", feed[1], args.posts_per_job
+                ),
+                feeds,
+            )
+        )
+
+
+def run_feed(args, base_url):
+    ctx = multiprocessing.get_context("spawn")
+    ready = ctx.Queue()
+    site = ctx.Process(
+        target=serve, args=(site_options(args), "127.0.0.1", 0, ready), daemon=True
+    )
+    site.start()
+    site_url = ready.get(timeout=30)
+    try:
+        client_class = make_client_class(obstracts_sync.ObstractsAPIClient, args.poll_interval)
+        client = client_class(
+            base_url,
+            "bench",
+            gzip_requests=args.gzip_requests,
+            pool_size=max(args.concurrency, obstracts_sync.DEFAULT_API_POOL_SIZE),
+        )
+        configs = [
+            {
+                "feed_id": f"bench-feed-{n}",
+                "name": f"Bench feed {n}",
+                "profile_id": "bench-profile",
+                "blog_url": f"{site_url}/blog/",
+                "use_robots_txt": True,
+                "path_allow_list": [f"{site_url}/blog/*"],
+                "remove_404_records": True,
+            }
+            for n in range(args.feeds)
+        ]
+        with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+            return list(
+                executor.map(
+                    lambda config: obstracts_sync.process_feed(
+                        config, client, args.posts_per_job
+                    ),
+                    configs,
+                )
+            )
+    finally:
+        site.terminate()
+
+
+def run_benchmark(args):
+    api = api_from_args(args)
+    server, base_url = start_mock_api(api)
+    start = time.perf_counter()
+    try:
+        if args.mode == "upload":
+            results = run_upload(args, base_url)
+        else:
+            results = run_feed(args, base_url)
+    finally:
+        total = time.perf_counter() - start
+        server.shutdown()
+
+    stats = api.stats()
+    submitted = sum(result.get("submitted_posts", 0) for result in results)
+    return {
+        "config": {
+            key: value
+            for key, value in vars(args).items()
+            if key not in ("json", "verbose")
+        },
+        "total_seconds": round(total, 3),
+        "feeds_succeeded": sum(1 for result in results if result.get("success")),
+        "feeds": len(results),
+        "posts_submitted": submitted,
+        "posts_per_second": round(submitted / total, 1) if total else None,
+        "jobs": sum(len(result.get("jobs", [])) for result in results),
+        "api": stats,
+    }
+
+
+def print_report(result):
+    api = result["api"]
+    print(f"Total             {result['total_seconds']:>11.3f}s")
+    print(f"Feeds succeeded   {result['feeds_succeeded']:>8}/{result['feeds']}")
+    print(f"Posts submitted   {result['posts_submitted']:>12}")
+    print(f"Posts/s           {result['posts_per_second'] or 0:>12.1f}")
+    print(f"Jobs              {result['jobs']:>12}")
+    print(f"API requests      {api['total_requests']:>12}")
+    for endpoint, count in sorted(api["requests"].items()):
+        print(f"  {endpoint:<16}{count:>12}")
+    print(f"API statuses      {api['statuses']}")
+    print(f"Bytes sent        {api['bytes_received']:>12}")
+    print(f"Max concurrent    {api['max_concurrent_requests']:>12}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("mode", choices=["upload", "feed"], help="What to benchmark")
+    parser.add_argument("--feeds", type=int, default=4, help="Number of feeds (default: 4)")
+    parser.add_argument(
+        "--posts", type=int, default=500, help="upload: posts per feed (default: 500)"
+    )
+    parser.add_argument(
+        "--posts-per-job", type=int, default=64, help="Posts per job (default: 64)"
+    )
+    parser.add_argument(
+        "--concurrency", type=int, default=1, help="Feeds synced at the same time (default: 1)"
+    )
+    parser.add_argument(
+        "--async",
+        dest="use_async",
+        action="store_true",
+        help="upload: use AsyncObstractsAPIClient on one event loop",
+    )
+    parser.add_argument(
+        "--gzip-requests", action="store_true", help="Gzip-compress bulk request bodies"
+    )
+    parser.add_argument(
+        "--poll-interval",
+        type=float,
+        default=None,
+        help="Seconds between job status polls (default: the client's own)",
+    )
+    add_api_arguments(parser)
+    site = parser.add_argument_group("feed mode fixture site")
+    add_site_arguments(site)
+    parser.add_argument("--json", metavar="FILE", help="Also write the results as JSON")
+    parser.add_argument("--verbose", action="store_true", help="Show sync logs")
+    parser.set_defaults(urls=200)
+    args = parser.parse_args()
+
+    if not args.verbose:
+        for handler in logging.getLogger().handlers:
+            handler.setLevel(logging.CRITICAL)
+
+    # log_collapsed() prints GitHub Actions group markers to stdout
+    with contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(io.StringIO()):
+        result = run_benchmark(args)
+    print_report(result)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(result, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,409 @@
+#!/usr/bin/env python3
+"""
+Local HTTP server serving a synthetic blog, for offline crawl benchmarks.
+
+The site has a robots.txt, a (optionally nested) sitemap index, URL set
+sitemaps that can be gzipped, and article pages with realistic HTML. Latency,
+404s and 429s can be injected. Everything is generated on request from the
+URL and a seed, so a 500k URL site costs no memory up front.
+
+Run it standalone to point sitemap2posts.py at it:
+
+    python benchmarks/fixture_server.py --urls 100000 --port 8800
+    python sitemap2posts.py http://127.0.0.1:8800/blog/ --use-robots-txt
+"""
+
+import argparse
+import gzip
+import hashlib
+import math
+import random
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional, Tuple
+
+DEFAULT_URLS = 10000
+DEFAULT_URLS_PER_SITEMAP = 1000
+DEFAULT_INDEX_FANOUT = 50  # Default: sitemaps per index before nesting another level
+DEFAULT_PARAGRAPHS = 12
+SITE_START = datetime(2015, 1, 1, tzinfo=timezone.utc)
+
+WORDS = (
+    "threat actor campaign malware loader payload command control server "
+    "phishing credential ransomware encryption lateral movement persistence "
+    "registry scheduled task privilege escalation vulnerability exploit patch "
+    "indicator compromise detection telemetry endpoint network traffic domain "
+    "infrastructure analysis researchers observed attackers deployed backdoor "
+    "sample hash signature rule hunting query incident response investigation"
+).split()
+
+
+class FixtureSite:
+    """Synthetic blog layout and page generator.
+
+    Post i lives at /blog/YYYY/MM/DD/post-i/, dated one post every few hours
+    from SITE_START. Leaf sitemaps hold urls_per_sitemap posts; when there are
+    more leaves than index_fanout, the root index points at child indexes.
+
+    Args:
+        urls: Number of posts listed in the sitemaps
+        urls_per_sitemap: Posts per URL set sitemap
+        index_fanout: Maximum entries per sitemap index
+        robots: "index" lists the root sitemap index in robots.txt, "leaves"
+            lists every URL set, "missing" serves no robots.txt
+        gzip_mode: "off", "encoding" (Content-Encoding: gzip on sitemaps) or
+            "file" (leaf sitemaps are .xml.gz files)
+        latency: Mean seconds added to each article response (+-50% jitter)
+        rate_404: Fraction of posts that return 404
+        rate_429: Fraction of posts whose first request returns 429
+        paragraphs: Body paragraphs per article
+        seed: Seed for all generated content
+    """
+
+    def __init__(
+        self,
+        urls: int = DEFAULT_URLS,
+        urls_per_sitemap: int = DEFAULT_URLS_PER_SITEMAP,
+        index_fanout: int = DEFAULT_INDEX_FANOUT,
+        robots: str = "index",
+        gzip_mode: str = "off",
+        latency: float = 0.0,
+        rate_404: float = 0.0,
+        rate_429: float = 0.0,
+        paragraphs: int = DEFAULT_PARAGRAPHS,
+        seed: int = 0,
+    ):
+        self.urls = urls
+        self.urls_per_sitemap = urls_per_sitemap
+        self.index_fanout = index_fanout
+        self.robots = robots
+        self.gzip_mode = gzip_mode
+        self.latency = latency
+        self.rate_404 = rate_404
+        self.rate_429 = rate_429
+        self.paragraphs = paragraphs
+        self.seed = seed
+        self.leaves = max(1, math.ceil(urls / urls_per_sitemap))
+        self.nested = self.leaves > index_fanout
+        self.throttled = set()
+        self.lock = threading.Lock()
+
+    # Layout
+
+    def post_date(self, i: int) -> datetime:
+        return SITE_START + timedelta(hours=7 * i)
+
+    def post_path(self, i: int) -> str:
+        return f"/blog/{self.post_date(i):%Y/%m/%d}/post-{i}/"
+
+    def leaf_path(self, k: int) -> str:
+        suffix = ".xml.gz" if self.gzip_mode == "file" else ".xml"
+        return f"/post-sitemap{k + 1}{suffix}"
+
+    def index_path(self, j: Optional[int] = None) -> str:
+        return "/sitemap_index.xml" if j is None else f"/sitemap_index{j + 1}.xml"
+
+    def fraction(self, i: int, salt: str) -> float:
+        """Deterministic value in [0, 1) per post, used for injected failures."""
+        digest = hashlib.blake2b(f"{self.seed}:{salt}:{i}".encode(), digest_size=8)
+        return int.from_bytes(digest.digest(), "big") / 2**64
+
+    # Documents
+
+    def robots_txt(self, base_url: str) -> Optional[str]:
+        if self.robots == "missing":
+            return None
+        if self.robots == "leaves":
+            paths = [self.leaf_path(k) for k in range(self.leaves)]
+        else:
+            paths = [self.index_path()]
+        lines = ["User-agent: *", "Disallow: /wp-admin/"]
+        lines += [f"Sitemap: {base_url}{path}" for path in paths]
+        return "\n".join(lines) + "\n"
+
+    def sitemap_index(self, base_url: str, j: Optional[int] = None) -> str:
+        if j is None and self.nested:
+            children = math.ceil(self.leaves / self.index_fanout)
+            paths = [self.index_path(c) for c in range(children)]
+        elif j is None:
+            paths = [self.leaf_path(k) for k in range(self.leaves)]
+        else:
+            start = j * self.index_fanout
+            stop = min(start + self.index_fanout, self.leaves)
+            paths = [self.leaf_path(k) for k in range(start, stop)]
+        entries = "".join(
+            f"<sitemap><loc>{base_url}{path}</loc></sitemap>\n" for path in paths
+        )
+        return (
+            '<?xml version="1.0" encoding="UTF-8"?>\n'
+            '<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+            f"{entries}</sitemapindex>\n"
+        )
+
+    def url_set(self, base_url: str, k: int) -> str:
+        start = k * self.urls_per_sitemap
+        stop = min(start + self.urls_per_sitemap, self.urls)
+        entries = "".join(
+            f"<url><loc>{base_url}{self.post_path(i)}</loc>"
+            f"<lastmod>{self.post_date(i) + timedelta(days=2):%Y-%m-%dT%H:%M:%S+00:00}</lastmod></url>\n"
+            for i in range(start, stop)
+        )
+        return (
+            '<?xml version="1.0" encoding="UTF-8"?>\n'
+            '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+            f"{entries}</urlset>\n"
+        )
+
+    def article(self, i: int) -> str:
+        rng = random.Random(self.seed * 1_000_003 + i)
+
+        def sentence(n):
+            words = [rng.choice(WORDS) for _ in range(n)]
+            return " ".join(words).capitalize() + "."
+
+        title = sentence(rng.randint(5, 10))[:-1]
+        published = self.post_date(i).strftime("%Y-%m-%dT%H:%M:%S+00:00")
+        description = sentence(20)
+        keywords = ", ".join(rng.sample(WORDS, 5))
+        body = "\n".join(
+            f"<p>{' '.join(sentence(rng.randint(8, 20)) for _ in range(rng.randint(3, 7)))}</p>"
+            for _ in range(self.paragraphs)
+        )
+        nav = "".join(
+            f'<li><a href="{self.post_path(max(0, i - n))}">{sentence(4)}</a></li>'
+            for n in range(1, 11)
+        )
+        return f"""<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<title>{title} | Fixture Security Blog</title>
+<meta name="description" content="{description}">
+<meta name="keywords" content="{keywords}">
+<meta name="author" content="Analyst {i % 17}">
+<meta property="og:type" content="article">
+<meta property="og:title" content="{title}">
+<meta property="article:published_time" content="{published}">
+<link rel="canonical" href="{self.post_path(i)}">
+<link rel="stylesheet" href="/static/site.css">
+<script>window.dataLayer = window.dataLayer || [];</script>
+</head>
+<body>
+<header><nav><ul><li><a href="/">Home</a></li><li><a href="/blog/">Blog</a></li><li><a href="/research/">Research</a></li></ul></nav></header>
+<main>
+<article>
+<h1>{title}</h1>
+<div class="byline">By <span class="author">Analyst {i % 17}</span> on <time datetime="{published}">{self.post_date(i):%B %d, %Y}</time></div>
+{body}
+</article>
+<aside><h2>Related posts</h2><ul>{nav}</ul></aside>
+</main>
+<footer><p>&copy; Fixture Security. All rights reserved.</p></footer>
+</body>
+</html>
+"""
+
+    # Routing
+
+    def respond(
+        self, path: str, base_url: str, if_none_match: Optional[str] = None
+    ) -> Tuple[int, dict, bytes]:
+        """Return (status, headers, body) for a request path.
+
+        Sitemaps carry an ETag and answer a matching If-None-Match with 304.
+        """
+        if if_none_match and if_none_match == self.sitemap_etag(path):
+            return 304, {"ETag": if_none_match}, b""
+
+        if path == "/robots.txt":
+            text = self.robots_txt(base_url)
+            if text is None:
+                return 404, {}, b"Not Found"
+            return 200, {"Content-Type": "text/plain"}, text.encode()
+
+        if path == self.index_path():
+            return self.sitemap_response(path, self.sitemap_index(base_url))
+        for j in range(math.ceil(self.leaves / self.index_fanout) if self.nested else 0):
+            if path == self.index_path(j):
+                return self.sitemap_response(path, self.sitemap_index(base_url, j))
+        if path.startswith("/post-sitemap"):
+            number = path[len("/post-sitemap") :].split(".", 1)[0]
+            if number.isdigit() and 1 <= int(number) <= self.leaves:
+                if path == self.leaf_path(int(number) - 1):
+                    return self.sitemap_response(
+                        path,
+                        self.url_set(base_url, int(number) - 1),
+                        as_file=self.gzip_mode == "file",
+                    )
+
+        if path.startswith("/blog/") and "/post-" in path:
+            slug = path.rstrip("/").rsplit("/post-", 1)[1]
+            if slug.isdigit() and int(slug) < self.urls:
+                return self.article_response(int(slug))
+        return 404, {"Content-Type": "text/html"}, b"<h1>Not Found</h1>"
+
+    def sitemap_etag(self, path: str) -> str:
+        return f'"{self.seed}-{self.urls}-{self.urls_per_sitemap}-{path}"'
+
+    def sitemap_response(self, path: str, xml: str, as_file: bool = False):
+        body = xml.encode()
+        headers = {"Content-Type": "application/xml", "ETag": self.sitemap_etag(path)}
+        if as_file:
+            headers["Content-Type"] = "application/x-gzip"
+            body = gzip.compress(body)
+        elif self.gzip_mode == "encoding":
+            headers["Content-Encoding"] = "gzip"
+            body = gzip.compress(body)
+        return 200, headers, body
+
+    def article_response(self, i: int):
+        if self.latency:
+            time.sleep(self.latency * random.uniform(0.5, 1.5))
+        if self.fraction(i, "404") < self.rate_404:
+            return 404, {"Content-Type": "text/html"}, b"<h1>Not Found</h1>"
+        if self.fraction(i, "429") < self.rate_429:
+            with self.lock:
+                first = i not in self.throttled
+                self.throttled.add(i)
+            if first:
+                return 429, {"Retry-After": "1"}, b"Too Many Requests"
+        headers = {
+            "Content-Type": "text/html; charset=utf-8",
+            "Last-Modified": format_datetime(
+                self.post_date(i) + timedelta(days=2), usegmt=True
+            ),
+        }
+        return 200, headers, self.article(i).encode()
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    site: FixtureSite = None
+
+    def do_GET(self):
+        host = self.headers.get("Host") or "%s:%s" % self.server.server_address[:2]
+        path = self.path.split("?", 1)[0].split("#", 1)[0]
+        status, headers, body = self.site.respond(
+            path, f"http://{host}", self.headers.get("If-None-Match")
+        )
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def make_server(site: FixtureSite, host: str = "127.0.0.1", port: int = 0):
+    """Create a threaded HTTP server for site; port 0 picks a free port."""
+    handler = type("SiteHandler", (FixtureHandler,), {"site": site})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def serve(options: dict, host: str = "127.0.0.1", port: int = 0, ready=None):
+    """Serve FixtureSite(**options) forever; ready (a multiprocessing queue) receives the base URL.
+
+    Meant as a multiprocessing target, so benchmarks measure the crawler alone.
+    """
+    server = make_server(FixtureSite(**options), host, port)
+    base_url = "http://%s:%s" % server.server_address[:2]
+    if ready is not None:
+        ready.put(base_url)
+    server.serve_forever()
+
+
+def add_site_arguments(parser: argparse.ArgumentParser):
+    """Add the FixtureSite options to a parser (shared with the benchmarks)."""
+    parser.add_argument(
+        "--urls", type=int, default=DEFAULT_URLS, help=f"Posts in the sitemaps (default: {DEFAULT_URLS})"
+    )
+    parser.add_argument(
+        "--urls-per-sitemap",
+        type=int,
+        default=DEFAULT_URLS_PER_SITEMAP,
+        help=f"Posts per URL set sitemap (default: {DEFAULT_URLS_PER_SITEMAP})",
+    )
+    parser.add_argument(
+        "--index-fanout",
+        type=int,
+        default=DEFAULT_INDEX_FANOUT,
+        help=f"Entries per sitemap index; more sitemaps nest a second index level (default: {DEFAULT_INDEX_FANOUT})",
+    )
+    parser.add_argument(
+        "--robots",
+        choices=["index", "leaves", "missing"],
+        default="index",
+        help="robots.txt lists the root index (default), every URL set, or is missing",
+    )
+    parser.add_argument(
+        "--gzip",
+        choices=["off", "encoding", "file"],
+        default="off",
+        help="Serve sitemaps plain (default), with Content-Encoding: gzip, or as .xml.gz files",
+    )
+    parser.add_argument(
+        "--latency", type=float, default=0.0, help="Mean seconds added per article (default: 0)"
+    )
+    parser.add_argument(
+        "--rate-404", type=float, default=0.0, help="Fraction of articles returning 404 (default: 0)"
+    )
+    parser.add_argument(
+        "--rate-429",
+        type=float,
+        default=0.0,
+        help="Fraction of articles whose first request returns 429 (default: 0)",
+    )
+    parser.add_argument(
+        "--paragraphs",
+        type=int,
+        default=DEFAULT_PARAGRAPHS,
+        help=f"Paragraphs per article (default: {DEFAULT_PARAGRAPHS})",
+    )
+    parser.add_argument("--seed", type=int, default=0, help="Content seed (default: 0)")
+
+
+def site_options(args) -> dict:
+    """FixtureSite keyword arguments from the add_site_arguments() options."""
+    return dict(
+        urls=args.urls,
+        urls_per_sitemap=args.urls_per_sitemap,
+        index_fanout=args.index_fanout,
+        robots=args.robots,
+        gzip_mode=args.gzip,
+        latency=args.latency,
+        rate_404=args.rate_404,
+        rate_429=args.rate_429,
+        paragraphs=args.paragraphs,
+        seed=args.seed,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    add_site_arguments(parser)
+    parser.add_argument("--host", default="127.0.0.1", help="Bind address (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8800, help="Port (default: 8800)")
+    args = parser.parse_args()
+
+    site = FixtureSite(**site_options(args))
+    server = make_server(site, args.host, args.port)
+    print(
+        f"Serving {site.urls} posts in {site.leaves} sitemap(s) on "
+        f"http://{args.host}:{args.port}/blog/ (Ctrl+C to stop)"
+    )
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the Obstracts API endpoints used by obstracts_sync.py.
+
+Serves GET /v1/feeds/{id}/, POST /v1/feeds/{id}/posts/ and GET /v1/jobs/{id}/
+under any path prefix, keeps feeds, posted links and jobs in memory, and
+counts every request. Job latency, "already exists" 400 responses and
+failures can be injected.
+
+Run it standalone to point obstracts_sync.py at it:
+
+    python benchmarks/mock_obstracts_api.py --port 8900 --job-latency 2
+    OBSTRACTS_API_BASE_URL=http://127.0.0.1:8900/api OBSTRACTS_API_KEY=x \\
+        python obstracts_sync.py obstracts/config/main/expel.json --posts-per-job 64
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import re
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional, Tuple
+
+FEED_PATH = re.compile(r"/v1/feeds/(?P<feed_id>[^/]+)/$")
+POSTS_PATH = re.compile(r"/v1/feeds/(?P<feed_id>[^/]+)/posts/$")
+JOB_PATH = re.compile(r"/v1/jobs/(?P<job_id>[^/]+)/$")
+
+
+class MockObstractsAPI:
+    """In-memory Obstracts API state and request counters.
+
+    Args:
+        job_latency: Seconds before a job is processed
+        job_latency_per_post: Extra job seconds per submitted post
+        request_latency: Seconds added to every response
+        exists_rate: Fraction of new links rejected as "already exists"
+            (links posted before are always rejected)
+        submit_failure_rate: Fraction of post submissions answered with 500
+        job_failure_rate: Fraction of jobs that end in state "failed"
+        latest_item_pubdate: Value returned for every feed
+        seed: Seed for the injected rejections and failures
+    """
+
+    def __init__(
+        self,
+        job_latency: float = 0.0,
+        job_latency_per_post: float = 0.0,
+        request_latency: float = 0.0,
+        exists_rate: float = 0.0,
+        submit_failure_rate: float = 0.0,
+        job_failure_rate: float = 0.0,
+        latest_item_pubdate: Optional[str] = None,
+        seed: int = 0,
+    ):
+        self.job_latency = job_latency
+        self.job_latency_per_post = job_latency_per_post
+        self.request_latency = request_latency
+        self.exists_rate = exists_rate
+        self.submit_failure_rate = submit_failure_rate
+        self.job_failure_rate = job_failure_rate
+        self.latest_item_pubdate = latest_item_pubdate
+        self.seed = seed
+        self.links: Dict[str, set] = {}
+        self.jobs: Dict[str, Dict] = {}
+        self.lock = threading.Lock()
+        self.submissions = 0
+        self.reset_stats()
+
+    def reset_stats(self):
+        with self.lock:
+            self.requests: Dict[str, int] = {}
+            self.statuses: Dict[int, int] = {}
+            self.bytes_received = 0
+            self.posts_received = 0
+            self.in_flight = 0
+            self.max_in_flight = 0
+
+    def stats(self) -> Dict:
+        with self.lock:
+            return {
+                "requests": dict(self.requests),
+                "total_requests": sum(self.requests.values()),
+                "statuses": dict(sorted(self.statuses.items())),
+                "bytes_received": self.bytes_received,
+                "posts_received": self.posts_received,
+                "jobs": len(self.jobs),
+                "max_concurrent_requests": self.max_in_flight,
+            }
+
+    def fraction(self, value: str, salt: str) -> float:
+        digest = hashlib.blake2b(f"{self.seed}:{salt}:{value}".encode(), digest_size=8)
+        return int.from_bytes(digest.digest(), "big") / 2**64
+
+    # Endpoints
+
+    def get_feed(self, feed_id: str) -> Tuple[int, Dict]:
+        metadata = {"id": feed_id, "latest_item_pubdate": self.latest_item_pubdate}
+        return 200, {"id": feed_id, "obstract_feed_metadata": metadata}
+
+    def create_posts(self, feed_id: str, payload: Dict) -> Tuple[int, Dict]:
+        posts = payload.get("posts") or []
+        with self.lock:
+            self.submissions += 1
+            submission = self.submissions
+            known = self.links.setdefault(feed_id, set())
+            errors = {
+                str(index): [f"post with link {post['link']} already exists"]
+                for index, post in enumerate(posts)
+                if post["link"] in known
+                or self.fraction(post["link"], "exists") < self.exists_rate
+            }
+            if errors:
+                return 400, {"message": "invalid posts", "details": {"posts": errors}}
+            if self.fraction(str(submission), "submit") < self.submit_failure_rate:
+                return 500, {"message": "internal server error"}
+
+            job_id = str(uuid.uuid4())
+            failed = self.fraction(job_id, "job") < self.job_failure_rate
+            self.jobs[job_id] = {
+                "ready_at": time.monotonic()
+                + self.job_latency
+                + self.job_latency_per_post * len(posts),
+                "final_state": "failed" if failed else "processed",
+                "feed_id": feed_id,
+            }
+            if not failed:
+                known.update(post["link"] for post in posts)
+        return 201, {"id": job_id, "feed_id": feed_id, "state": "queued"}
+
+    def get_job(self, job_id: str) -> Tuple[int, Dict]:
+        with self.lock:
+            job = self.jobs.get(job_id)
+        if job is None:
+            return 404, {"message": "job not found"}
+        state = (
+            job["final_state"] if time.monotonic() >= job["ready_at"] else "processing"
+        )
+        return 200, {"id": job_id, "feed_id": job["feed_id"], "state": state}
+
+    def handle(
+        self, method: str, path: str, headers, body: bytes
+    ) -> Tuple[str, int, Dict]:
+        """Route one request and return (endpoint name, status, JSON payload)."""
+        if self.request_latency:
+            time.sleep(self.request_latency)
+        if not (headers.get("Authorization") or "").startswith("Token "):
+            return "auth", 401, {"message": "authentication credentials were not provided"}
+
+        if method == "GET" and (match := FEED_PATH.search(path)):
+            return "get_feed", *self.get_feed(match["feed_id"])
+        if method == "POST" and (match := POSTS_PATH.search(path)):
+            if headers.get("Content-Encoding") == "gzip":
+                body = gzip.decompress(body)
+            payload = json.loads(body)
+            with self.lock:
+                self.posts_received += len(payload.get("posts") or [])
+            return "create_posts", *self.create_posts(match["feed_id"], payload)
+        if method == "GET" and (match := JOB_PATH.search(path)):
+            return "get_job", *self.get_job(match["job_id"])
+        return "other", 404, {"message": "not found"}
+
+
+class MockAPIHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    api: MockObstractsAPI = None
+
+    def respond(self, method):
+        api = self.api
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else b""
+        with api.lock:
+            api.in_flight += 1
+            api.max_in_flight = max(api.max_in_flight, api.in_flight)
+            api.bytes_received += len(body)
+        try:
+            endpoint, status, payload = api.handle(method, self.path, self.headers, body)
+        finally:
+            with api.lock:
+                api.in_flight -= 1
+        with api.lock:
+            api.requests[endpoint] = api.requests.get(endpoint, 0) + 1
+            api.statuses[status] = api.statuses.get(status, 0) + 1
+
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        self.respond("GET")
+
+    def do_POST(self):
+        self.respond("POST")
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_mock_api(api: MockObstractsAPI, host: str = "127.0.0.1", port: int = 0):
+    """Serve api from a background thread; returns (server, API base URL)."""
+    handler = type("APIHandler", (MockAPIHandler,), {"api": api})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, "http://%s:%s/api" % server.server_address[:2]
+
+
+def add_api_arguments(parser: argparse.ArgumentParser):
+    """Add the MockObstractsAPI options to a parser (shared with the benchmarks)."""
+    parser.add_argument(
+        "--job-latency", type=float, default=0.0, help="Seconds before a job is processed (default: 0)"
+    )
+    parser.add_argument(
+        "--job-latency-per-post",
+        type=float,
+        default=0.0,
+        help="Extra job seconds per submitted post (default: 0)",
+    )
+    parser.add_argument(
+        "--request-latency", type=float, default=0.0, help="Seconds added to every API response (default: 0)"
+    )
+    parser.add_argument(
+        "--exists-rate",
+        type=float,
+        default=0.0,
+        help='Fraction of new links rejected as "already exists" (default: 0)',
+    )
+    parser.add_argument(
+        "--submit-failure-rate",
+        type=float,
+        default=0.0,
+        help="Fraction of post submissions answered with 500 (default: 0)",
+    )
+    parser.add_argument(
+        "--job-failure-rate",
+        type=float,
+        default=0.0,
+        help='Fraction of jobs ending in state "failed" (default: 0)',
+    )
+    parser.add_argument(
+        "--latest-item-pubdate",
+        default=None,
+        help="latest_item_pubdate returned for every feed (default: none)",
+    )
+    parser.add_argument("--api-seed", type=int, default=0, help="Failure seed (default: 0)")
+
+
+def api_from_args(args) -> MockObstractsAPI:
+    return MockObstractsAPI(
+        job_latency=args.job_latency,
+        job_latency_per_post=args.job_latency_per_post,
+        request_latency=args.request_latency,
+        exists_rate=args.exists_rate,
+        submit_failure_rate=args.submit_failure_rate,
+        job_failure_rate=args.job_failure_rate,
+        latest_item_pubdate=args.latest_item_pubdate,
+        seed=args.api_seed,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    add_api_arguments(parser)
+    parser.add_argument("--host", default="127.0.0.1", help="Bind address (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8900, help="Port (default: 8900)")
+    args = parser.parse_args()
+
+    server, base_url = start_mock_api(api_from_args(args), args.host, args.port)
+    print(f"Mock Obstracts API on {base_url} (Ctrl+C to stop)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
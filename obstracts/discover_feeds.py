@@ -6,12 +6,29 @@ This script finds all feed config JSON files in the obstracts/config directory
 and outputs them in a format suitable for GitHub Actions matrix strategy.
 """
 
+import hashlib
+import heapq
 import json
+import os
+import re
+import statistics
 import sys
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
+from urllib.parse import urljoin
 import argparse
 
+DEFAULT_STATS_WINDOW = 5  # Default: recent runs averaged per feed when estimating cost
+DEFAULT_FEED_COST = 60.0  # Default: seconds assumed for feeds when no history exists at all
+DEFAULT_PREFLIGHT_WORKERS = 8  # Default: feeds probed at the same time
+DEFAULT_PREFLIGHT_TIMEOUT = 20  # Default: seconds per pre-flight request
+DEFAULT_MAX_UNCHANGED_DAYS = 7  # Default: force a sync after this many skipped days
+USER_AGENT = "Sitemap2post/0.0.1 (+https://github.com/muchdogesec/sitemap2posts)"
+
 
 def discover_feed_configs(
     base_dir: Path, include_dirs: List[str] = None, filter_stems: List[str] = None
@@ -104,6 +121,390 @@ def generate_simple_matrix(feeds: List[Dict[str, Any]]) -> Dict[str, Any]:
     return matrix
 
 
+def load_feed_stats(stats_paths: List[Path]) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Load and merge per-feed run history written by obstracts_sync.py --stats-file.
+
+    Args:
+        stats_paths: Stats JSON files to merge (missing files are skipped)
+
+    Returns:
+        Dictionary mapping normalized config paths to run records, oldest first
+    """
+    merged = {}
+    for stats_path in stats_paths:
+        try:
+            with open(stats_path, "r") as f:
+                stats = json.load(f)
+        except FileNotFoundError:
+            print(f"Warning: Stats file {stats_path} does not exist", file=sys.stderr)
+            continue
+        except (json.JSONDecodeError, IOError) as e:
+            print(f"Warning: Failed to read {stats_path}: {e}", file=sys.stderr)
+            continue
+
+        for config_path, records in stats.get("feeds", {}).items():
+            by_time = merged.setdefault(os.path.normpath(config_path), {})
+            for record in records:
+                by_time[record["finished"]] = record
+
+    return {
+        config_path: sorted(records.values(), key=lambda r: r["finished"])
+        for config_path, records in merged.items()
+    }
+
+
+def load_feed_checkpoints(stats_paths: List[Path]) -> Dict[str, Dict[str, Any]]:
+    """
+    Load the checkpoints of feeds interrupted by obstracts_sync.py --time-budget.
+
+    When several files hold a checkpoint for the same feed, the most recently
+    updated one wins; feeds whose latest entry marks them complete are dropped.
+
+    Args:
+        stats_paths: Stats JSON files to merge (missing or unreadable files are skipped)
+
+    Returns:
+        Dictionary mapping normalized config paths to unfinished checkpoints
+    """
+    latest = {}
+    for stats_path in stats_paths:
+        try:
+            with open(stats_path, "r") as f:
+                stats = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError, IOError):
+            continue
+
+        for config_path, checkpoint in stats.get("checkpoints", {}).items():
+            config_path = os.path.normpath(config_path)
+            if (
+                config_path not in latest
+                or checkpoint["updated"] > latest[config_path]["updated"]
+            ):
+                latest[config_path] = checkpoint
+
+    return {
+        config_path: checkpoint
+        for config_path, checkpoint in latest.items()
+        if not checkpoint.get("complete")
+    }
+
+
+def write_feed_stats(
+    stats: Dict[str, List[Dict[str, Any]]],
+    output_path: Path,
+    checkpoints: Optional[Dict[str, Dict[str, Any]]] = None,
+):
+    """
+    Write merged per-feed run history in the obstracts_sync.py stats file format.
+
+    Args:
+        stats: Dictionary returned by load_feed_stats
+        output_path: File to write
+        checkpoints: Optional dictionary returned by load_feed_checkpoints
+    """
+    with open(output_path, "w") as f:
+        json.dump(
+            {"feeds": stats, "checkpoints": checkpoints or {}},
+            f,
+            indent=2,
+            sort_keys=True,
+        )
+
+
+def estimate_feed_costs(
+    feeds: List[Dict[str, Any]],
+    stats: Dict[str, List[Dict[str, Any]]],
+    window: int = DEFAULT_STATS_WINDOW,
+) -> Dict[str, float]:
+    """
+    Estimate the expected run time of each feed from its recent history.
+
+    Recorded durations are used as they are. Runs recorded with a post count
+    but no duration are costed at the median seconds per post of the feeds
+    that have both, so feeds with very different URL volumes still differ.
+
+    Args:
+        feeds: List of feed metadata dictionaries
+        stats: Dictionary returned by load_feed_stats
+        window: Number of most recent runs to average
+
+    Returns:
+        Dictionary mapping config paths to expected duration in seconds.
+        Feeds without any usable history get the median cost of the feeds
+        that have one.
+    """
+    recent = {
+        feed["config_path"]: stats.get(os.path.normpath(feed["config_path"]), [])[-window:]
+        for feed in feeds
+    }
+
+    rates = []
+    for records in recent.values():
+        timed = [
+            record
+            for record in records
+            if record.get("duration") is not None and record.get("posts")
+        ]
+        if timed:
+            rates.append(
+                sum(record["duration"] for record in timed)
+                / sum(record["posts"] for record in timed)
+            )
+    seconds_per_post = statistics.median(rates) if rates else None
+
+    costs = {}
+    for config_path, records in recent.items():
+        durations = []
+        for record in records:
+            if record.get("duration") is not None:
+                durations.append(record["duration"])
+            elif seconds_per_post is not None and record.get("posts") is not None:
+                durations.append(record["posts"] * seconds_per_post)
+        if durations:
+            costs[config_path] = statistics.mean(durations)
+
+    default_cost = statistics.median(costs.values()) if costs else DEFAULT_FEED_COST
+    for feed in feeds:
+        costs.setdefault(feed["config_path"], default_cost)
+    return costs
+
+
+def generate_sharded_matrix(
+    feeds: List[Dict[str, Any]], shard_count: int, costs: Dict[str, float]
+) -> Dict[str, Any]:
+    """
+    Generate a GitHub Actions matrix that packs feeds into cost-balanced shards.
+
+    Feeds are assigned longest-processing-time first: the most expensive
+    remaining feed always goes to the currently cheapest shard.
+
+    Args:
+        feeds: List of feed metadata dictionaries
+        shard_count: Number of shards (matrix jobs) to produce
+        costs: Expected duration per config path, from estimate_feed_costs
+
+    Returns:
+        Dictionary containing the matrix; each entry's config_path holds the
+        space-separated config paths of its shard
+    """
+    shard_count = max(1, min(shard_count, len(feeds)))
+    shards = [{"cost": 0.0, "feeds": []} for _ in range(shard_count)]
+    heap = [(0.0, index) for index in range(shard_count)]
+
+    for feed in sorted(feeds, key=lambda f: costs[f["config_path"]], reverse=True):
+        load, index = heapq.heappop(heap)
+        shards[index]["feeds"].append(feed)
+        shards[index]["cost"] = load + costs[feed["config_path"]]
+        heapq.heappush(heap, (shards[index]["cost"], index))
+
+    matrix = {
+        "include": [
+            {
+                "config_path": " ".join(f["config_path"] for f in shard["feeds"]),
+                "config_paths": [f["config_path"] for f in shard["feeds"]],
+                "name": f"shard {number}/{shard_count} ({len(shard['feeds'])} feeds)",
+                "feed_id": "",
+                "category": "shard",
+                "feeds": [f["name"] for f in shard["feeds"]],
+                "expected_duration": round(shard["cost"], 1),
+            }
+            for number, shard in enumerate(shards, start=1)
+        ]
+    }
+
+    return matrix
+
+
+def probe_url(url: str, previous: Dict[str, Any], timeout: int) -> Dict[str, Any]:
+    """
+    Conditionally fetch a URL and report whether it changed since the last probe.
+
+    Sends If-None-Match / If-Modified-Since from the previous probe. Servers
+    that ignore them are compared by a SHA-256 of the body instead.
+
+    Args:
+        url: URL to probe
+        previous: Validators stored by the previous probe (may be empty)
+        timeout: Request timeout in seconds
+
+    Returns:
+        Dictionary with etag, last_modified, sha256 and a changed flag
+    """
+    headers = {"User-Agent": USER_AGENT}
+    if previous.get("etag"):
+        headers["If-None-Match"] = previous["etag"]
+    if previous.get("last_modified"):
+        headers["If-Modified-Since"] = previous["last_modified"]
+
+    request = urllib.request.Request(url, headers=headers)
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            body = response.read()
+            validators = {
+                "etag": response.headers.get("ETag"),
+                "last_modified": response.headers.get("Last-Modified"),
+                "sha256": hashlib.sha256(body).hexdigest(),
+            }
+    except urllib.error.HTTPError as e:
+        if e.code == 304 and previous:
+            return {**previous, "changed": False}
+        raise
+
+    return {**validators, "changed": validators["sha256"] != previous.get("sha256")}
+
+
+def get_preflight_sitemaps(config_data: Dict[str, Any], timeout: int) -> List[str]:
+    """
+    List the sitemap URLs a feed's sync would start from.
+
+    Args:
+        config_data: Feed configuration dictionary
+        timeout: Request timeout in seconds for robots.txt
+
+    Returns:
+        Configured sitemap_urls plus, when use_robots_txt is on, robots.txt sitemaps
+    """
+    sitemap_urls = list(config_data.get("sitemap_urls") or [])
+    use_robots_txt = config_data.get("use_robots_txt", not sitemap_urls)
+
+    if use_robots_txt and config_data.get("blog_url"):
+        robots_url = urljoin(config_data["blog_url"], "/robots.txt")
+        request = urllib.request.Request(robots_url, headers={"User-Agent": USER_AGENT})
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            robots_txt = response.read().decode("utf-8", errors="replace")
+        sitemap_urls.extend(
+            sitemap.strip()
+            for sitemap in re.findall(r"Sitemap: (.*)", robots_txt, re.IGNORECASE)
+        )
+
+    return list(dict.fromkeys(sitemap_urls))
+
+
+def preflight_feed(
+    feed: Dict[str, Any], previous: Dict[str, Any], timeout: int
+) -> tuple[bool, Dict[str, Any], str]:
+    """
+    Probe a feed's sitemaps and decide whether it needs a sync.
+
+    Args:
+        feed: Feed metadata dictionary
+        previous: This feed's entry from the previous pre-flight state
+        timeout: Request timeout in seconds
+
+    Returns:
+        Tuple of (changed, new state entry, reason)
+    """
+    previous_sitemaps = previous.get("sitemaps", {})
+    try:
+        sitemap_urls = get_preflight_sitemaps(feed["config_data"], timeout)
+        if not sitemap_urls:
+            return True, previous, "no sitemaps to probe"
+
+        sitemaps = {}
+        changed = []
+        for sitemap_url in sitemap_urls:
+            probe = probe_url(sitemap_url, previous_sitemaps.get(sitemap_url, {}), timeout)
+            if probe.pop("changed"):
+                changed.append(sitemap_url)
+            sitemaps[sitemap_url] = probe
+    except Exception as e:
+        # Unknown state, sync to be safe and keep the old validators
+        return True, previous, f"probe failed: {type(e).__name__}: {e}"
+
+    entry = {**previous, "sitemaps": sitemaps}
+    if changed:
+        return True, entry, f"{len(changed)} of {len(sitemap_urls)} sitemap(s) changed"
+    return False, entry, "unchanged"
+
+
+def preflight_changed_feeds(
+    feeds: List[Dict[str, Any]],
+    state: Dict[str, Any],
+    workers: int = DEFAULT_PREFLIGHT_WORKERS,
+    timeout: int = DEFAULT_PREFLIGHT_TIMEOUT,
+    max_unchanged_days: Optional[int] = DEFAULT_MAX_UNCHANGED_DAYS,
+    pending: Optional[set] = None,
+) -> tuple[List[Dict[str, Any]], Dict[str, Any]]:
+    """
+    Keep only feeds whose sitemaps changed since the last pre-flight.
+
+    Feeds that were not synced for max_unchanged_days are kept regardless,
+    so a missed or failed sync is retried eventually. So are feeds with an
+    interrupted sync to resume.
+
+    Args:
+        feeds: List of feed metadata dictionaries
+        state: Pre-flight state loaded from the previous run
+        workers: Number of feeds probed concurrently
+        timeout: Request timeout in seconds
+        max_unchanged_days: Force a sync after this many days without one (None = never)
+        pending: Normalized config paths of feeds with an interrupted sync
+
+    Returns:
+        Tuple of (feeds to sync, new pre-flight state)
+    """
+    now = datetime.now(timezone.utc)
+    previous_feeds = state.get("feeds", {})
+
+    def probe(feed):
+        return preflight_feed(
+            feed, previous_feeds.get(os.path.normpath(feed["config_path"]), {}), timeout
+        )
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        probes = list(executor.map(probe, feeds))
+
+    changed_feeds = []
+    new_feeds = dict(previous_feeds)
+    for feed, (changed, entry, reason) in zip(feeds, probes):
+        last_included = entry.get("last_included")
+        if (
+            not changed
+            and max_unchanged_days is not None
+            and (
+                not last_included
+                or now - datetime.fromisoformat(last_included)
+                > timedelta(days=max_unchanged_days)
+            )
+        ):
+            changed, reason = True, f"no sync in {max_unchanged_days} day(s)"
+        if not changed and pending and os.path.normpath(feed["config_path"]) in pending:
+            changed, reason = True, "resuming interrupted sync"
+
+        if changed:
+            entry = {**entry, "last_included": now.isoformat()}
+            changed_feeds.append(feed)
+        print(f"Pre-flight: {feed['name']}: {reason}", file=sys.stderr)
+        new_feeds[os.path.normpath(feed["config_path"])] = entry
+
+    print(
+        f"Pre-flight: {len(changed_feeds)} of {len(feeds)} feed(s) need a sync",
+        file=sys.stderr,
+    )
+    return changed_feeds, {"feeds": new_feeds}
+
+
+def load_preflight_state(state_path: Path) -> Dict[str, Any]:
+    """
+    Load pre-flight state written by a previous --changed-only run.
+
+    Args:
+        state_path: Path to the state JSON file
+
+    Returns:
+        State dictionary (empty if the file is missing or unreadable)
+    """
+    try:
+        with open(state_path, "r") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+    except (json.JSONDecodeError, IOError) as e:
+        print(f"Warning: Failed to read {state_path}: {e}", file=sys.stderr)
+        return {}
+
+
 def generate_full_matrix(feeds: List[Dict[str, Any]]) -> Dict[str, Any]:
     """
     Generate a full GitHub Actions matrix with complete config content.
@@ -164,6 +565,15 @@ Examples:
 
   # Pretty print for debugging
   python discover_feeds.py --pretty
+
+  # Pack feeds into 4 shards balanced by recorded run time
+  python discover_feeds.py --shards 4 --stats-file sync-stats.json
+
+  # Merge stats files from several shard jobs into one
+  python discover_feeds.py --stats-file stats/*.json --merge-stats sync-stats.json
+
+  # Only emit feeds whose sitemaps changed since the last run
+  python discover_feeds.py --changed-only --preflight-state preflight-state.json
         """,
     )
 
@@ -218,8 +628,70 @@ Examples:
         help="Output discovered feeds in markdown format",
     )
 
+    parser.add_argument(
+        "--shards",
+        type=int,
+        metavar="N",
+        help="Pack feeds into N matrix entries balanced by expected run time (uses --stats-file history)",
+    )
+
+    parser.add_argument(
+        "--stats-file",
+        nargs="+",
+        type=Path,
+        default=[],
+        metavar="FILE",
+        help="Run history written by obstracts_sync.py --stats-file (several files are merged)",
+    )
+
+    parser.add_argument(
+        "--merge-stats",
+        type=Path,
+        metavar="OUTPUT",
+        help="Merge the --stats-file inputs into OUTPUT and exit",
+    )
+
+    parser.add_argument(
+        "--changed-only",
+        action="store_true",
+        help="Probe each feed's sitemaps and only emit feeds that changed or have an interrupted sync in --stats-file (requires --preflight-state)",
+    )
+
+    parser.add_argument(
+        "--preflight-state",
+        type=Path,
+        metavar="FILE",
+        help="Validators (ETag, Last-Modified, content hash) from the last pre-flight; read and rewritten",
+    )
+
+    parser.add_argument(
+        "--max-unchanged-days",
+        type=int,
+        default=DEFAULT_MAX_UNCHANGED_DAYS,
+        help=f"Include unchanged feeds anyway if not synced for this many days (default: {DEFAULT_MAX_UNCHANGED_DAYS})",
+    )
+
+    parser.add_argument(
+        "--preflight-workers",
+        type=int,
+        default=DEFAULT_PREFLIGHT_WORKERS,
+        help=f"Number of feeds probed concurrently (default: {DEFAULT_PREFLIGHT_WORKERS})",
+    )
+
     args = parser.parse_args()
 
+    if args.changed_only and not args.preflight_state:
+        parser.error("--changed-only requires --preflight-state")
+
+    # Merge mode
+    if args.merge_stats:
+        stats = load_feed_stats(args.stats_file)
+        write_feed_stats(
+            stats, args.merge_stats, load_feed_checkpoints(args.stats_file)
+        )
+        print(f"Merged run history for {len(stats)} feed(s) into {args.merge_stats}")
+        return
+
     # Discover feeds
     feeds, bad_feeds = discover_feed_configs(args.base_dir, args.include, args.filter)
 
@@ -262,8 +734,25 @@ Examples:
         print_and_exit_if_bad_config(bad_feeds, as_markdown=True)
         return
 
+    # Pre-flight mode
+    if args.changed_only:
+        feeds, state = preflight_changed_feeds(
+            feeds,
+            load_preflight_state(args.preflight_state),
+            workers=args.preflight_workers,
+            max_unchanged_days=args.max_unchanged_days,
+            pending=set(load_feed_checkpoints(args.stats_file)),
+        )
+        with open(args.preflight_state, "w") as f:
+            json.dump(state, f, indent=2, sort_keys=True)
+
     # Generate matrix
-    if args.full:
+    if not feeds:
+        matrix = {"include": []}
+    elif args.shards:
+        costs = estimate_feed_costs(feeds, load_feed_stats(args.stats_file))
+        matrix = generate_sharded_matrix(feeds, args.shards, costs)
+    elif args.full:
         matrix = generate_full_matrix(feeds)
     else:
         matrix = generate_simple_matrix(feeds)
@@ -3,25 +3,53 @@
 Obstracts Feed Synchronization Tool
 
 This script synchronizes blog posts from a sitemap to an Obstracts feed.
-It reads a single feed configuration from a JSON file and uses the Obstracts API to create posts.
-Processes one feed per run - use GitHub Actions matrix for multiple feeds.
+It reads feed configurations from JSON files (one feed per file) and uses the Obstracts API to create posts.
+Several configs can be synced concurrently in one process, sharing HTTP pools and caches.
 Supports GitHub Actions output with job summaries.
 """
 
 import contextlib
+import gzip
 import json
 import os
 import sys
 import logging
 import argparse
+import asyncio
+import heapq
+import random
+import signal
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass
 from datetime import datetime, timezone
-import traceback
 from typing import List, Dict, Optional
 import time
 import requests
+from requests.adapters import HTTPAdapter
+
+try:
+    import orjson
+except ImportError:  # optional, falls back to the standard library encoder
+    orjson = None
 
 # Import the sitemap2posts function
-from sitemap2posts import sitemap2posts, lastmod_default
+from sitemap2posts import (
+    DEFAULT_DNS_TTL,
+    DEFAULT_PROFILE_TOP,
+    URL_CANONICAL_RULES,
+    URL_DATE_PATTERNS,
+    FetchLimits,
+    async_sitemap2posts,
+    compile_url_date_patterns,
+    import_aiohttp,
+    iter_posts,
+    lastmod_default,
+    metrics,
+    profiler,
+    set_dns_ttl,
+    set_max_concurrent_requests,
+)
 
 # Set up logging
 logging.basicConfig(
@@ -32,11 +60,23 @@ DEFAULT_PREFERRED_DATE = (
 )
 DEFAULT_OMIT_AUTHOR = False  # Default: include author information
 DEFAULT_USE_DATE_FILTER = True  # Default: filter posts by date
+DEFAULT_GZIP_LEVEL = 6  # Default: gzip compression level for request bodies
+DEFAULT_API_POOL_SIZE = 10  # Default: connections kept open to the Obstracts API
+DEFAULT_STATS_HISTORY = 10  # Default: runs kept per feed in the stats file
+DEFAULT_DAEMON_MIN_INTERVAL = 3600  # Default: shortest daemon interval per feed (seconds)
+DEFAULT_DAEMON_MAX_INTERVAL = 86400  # Default: longest daemon interval per feed (seconds)
+DEFAULT_DAEMON_JITTER = 0.1  # Default: +/- fraction of randomness added to each interval
+DEFAULT_RATE_SMOOTHING = 0.5  # Default: weight of the latest run in the posting rate
+DEFAULT_UPLOAD_RESERVE = 900  # Default: seconds of a --time-budget kept for uploading
+DEFAULT_JOB_TIMEOUT = 1200  # Default: seconds to wait for one Obstracts job
 
 
 class GitHubActionsOutput:
     """Handle GitHub Actions output formatting."""
 
+    # Feeds synced concurrently share the same summary and output files
+    _write_lock = threading.Lock()
+
     def __init__(self):
         """Initialize GitHub Actions output handler."""
         self.is_github_actions = os.getenv("GITHUB_ACTIONS") == "true"
@@ -51,9 +91,10 @@ class GitHubActionsOutput:
         """Write summary to GitHub Actions summary file."""
         if self.is_github_actions and self.summary_file:
             try:
-                with open(self.summary_file, "a", encoding="utf-8") as f:
-                    f.write("\n".join(self.summary_lines))
-                    f.write("\n")
+                with self._write_lock, open(
+                    self.summary_file, "a", encoding="utf-8"
+                ) as f:
+                    f.write("\n".join(self.summary_lines) + "\n")
                 logging.info("GitHub Actions summary written")
             except IOError as e:
                 logging.error(f"Failed to write GitHub Actions summary: {e}")
@@ -65,45 +106,370 @@ class GitHubActionsOutput:
             github_output = os.getenv("GITHUB_OUTPUT")
             if github_output:
                 try:
-                    with open(github_output, "a", encoding="utf-8") as f:
+                    with self._write_lock, open(
+                        github_output, "a", encoding="utf-8"
+                    ) as f:
                         f.write(f"{name}={value}\n")
                 except IOError as e:
                     logging.error(f"Failed to set GitHub output: {e}")
 
 
+class TimeBudget:
+    """Wall-clock budget for a run, with time held back for uploading."""
+
+    def __init__(self, seconds: float, upload_reserve: float = DEFAULT_UPLOAD_RESERVE):
+        """
+        Start the budget clock.
+
+        Args:
+            seconds: Total wall-clock time allowed for the run
+            upload_reserve: Seconds before the deadline at which crawling stops
+        """
+        self.deadline = time.monotonic() + seconds
+        self.upload_reserve = upload_reserve
+
+    def remaining(self) -> float:
+        """Seconds left before the deadline."""
+        return self.deadline - time.monotonic()
+
+    def crawl_remaining(self) -> float:
+        """Seconds left for crawling before the upload reserve starts."""
+        return self.remaining() - self.upload_reserve
+
+
 class JobCreationFailed(Exception):
     pass
 
 
+def encode_request_body(
+    payload: Dict, gzip_level: Optional[int] = None
+) -> tuple[bytes, Dict]:
+    """
+    Serialize a request payload, optionally gzip-compressing it.
+
+    Args:
+        payload: JSON-serializable request payload
+        gzip_level: Compression level, or None to send the body uncompressed
+
+    Returns:
+        Tuple of (body bytes, extra request headers)
+    """
+    if orjson is not None:
+        body = orjson.dumps(payload)
+    else:
+        body = json.dumps(
+            payload, ensure_ascii=False, separators=(",", ":")
+        ).encode("utf-8")
+
+    headers = {}
+    if gzip_level is not None:
+        raw_size = len(body)
+        body = gzip.compress(body, compresslevel=gzip_level)
+        headers["Content-Encoding"] = "gzip"
+        logging.debug(
+            "Compressed request body from %d to %d bytes", raw_size, len(body)
+        )
+    return body, headers
+
+
+def collect_failed_posts(posts: List[Dict], error_data: Dict) -> list[Dict]:
+    """
+    Handle a 400 response to a bulk submit.
+
+    Posts rejected as "already exists" are removed from posts (in place) so
+    the batch can be retried; any other rejection fails the job.
+
+    Args:
+        posts: The submitted batch (modified in place)
+        error_data: The "details" object of the 400 response
+
+    Returns:
+        List of failed post records
+    """
+    if not isinstance(error_data.get("posts"), dict):
+        raise JobCreationFailed(error_data)
+    failed_posts = []
+    is_true_fail = False
+    for index, error in error_data["posts"].items():
+        index = int(index)
+        post = posts[index]
+        failed_posts.append(
+            {"url": post.pop("link"), "errors": error, "meta": post}
+        )
+        if "already exists" not in str(error):
+            is_true_fail = True
+    if is_true_fail:
+        raise JobCreationFailed(error_data)
+    # remove failed posts before retry
+    posts[:] = [post for post in posts if "link" in post]
+    return failed_posts
+
+
 def format_exception_message(error: Exception) -> str:
     message = str(error)
     if message:
         return f"{type(error).__name__}: {message}"
     return type(error).__name__
 
+# GitHub Actions groups cannot interleave, so they are off while feeds sync concurrently
+_log_groups_enabled = True
+
+
+def set_log_groups(enabled: bool):
+    """Turn the collapsible log sections of log_collapsed() on or off."""
+    global _log_groups_enabled
+    _log_groups_enabled = enabled
+
+
 @contextlib.contextmanager
 def log_collapsed(title: str):
     """Context manager for collapsible log sections in GitHub Actions."""
+    if not _log_groups_enabled:
+        yield
+        return
     print(f"::group::{title}")
     try:
         yield
     finally:
         print("::endgroup::")
 
+
+@dataclass
+class UploadStep:
+    """One API call requested by bulk_upload_steps()."""
+
+    stage: str  # "submit" or "job_wait"
+    title: str
+    posts: Optional[List[Dict]] = None
+    job_id: Optional[str] = None
+    timeout: float = DEFAULT_JOB_TIMEOUT
+
+
+def bulk_upload_steps(
+    feed_id: str,
+    orig_posts: List[Dict],
+    posts_per_job: Optional[int] = None,
+    deadline: Optional[float] = None,
+):
+    """
+    Batching, retries and result bookkeeping of create_posts_bulk, without I/O.
+
+    Shared by ObstractsAPIClient and AsyncObstractsAPIClient, which only run
+    the steps with their own transport (see next_upload_step). Each yielded
+    UploadStep is answered with send(): (job, failed_posts) from
+    _submit_posts for "submit", the completed job from wait_for_job for
+    "job_wait". A failed call is passed in with throw() instead.
+
+    Args:
+        feed_id: The ID of the feed to post to
+        orig_posts: List of post dictionaries
+        posts_per_job: Maximum number of posts per job (None = no batching)
+        deadline: Optional time.monotonic() deadline; later batches are deferred,
+            and so is a batch whose job is still running when it passes
+
+    Returns:
+        Dictionary with job results (the StopIteration value). pending_links
+        lists the links of posts whose batch was deferred or not processed.
+    """
+    posts = orig_posts.copy()
+    total_posts = len(posts)
+
+    # Determine batching
+    if posts_per_job and posts_per_job > 0:
+        logging.info(
+            f"Processing {total_posts} posts for feed {feed_id} in batches of {posts_per_job}"
+        )
+    else:
+        logging.info(
+            f"Processing {total_posts} posts for feed {feed_id} in a single batch"
+        )
+        posts_per_job = total_posts
+
+    # Split posts into batches
+    batches = [
+        posts[i : i + posts_per_job] for i in range(0, total_posts, posts_per_job)
+    ]
+
+    all_jobs = []
+    all_failed_posts = []
+    pending_links = []
+    total_submitted = 0
+
+    for batch_num, batch in enumerate(batches, start=1):
+        batch_links = [post["link"] for post in batch]
+
+        if deadline is not None and time.monotonic() >= deadline:
+            logging.warning(
+                f"Batch {batch_num}: Time budget exhausted, deferring {len(batch)} posts"
+            )
+            all_jobs.append(
+                {
+                    "batch": batch_num,
+                    "job_id": None,
+                    "state": "deferred",
+                    "posts_in_batch": len(batch),
+                    "submitted": 0,
+                }
+            )
+            pending_links.extend(batch_links)
+            continue
+
+        logging.info(
+            f"Processing batch {batch_num}/{len(batches)} with {len(batch)} posts"
+        )
+        batch_posts = batch.copy()
+
+        # Try to submit the batch (with retries)
+        for retry in range(3):
+            if retry:
+                logging.info(f"Retry sending posts, {retry}/2 retries")
+            try:
+                job, failed_posts = yield UploadStep(
+                    "submit",
+                    f"Submitting batch {batch_num} (attempt {retry + 1})",
+                    posts=batch_posts,
+                )
+                if failed_posts:
+                    all_failed_posts.extend(failed_posts)
+
+                if not batch_posts:
+                    # All posts already added
+                    logging.info(f"Batch {batch_num}: All posts already exist")
+                    all_jobs.append(
+                        {
+                            "batch": batch_num,
+                            "job_id": "none, all posts already added",
+                            "state": "skipped",
+                            "posts_in_batch": len(batch),
+                            "submitted": 0,
+                        }
+                    )
+                    break
+
+                if job:
+                    job_id = job["id"]
+                    logging.info(
+                        f"Batch {batch_num}: Job {job_id} created, waiting for completion..."
+                    )
+
+                    # Wait for this job to complete
+                    timeout = DEFAULT_JOB_TIMEOUT
+                    if deadline is not None:
+                        timeout = min(timeout, max(deadline - time.monotonic(), 0))
+                    completed_job = yield UploadStep(
+                        "job_wait",
+                        f"Waiting for job {job_id}| Batch {batch_num}",
+                        job_id=job_id,
+                        timeout=timeout,
+                    )
+                    state = completed_job.get("state", "unknown")
+                    error = completed_job.get("error")
+                    if state == "timeout" and timeout < DEFAULT_JOB_TIMEOUT:
+                        # Cut short by the time budget: the job is still running,
+                        # and its posts are checked again by the next run
+                        logging.warning(
+                            f"Batch {batch_num}: Time budget exhausted while job {job_id} "
+                            f"is running, deferring {len(batch)} posts"
+                        )
+                        state, error = "deferred", None
+
+                    all_jobs.append(
+                        {
+                            "batch": batch_num,
+                            "job_id": job_id,
+                            "state": state,
+                            "posts_in_batch": len(batch),
+                            "submitted": len(batch_posts),
+                            "error": error,
+                        }
+                    )
+
+                    total_submitted += len(batch_posts)
+                    break
+
+            except JobCreationFailed:
+                logging.error(f"Batch {batch_num}: Job creation failed")
+                break
+            except Exception as e:
+                logging.exception(f"Batch {batch_num}: Unexpected error: {e}")
+                continue
+        else:
+            # All retries failed
+            all_jobs.append(
+                {
+                    "batch": batch_num,
+                    "job_id": None,
+                    "state": "failed",
+                    "posts_in_batch": len(batch),
+                    "submitted": 0,
+                    "error": "Failed to submit job after retries",
+                }
+            )
+
+        if all_jobs[-1]["batch"] != batch_num or all_jobs[-1]["state"] not in [
+            "processed",
+            "skipped",
+        ]:
+            pending_links.extend(batch_links)
+
+    # Determine overall success (deferred batches are picked up by the next run)
+    success = all(
+        job.get("state") in ["processed", "skipped", "deferred"] for job in all_jobs
+    )
+    error = next((job.get("error") for job in all_jobs if job.get("error")), None)
+
+    return {
+        "feed_id": feed_id,
+        "posts_count": total_posts,
+        "jobs": all_jobs,
+        "success": success,
+        "error": error,
+        "submitted_posts": total_submitted,
+        "failed_posts": all_failed_posts,
+        "pending_links": pending_links,
+    }
+
+
+def next_upload_step(steps, outcome=None, error: Optional[Exception] = None):
+    """Answer the last step of bulk_upload_steps(); returns (next step, None) or (None, result)."""
+    try:
+        return (steps.throw(error) if error is not None else steps.send(outcome)), None
+    except StopIteration as done:
+        return None, done.value
+
+
 class ObstractsAPIClient:
     """Client for interacting with the Obstracts API."""
 
-    def __init__(self, base_url: str, api_key: str):
+    def __init__(
+        self,
+        base_url: str,
+        api_key: str,
+        gzip_requests: bool = False,
+        gzip_level: int = DEFAULT_GZIP_LEVEL,
+        pool_size: int = DEFAULT_API_POOL_SIZE,
+    ):
         """
         Initialize the Obstracts API client.
 
         Args:
             base_url: Base URL for the Obstracts API
             api_key: API key for authentication
+            gzip_requests: Send bulk request bodies gzip-compressed (default: False)
+            gzip_level: Compression level used when gzip_requests is enabled
+            pool_size: Number of connections kept open to the API
         """
         self.base_url = base_url.rstrip("/")
         self.api_key = api_key
+        self.gzip_requests = gzip_requests
+        self.gzip_level = gzip_level
         self.session = requests.Session()
+        self.session.mount(
+            "https://", HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        )
+        self.session.mount(
+            "http://", HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        )
         self.session.headers.update(
             {
                 "Authorization": "Token " + self.api_key,
@@ -111,8 +477,37 @@ class ObstractsAPIClient:
             }
         )
 
+    def _request(self, method: str, url: str, kind: str, **kwargs) -> requests.Response:
+        """
+        Send a request to the API and record it in the run metrics.
+
+        Args:
+            method: HTTP method
+            url: Request URL
+            kind: Metrics request kind, e.g. "api_submit"
+            **kwargs: Passed to requests.Session.request
+
+        Returns:
+            The response
+        """
+        sent = len(kwargs.get("data") or b"")
+        start = time.perf_counter()
+        try:
+            response = self.session.request(method, url, **kwargs)
+        except requests.RequestException:
+            metrics.record_request(kind, "error", time.perf_counter() - start, sent=sent)
+            raise
+        metrics.record_request(
+            kind,
+            response.status_code,
+            time.perf_counter() - start,
+            received=len(response.content),
+            sent=sent,
+        )
+        return response
+
     def wait_for_job(
-        self, job_id: str, poll_interval: int = 5, timeout: int = 1200
+        self, job_id: str, poll_interval: int = 5, timeout: float = DEFAULT_JOB_TIMEOUT
     ) -> Dict:
         """
         Wait for a job to complete by polling its status.
@@ -120,7 +515,7 @@ class ObstractsAPIClient:
         Args:
             job_id: The ID of the job to wait for
             poll_interval: Seconds between status checks (default: 5)
-            timeout: Maximum time to wait in seconds (default: 1200)
+            timeout: Maximum time to wait in seconds (default: DEFAULT_JOB_TIMEOUT)
 
         Returns:
             Job details dictionary
@@ -130,18 +525,10 @@ class ObstractsAPIClient:
 
         logging.info(f"Waiting for job {job_id} to complete...")
 
+        # The job is polled at least once, even with a timeout of 0
         while True:
-            elapsed = time.time() - start_time
-            if elapsed > timeout:
-                logging.error(f"Job {job_id} timed out after {timeout} seconds")
-                return {
-                    "id": job_id,
-                    "state": "timeout",
-                    "error": f"Job polling timed out after {timeout} seconds",
-                }
-
             try:
-                response = self.session.get(endpoint)
+                response = self._request("GET", endpoint, "api_job")
                 if response.ok:
                     job_data = response.json()
                     state = job_data.get("state")
@@ -150,19 +537,23 @@ class ObstractsAPIClient:
                     if state in ["processed", "failed"]:
                         logging.info(f"Job {job_id} completed with state: {state}")
                         return job_data
-                    logging.debug(f"Job {job_id}, state={state}, waiting {poll_interval} seconds...")
-
-                    # Job is still processing
-                    time.sleep(poll_interval)
                 else:
                     logging.error(
                         f"Failed to get job status for {job_id}: "
                         f"Status {response.status_code}, Response: {response.text}"
                     )
-                    time.sleep(poll_interval)
             except requests.RequestException as e:
                 logging.error(f"Error polling job {job_id}: {e}")
-                time.sleep(poll_interval)
+
+            elapsed = time.time() - start_time
+            if elapsed >= timeout:
+                logging.error(f"Job {job_id} timed out after {timeout} seconds")
+                return {
+                    "id": job_id,
+                    "state": "timeout",
+                    "error": f"Job polling timed out after {timeout} seconds",
+                }
+            time.sleep(min(poll_interval, timeout - elapsed))
 
     def create_posts_bulk(
         self,
@@ -170,6 +561,7 @@ class ObstractsAPIClient:
         profile_id: Optional[str],
         orig_posts: List[Dict],
         posts_per_job: Optional[int] = None,
+        deadline: Optional[float] = None,
     ) -> Dict:
         """
         Create multiple posts in a feed using bulk requests with optional batching.
@@ -179,128 +571,33 @@ class ObstractsAPIClient:
             profile_id: Optional profile ID to associate with posts
             orig_posts: List of post dictionaries
             posts_per_job: Maximum number of posts per job (None = no batching)
+            deadline: Optional time.monotonic() deadline; later batches are deferred,
+                and so is a batch whose job is still running when it passes
 
         Returns:
-            Dictionary with job results
+            Dictionary with job results. pending_links lists the links of posts
+            whose batch was deferred or not processed.
         """
-        posts = orig_posts.copy()
-        total_posts = len(posts)
-
-        # Determine batching
-        if posts_per_job and posts_per_job > 0:
-            logging.info(
-                f"Processing {total_posts} posts for feed {feed_id} in batches of {posts_per_job}"
-            )
-        else:
-            logging.info(
-                f"Processing {total_posts} posts for feed {feed_id} in a single batch"
-            )
-            posts_per_job = total_posts
-
-        # Split posts into batches
-        batches = []
-        for i in range(0, total_posts, posts_per_job):
-            batches.append(posts[i : i + posts_per_job])
-
-        all_jobs = []
-        all_failed_posts = []
-        total_submitted = 0
-        batch_num = 0
-
-        for batch in batches:
-            batch_num += 1
-            logging.info(
-                f"Processing batch {batch_num}/{len(batches)} with {len(batch)} posts"
-            )
-
-            failed_posts = []
-            job = None
-            batch_posts = batch.copy()
-
-            # Try to submit the batch (with retries)
-            for retry in range(3):
-                if retry:
-                    logging.info(f"Retry sending posts, {retry}/2 retries")
-                try:
-                    with log_collapsed(f"Submitting batch {batch_num} (attempt {retry + 1})"):
-                        job, _failed_posts = self._submit_posts(
-                            feed_id, profile_id, batch_posts
-                        )
-                    if _failed_posts:
-                        failed_posts.extend(_failed_posts)
-                        all_failed_posts.extend(_failed_posts)
-
-                    if not batch_posts:
-                        # All posts already added
-                        logging.info(f"Batch {batch_num}: All posts already exist")
-                        all_jobs.append(
-                            {
-                                "batch": batch_num,
-                                "job_id": "none, all posts already added",
-                                "state": "skipped",
-                                "posts_in_batch": len(batch),
-                                "submitted": 0,
-                            }
-                        )
-                        break
-
-                    if job:
-                        job_id = job["id"]
-                        logging.info(
-                            f"Batch {batch_num}: Job {job_id} created, waiting for completion..."
-                        )
-
-                        # Wait for this job to complete
-                        with log_collapsed(f"Waiting for job {job_id}| Batch {batch_num}"):
-                            completed_job = self.wait_for_job(job_id)
-
-                        all_jobs.append(
-                            {
-                                "batch": batch_num,
-                                "job_id": job_id,
-                                "state": completed_job.get("state", "unknown"),
-                                "posts_in_batch": len(batch),
-                                "submitted": len(batch_posts),
-                                "error": completed_job.get("error"),
-                            }
-                        )
-
-                        total_submitted += len(batch_posts)
-                        break
-
-                except JobCreationFailed:
-                    logging.error(f"Batch {batch_num}: Job creation failed")
-                    break
-                except Exception as e:
-                    traceback.print_exc()
-                    logging.error(f"Batch {batch_num}: Unexpected error: {e}")
-                    continue
-            else:
-                # All retries failed
-                all_jobs.append(
-                    {
-                        "batch": batch_num,
-                        "job_id": None,
-                        "state": "failed",
-                        "posts_in_batch": len(batch),
-                        "submitted": 0,
-                        "error": "Failed to submit job after retries",
-                    }
-                )
-
-        # Determine overall success
-        success = all(job.get("state") in ["processed", "skipped"] for job in all_jobs)
-        error = next((job.get("error") for job in all_jobs if job.get("error")), None)
-
-        return {
-            "feed_id": feed_id,
-            "posts_count": total_posts,
-            "jobs": all_jobs,
-            "success": success,
-            "error": error,
-            "submitted_posts": total_submitted,
-            "failed_posts": all_failed_posts,
-        }
+        steps = bulk_upload_steps(feed_id, orig_posts, posts_per_job, deadline)
+        step, result = next_upload_step(steps)
+        while step is not None:
+            outcome = error = None
+            try:
+                with log_collapsed(step.title), metrics.stage(step.stage):
+                    if step.stage == "submit":
+                        outcome = self._submit_posts(feed_id, profile_id, step.posts)
+                    else:
+                        outcome = self.wait_for_job(step.job_id, timeout=step.timeout)
+            except Exception as e:
+                error = e
+            step, result = next_upload_step(steps, outcome, error)
+        return result
+
+    def _encode_payload(self, payload: Dict) -> tuple[bytes, Dict]:
+        """Serialize a request payload, gzip-compressing it if enabled."""
+        return encode_request_body(
+            payload, self.gzip_level if self.gzip_requests else None
+        )
 
     def _submit_posts(
         self, feed_id: str, profile_id: Optional[str], posts: List[Dict]
@@ -309,11 +606,15 @@ class ObstractsAPIClient:
 
         # Prepare payload
         payload = {"posts": posts, "profile_id": profile_id}
-        logging.debug(f"Submitting posts to {endpoint}, payload: {payload}")
-        response = self.session.post(endpoint, json=payload)
+        logging.debug("Submitting posts to %s, payload: %s", endpoint, payload)
+        body, headers = self._encode_payload(payload)
+        response = self._request(
+            "POST", endpoint, "api_submit", data=body, headers=headers
+        )
         failed_posts = []
 
-        logging.debug(f"SUBMIT POSTS RESPONSE, {response} {response.text}")
+        if logging.getLogger().isEnabledFor(logging.DEBUG):
+            logging.debug("SUBMIT POSTS RESPONSE, %s %s", response, response.text)
 
         if response.ok:
             job_data = response.json()
@@ -326,28 +627,9 @@ class ObstractsAPIClient:
             logging.error(
                 f"Some errors encountered while submitting posts: {response.text}"
             )
-            error_data = response.json().get("details", {})
-            if not isinstance(error_data.get("posts"), dict):
-                raise JobCreationFailed(error_data)
-            is_true_fail = False
-            for index, error in error_data["posts"].items():
-                index = int(index)
-                post = posts[index]
-                failed_posts.append(
-                    {"url": post.pop("link"), "errors": error, "meta": post}
-                )
-                if "already exists" not in str(error):
-                    is_true_fail = True
-            if is_true_fail:
-                raise JobCreationFailed(error_data)
-            i = 0
-            while i < len(posts):
-                post = posts[i]
-                if "link" not in post:
-                    # remove failed posts before retry
-                    posts.remove(post)
-                    continue
-                i += 1
+            failed_posts = collect_failed_posts(
+                posts, response.json().get("details", {})
+            )
         return None, failed_posts
 
     def get_feed_details(self, feed_id: str) -> Optional[Dict]:
@@ -362,7 +644,7 @@ class ObstractsAPIClient:
         endpoint = f"{self.base_url}/v1/feeds/{feed_id}/"
 
         try:
-            response = self.session.get(endpoint)
+            response = self._request("GET", endpoint, "api_feed")
             if response.ok:
                 data = response.json()
                 return data.get("obstract_feed_metadata", data)
@@ -377,86 +659,368 @@ class ObstractsAPIClient:
             return None
 
 
-def load_config(config_path: str) -> Dict:
-    """
-    Load configuration from JSON file.
-
-    Args:
-        config_path: Path to the configuration JSON file
+class AsyncObstractsAPIClient:
+    """Asyncio client for the Obstracts API, built on aiohttp.
 
-    Returns:
-        Configuration dictionary
+    Mirrors ObstractsAPIClient with coroutine methods, so many feeds can be
+    submitted and polled concurrently from one event loop over one
+    connection pool. Use it as an async context manager, or call close().
     """
-    try:
-        with open(config_path, "r", encoding="utf-8") as f:
-            config = json.load(f)
-        logging.info(f"Loaded configuration from {config_path}")
-        return config
-    except FileNotFoundError:
-        logging.error(f"Configuration file not found: {config_path}")
-        sys.exit(1)
-    except json.JSONDecodeError as e:
-        logging.error(f"Invalid JSON in configuration file: {e}")
-        sys.exit(1)
 
+    def __init__(
+        self,
+        base_url: str,
+        api_key: str,
+        gzip_requests: bool = False,
+        gzip_level: int = DEFAULT_GZIP_LEVEL,
+        pool_size: int = DEFAULT_API_POOL_SIZE,
+    ):
+        """
+        Initialize the async Obstracts API client.
 
-def validate_config(config: Dict) -> bool:
-    """
-    Validate configuration to ensure all required fields are present.
+        Args:
+            base_url: Base URL for the Obstracts API
+            api_key: API key for authentication
+            gzip_requests: Send bulk request bodies gzip-compressed (default: False)
+            gzip_level: Compression level used when gzip_requests is enabled
+            pool_size: Number of connections kept open to the API
+        """
+        import_aiohttp()  # fail early when aiohttp is missing
+        self.base_url = base_url.rstrip("/")
+        self.api_key = api_key
+        self.gzip_requests = gzip_requests
+        self.gzip_level = gzip_level
+        self.pool_size = pool_size
+        self.session = None
+
+    def _get_session(self):
+        # aiohttp sessions must be created inside the running event loop
+        if self.session is None:
+            aiohttp = import_aiohttp()
+            self.session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.pool_size),
+                headers={
+                    "Authorization": "Token " + self.api_key,
+                    "Content-Type": "application/json",
+                },
+            )
+        return self.session
 
-    Args:
-        config: Configuration dictionary (single feed)
+    @contextlib.asynccontextmanager
+    async def _request(self, method: str, url: str, kind: str, **kwargs):
+        """
+        Send a request to the API and record it in the run metrics.
 
-    Returns:
-        True if valid, exits with error if invalid
-    """
-    # Configuration should be a single feed object, not an array
-    if "feeds" in config:
-        logging.error("Configuration should contain a single feed, not a 'feeds' array")
-        return False
+        The body is read before the response is yielded, so the recorded
+        latency and size cover the whole response.
 
-    # Check for required fields
-    if not config.get("feed_id"):
-        logging.error("Missing required field 'feed_id'")
-        return False
+        Args:
+            method: HTTP method
+            url: Request URL
+            kind: Metrics request kind, e.g. "api_submit"
+            **kwargs: Passed to aiohttp.ClientSession.request
 
-    if not config.get("blog_url"):
-        logging.error("Missing required field 'blog_url'")
-        return False
+        Yields:
+            The aiohttp response
+        """
+        sent = len(kwargs.get("data") or b"")
+        status, received, elapsed = "error", 0, None
+        start = time.perf_counter()
+        try:
+            async with self._get_session().request(method, url, **kwargs) as response:
+                received = len(await response.read())
+                status, elapsed = response.status, time.perf_counter() - start
+                yield response
+        finally:
+            if elapsed is None:
+                elapsed = time.perf_counter() - start
+            metrics.record_request(kind, status, elapsed, received=received, sent=sent)
+
+    async def close(self):
+        """Close the underlying aiohttp session."""
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def wait_for_job(
+        self, job_id: str, poll_interval: int = 5, timeout: float = DEFAULT_JOB_TIMEOUT
+    ) -> Dict:
+        """
+        Wait for a job to complete by polling its status.
 
-    if not config.get("profile_id"):
-        logging.error("Missing required field 'profile_id'")
-        return False
+        Args:
+            job_id: The ID of the job to wait for
+            poll_interval: Seconds between status checks (default: 5)
+            timeout: Maximum time to wait in seconds (default: DEFAULT_JOB_TIMEOUT)
 
-    logging.info(
-        f"Configuration validated successfully for feed: {config.get('feed_id')}"
-    )
-    return True
+        Returns:
+            Job details dictionary
+        """
+        aiohttp = import_aiohttp()
+        endpoint = f"{self.base_url}/v1/jobs/{job_id}/"
+        start_time = time.time()
 
-def extract_date_from_post(post: Dict, preferred_date: str) -> Optional[datetime]:
-    """
-    Extract date from post based on preferred_date order.
+        logging.info(f"Waiting for job {job_id} to complete...")
 
-    Args:
-        post: Post dictionary from sitemap2posts
-        preferred_date: String like 'LHPM' where:
-            L = lastmod (from sitemap)
-            H = htmldate (extracted from HTML content)
-            P = publish_date (from article metadata)
-            M = modified_header (from HTTP Last-Modified header)
+        # The job is polled at least once, even with a timeout of 0
+        while True:
+            try:
+                async with self._request("GET", endpoint, "api_job") as response:
+                    if response.ok:
+                        job_data = await response.json()
+                        state = job_data.get("state")
+                        logging.debug(f"Job {job_id} state: {state}")
+
+                        if state in ["processed", "failed"]:
+                            logging.info(f"Job {job_id} completed with state: {state}")
+                            return job_data
+                    else:
+                        logging.error(
+                            f"Failed to get job status for {job_id}: "
+                            f"Status {response.status}, Response: {await response.text()}"
+                        )
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                logging.error(f"Error polling job {job_id}: {e}")
 
-    Returns:
-        datetime object or None
-    """
-    date_map = {
-        "L": "lastmod",
-        "H": "htmldate",
-        "P": "publish_date",
-        "M": "modified_header",
-    }
+            elapsed = time.time() - start_time
+            if elapsed >= timeout:
+                logging.error(f"Job {job_id} timed out after {timeout} seconds")
+                return {
+                    "id": job_id,
+                    "state": "timeout",
+                    "error": f"Job polling timed out after {timeout} seconds",
+                }
+            await asyncio.sleep(min(poll_interval, timeout - elapsed))
 
-    for char in preferred_date.upper():
-        if char not in date_map:
+    async def create_posts_bulk(
+        self,
+        feed_id: str,
+        profile_id: Optional[str],
+        orig_posts: List[Dict],
+        posts_per_job: Optional[int] = None,
+        deadline: Optional[float] = None,
+    ) -> Dict:
+        """
+        Create multiple posts in a feed using bulk requests with optional batching.
+
+        Batches are submitted one after another, with the same batching,
+        retries and results as ObstractsAPIClient.create_posts_bulk (both run
+        bulk_upload_steps); concurrency comes from running several feeds at once.
+
+        Args:
+            feed_id: The ID of the feed to post to
+            profile_id: Optional profile ID to associate with posts
+            orig_posts: List of post dictionaries
+            posts_per_job: Maximum number of posts per job (None = no batching)
+            deadline: Optional time.monotonic() deadline; later batches are deferred,
+                and so is a batch whose job is still running when it passes
+
+        Returns:
+            Dictionary with job results. pending_links lists the links of posts
+            whose batch was deferred or not processed.
+        """
+        steps = bulk_upload_steps(feed_id, orig_posts, posts_per_job, deadline)
+        step, result = next_upload_step(steps)
+        while step is not None:
+            outcome = error = None
+            try:
+                with metrics.stage(step.stage):
+                    if step.stage == "submit":
+                        outcome = await self._submit_posts(feed_id, profile_id, step.posts)
+                    else:
+                        outcome = await self.wait_for_job(step.job_id, timeout=step.timeout)
+            except Exception as e:
+                error = e
+            step, result = next_upload_step(steps, outcome, error)
+        return result
+
+    async def _submit_posts(
+        self, feed_id: str, profile_id: Optional[str], posts: List[Dict]
+    ) -> tuple[Optional[Dict], list[Dict]]:
+        endpoint = f"{self.base_url}/v1/feeds/{feed_id}/posts/"
+
+        payload = {"posts": posts, "profile_id": profile_id}
+        logging.debug("Submitting posts to %s, payload: %s", endpoint, payload)
+        body, headers = encode_request_body(
+            payload, self.gzip_level if self.gzip_requests else None
+        )
+        async with self._request(
+            "POST", endpoint, "api_submit", data=body, headers=headers
+        ) as response:
+            text = await response.text()
+            logging.debug("SUBMIT POSTS RESPONSE, %s %s", response.status, text)
+
+            if response.ok:
+                job_data = json.loads(text)
+                logging.info(
+                    f"Successfully submitted job for feed {feed_id}, job_id: {job_data['id']}"
+                )
+                return job_data, None
+            if response.status == 400:
+                logging.error(f"Some errors encountered while submitting posts: {text}")
+                return None, collect_failed_posts(
+                    posts, json.loads(text).get("details", {})
+                )
+        return None, []
+
+    async def get_feed_details(self, feed_id: str) -> Optional[Dict]:
+        """
+        Retrieve feed details from the Obstracts API.
+
+        Args:
+            feed_id: The ID of the feed to retrieve
+        Returns:
+            Feed details dictionary if successful, None otherwise
+        """
+        aiohttp = import_aiohttp()
+        endpoint = f"{self.base_url}/v1/feeds/{feed_id}/"
+
+        try:
+            async with self._request("GET", endpoint, "api_feed") as response:
+                if response.ok:
+                    data = await response.json()
+                    return data.get("obstract_feed_metadata", data)
+                logging.error(
+                    f"Failed to retrieve feed {feed_id}: "
+                    f"Status {response.status}, Response: {await response.text()}"
+                )
+                return None
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            logging.error(f"Error retrieving feed {feed_id}: {e}")
+            return None
+
+
+def load_config(config_path: str) -> Optional[Dict]:
+    """
+    Load configuration from JSON file.
+
+    Args:
+        config_path: Path to the configuration JSON file
+
+    Returns:
+        Configuration dictionary, or None if the file is missing or invalid
+    """
+    try:
+        with open(config_path, "r", encoding="utf-8") as f:
+            config = json.load(f)
+        logging.info(f"Loaded configuration from {config_path}")
+        return config
+    except FileNotFoundError:
+        logging.error(f"Configuration file not found: {config_path}")
+        return None
+    except json.JSONDecodeError as e:
+        logging.error(f"Invalid JSON in configuration file {config_path}: {e}")
+        return None
+
+
+def validate_config(config: Dict) -> bool:
+    """
+    Validate configuration to ensure all required fields are present.
+
+    Args:
+        config: Configuration dictionary (single feed)
+
+    Returns:
+        True if valid, exits with error if invalid
+    """
+    # Configuration should be a single feed object, not an array
+    if "feeds" in config:
+        logging.error("Configuration should contain a single feed, not a 'feeds' array")
+        return False
+
+    # Check for required fields
+    if not config.get("feed_id"):
+        logging.error("Missing required field 'feed_id'")
+        return False
+
+    if not config.get("blog_url"):
+        logging.error("Missing required field 'blog_url'")
+        return False
+
+    if not config.get("profile_id"):
+        logging.error("Missing required field 'profile_id'")
+        return False
+
+    stop_after_older = config.get("stop_after_older_posts")
+    if stop_after_older is not None and not (
+        isinstance(stop_after_older, int) and stop_after_older > 0
+    ):
+        logging.error("'stop_after_older_posts' must be a positive integer")
+        return False
+
+    canonical_rules = config.get("url_canonical_rules")
+    if canonical_rules is not None and (
+        not isinstance(canonical_rules, list)
+        or not set(canonical_rules) <= set(URL_CANONICAL_RULES)
+    ):
+        logging.error(
+            f"'url_canonical_rules' must be a list of: {', '.join(URL_CANONICAL_RULES)}"
+        )
+        return False
+
+    url_time_budget = config.get("url_time_budget")
+    if url_time_budget is not None and not (
+        isinstance(url_time_budget, (int, float))
+        and not isinstance(url_time_budget, bool)
+        and url_time_budget > 0
+    ):
+        logging.error("'url_time_budget' must be a positive number of seconds")
+        return False
+
+    for key in ("max_body_size", "host_timeout_limit"):
+        value = config.get(key)
+        if value is not None and not (
+            isinstance(value, int) and not isinstance(value, bool) and value > 0
+        ):
+            logging.error(f"'{key}' must be a positive integer")
+            return False
+
+    url_date_patterns = config.get("url_date_patterns")
+    if url_date_patterns is not None:
+        if not isinstance(url_date_patterns, list):
+            logging.error("'url_date_patterns' must be a list of regular expressions")
+            return False
+        try:
+            compile_url_date_patterns(url_date_patterns)
+        except ValueError as e:
+            logging.error(str(e))
+            return False
+
+    logging.info(
+        f"Configuration validated successfully for feed: {config.get('feed_id')}"
+    )
+    return True
+
+def extract_date_from_post(post: Dict, preferred_date: str) -> Optional[datetime]:
+    """
+    Extract date from post based on preferred_date order.
+
+    Args:
+        post: Post dictionary from sitemap2posts
+        preferred_date: String like 'LHPM' where:
+            L = lastmod (from sitemap)
+            H = htmldate (extracted from HTML content)
+            P = publish_date (from article metadata)
+            M = modified_header (from HTTP Last-Modified header)
+
+    Returns:
+        datetime object or None
+    """
+    date_map = {
+        "L": "lastmod",
+        "H": "htmldate",
+        "P": "publish_date",
+        "M": "modified_header",
+    }
+
+    for char in preferred_date.upper():
+        if char not in date_map:
             continue
 
         field = date_map[char]
@@ -496,20 +1060,19 @@ def prepare_post_data(post: Dict, omit_author: bool) -> Dict:
     return data
 
 
-def process_feed(
-    feed_config: Dict,
-    api_client: ObstractsAPIClient,
-    posts_per_job: Optional[int] = None,
-) -> Dict:
+def plan_feed_sync(
+    feed_config: Dict, feed_details: Optional[Dict]
+) -> tuple[Optional[Dict], Optional[datetime], Optional[Dict]]:
     """
-    Process a single feed configuration.
+    Validate a feed and work out how to crawl it.
 
     Args:
         feed_config: Feed configuration dictionary
-        api_client: Obstracts API client
+        feed_details: Feed details from the Obstracts API (None if unavailable)
 
     Returns:
-        Statistics dictionary with job info
+        Tuple of (sitemap2posts keyword arguments, minimum post date, error
+        result). The error result is None when the feed can be crawled.
     """
     feed_id = feed_config.get("feed_id")
     blog_url = feed_config.get("blog_url")
@@ -521,10 +1084,9 @@ def process_feed(
     )
     use_robots_txt = feed_config.get("use_robots_txt")
 
-    feed_details = api_client.get_feed_details(feed_id)  # Ensure feed exists
     if not feed_details:
         logging.error(f"Feed {feed_id}: Could not retrieve feed details from API")
-        return {
+        return None, None, {
             "feed_id": feed_id,
             "posts_count": 0,
             "job_id": None,
@@ -535,7 +1097,7 @@ def process_feed(
     # Validate required fields
     if not blog_url:
         logging.error(f"Feed {feed_id}: Missing required field 'blog_url'")
-        return {
+        return None, None, {
             "feed_id": feed_id,
             "posts_count": 0,
             "job_id": None,
@@ -545,7 +1107,7 @@ def process_feed(
 
     if not profile_id:
         logging.error(f"Feed {feed_id}: Missing required field 'profile_id'")
-        return {
+        return None, None, {
             "feed_id": feed_id,
             "posts_count": 0,
             "job_id": None,
@@ -555,7 +1117,7 @@ def process_feed(
 
     if use_robots_txt is None:
         logging.error(f"Feed {feed_id}: Missing required field 'use_robots_txt'")
-        return {
+        return None, None, {
             "feed_id": feed_id,
             "posts_count": 0,
             "job_id": None,
@@ -604,9 +1166,8 @@ def process_feed(
         # don't use lastmod if it's not the preferred date filter
         lastmod_min_date = None
 
-    # Fetch posts from sitemap
-    posts = sitemap2posts(
-        blog_url,
+    crawl_kwargs = dict(
+        blog_url=blog_url,
         sitemap_urls=sitemap_urls,
         sitemap_allow_list=sitemap_allow_list,
         use_robots_txt=use_robots_txt,
@@ -617,9 +1178,62 @@ def process_feed(
         remove_404_records=feed_config.get("remove_404_records", False),
     )
 
+    if feed_config.get("url_canonical_rules") is not None:
+        crawl_kwargs["canonical_rules"] = tuple(feed_config["url_canonical_rules"])
+
+    # Skip URLs whose path dates them before the cutoff, without fetching them
+    if feed_config.get("url_date_patterns"):
+        crawl_kwargs["url_date_patterns"] = compile_url_date_patterns(
+            feed_config["url_date_patterns"]
+        )
+    elif feed_config.get("url_date_filter"):
+        crawl_kwargs["url_date_patterns"] = URL_DATE_PATTERNS
+
+    # Keep a few pathological pages or a failing host from stretching the run
+    if any(
+        feed_config.get(key)
+        for key in ("url_time_budget", "max_body_size", "host_timeout_limit")
+    ):
+        crawl_kwargs["fetch_limits"] = FetchLimits(
+            url_time_budget=feed_config.get("url_time_budget"),
+            max_body_bytes=feed_config.get("max_body_size"),
+            host_timeout_limit=feed_config.get("host_timeout_limit"),
+        )
+
+    # Incremental mode: fetch newest first and stop once posts are older than the feed
+    stop_after_older = feed_config.get("stop_after_older_posts")
+    if stop_after_older and lastmod_min_date:
+        preferred_date = feed_config.get("preferred_date", DEFAULT_PREFERRED_DATE)
+        logging.info(
+            f"Stopping after {stop_after_older} consecutive posts older than {lastmod_min_date.isoformat()}"
+        )
+        crawl_kwargs.update(
+            stop_after_older=stop_after_older,
+            post_date=lambda post: extract_date_from_post(post, preferred_date),
+        )
+    return crawl_kwargs, lastmod_min_date, None
+
+
+def select_posts_for_upload(
+    feed_config: Dict, posts: List[Dict], lastmod_min_date: Optional[datetime]
+) -> tuple[List[Dict], Optional[Dict]]:
+    """
+    Date and filter crawled posts and convert them for the Obstracts API.
+
+    Args:
+        feed_config: Feed configuration dictionary
+        posts: Posts returned by sitemap2posts
+        lastmod_min_date: Minimum post date from plan_feed_sync
+
+    Returns:
+        Tuple of (API posts, result). The result is set, and the list empty,
+        when there is nothing to upload.
+    """
+    feed_id = feed_config.get("feed_id")
+
     if not posts:
         logging.warning(f"Feed {feed_id}: No posts found")
-        return {
+        return [], {
             "feed_id": feed_id,
             "posts_count": 0,
             "job_id": None,
@@ -635,6 +1249,7 @@ def process_feed(
 
     # Get omit_author configuration (default to False)
     omit_author = feed_config.get("omit_author", DEFAULT_OMIT_AUTHOR)
+    use_date_filter = feed_config.get("use_date_filter", DEFAULT_USE_DATE_FILTER)
 
     # Extract dates and filter posts by lastmod_min using the extracted date
     posts_with_dates = []
@@ -655,7 +1270,7 @@ def process_feed(
 
     if not posts_with_dates:
         logging.warning(f"Feed {feed_id}: No posts remaining after date filtering")
-        return {
+        return [], {
             "feed_id": feed_id,
             "posts_count": 0,
             "job_id": None,
@@ -666,57 +1281,182 @@ def process_feed(
     logging.info(f"{len(posts_with_dates)} posts remaining after date filtering")
 
     # Prepare posts for API using the preferred_date order
-    api_posts = [prepare_post_data(post, omit_author) for post in posts_with_dates]
-
-    # Upload posts to Obstracts with optional batching
-    return api_client.create_posts_bulk(feed_id, profile_id, api_posts, posts_per_job)
+    return [prepare_post_data(post, omit_author) for post in posts_with_dates], None
 
 
-def sync_feeds(config_path: str, posts_per_job: Optional[int] = None):
+def process_feed(
+    feed_config: Dict,
+    api_client: ObstractsAPIClient,
+    posts_per_job: Optional[int] = None,
+    budget: Optional[TimeBudget] = None,
+    checkpoint: Optional[Dict] = None,
+) -> Dict:
     """
-    Synchronize a single feed from the configuration file.
+    Process a single feed configuration.
+
+    With a time budget, fetching stops when only the upload reserve is left,
+    and batches that no longer fit are deferred. The result then carries a
+    checkpoint (the date cutoff used plus every URL already handled) from
+    which the next run resumes instead of starting over.
 
     Args:
-        config_path: Path to the configuration JSON file (containing a single feed)
+        feed_config: Feed configuration dictionary
+        api_client: Obstracts API client
+        posts_per_job: Maximum number of posts per job
+        budget: Optional wall-clock budget shared by all feeds of the run
+        checkpoint: Checkpoint left by an interrupted run of this feed
+
+    Returns:
+        Statistics dictionary with job info. "checkpoint" is the checkpoint
+        to store (None once the feed is complete) and "stage_durations" the
+        seconds this feed spent per metrics stage.
     """
-    # Initialize GitHub Actions output
-    gh_output = GitHubActionsOutput()
+    stage_durations = {}
+    with metrics.collect_stages(stage_durations):
+        result = _process_feed(feed_config, api_client, posts_per_job, budget, checkpoint)
+    result["stage_durations"] = stage_durations
+    return result
 
-    # Load configuration
-    feed_config = load_config(config_path)
 
-    # Validate configuration
-    if not validate_config(feed_config):
-        error_msg = "Configuration validation failed. Please check the errors above."
-        logging.error(error_msg)
-        gh_output.add_summary(f"## ❌ Configuration Error\n\n{error_msg}")
-        gh_output.write_summary()
-        sys.exit(1)
+def _process_feed(
+    feed_config: Dict,
+    api_client: ObstractsAPIClient,
+    posts_per_job: Optional[int],
+    budget: Optional[TimeBudget],
+    checkpoint: Optional[Dict],
+) -> Dict:
+    feed_id = feed_config.get("feed_id")
+    if budget is not None and budget.crawl_remaining() <= 0:
+        logging.warning(f"Feed {feed_id}: Time budget exhausted, skipping until next run")
+        result = {
+            "feed_id": feed_id,
+            "posts_count": 0,
+            "job_id": None,
+            "success": True,
+            "message": "Skipped, time budget exhausted",
+            "partial": True,
+        }
+        if checkpoint:
+            result["checkpoint"] = checkpoint
+        return result
+
+    with metrics.stage("plan"):
+        feed_details = api_client.get_feed_details(feed_id)  # Ensure feed exists
+        crawl_kwargs, lastmod_min_date, result = plan_feed_sync(feed_config, feed_details)
+    if result:
+        return result
+
+    done_urls = set()
+    if checkpoint:
+        # Keep the cutoff of the interrupted run: the API's latest_item_pubdate
+        # may already include posts uploaded by it
+        done_urls = set(checkpoint.get("done_urls", []))
+        lastmod_min_date = checkpoint.get("lastmod_min")
+        if lastmod_min_date:
+            lastmod_min_date = datetime.fromisoformat(lastmod_min_date)
+        crawl_kwargs["lastmod_min"] = lastmod_min_date
+        crawl_kwargs["exclude_urls"] = done_urls
+        logging.info(
+            f"Feed {feed_id}: Resuming interrupted sync, {len(done_urls)} URLs already done"
+        )
 
-    # Get API credentials from environment
-    api_base_url = os.getenv("OBSTRACTS_API_BASE_URL")
-    api_key = os.getenv("OBSTRACTS_API_KEY")
+    # Fetch posts from sitemap, stopping early if the crawl budget runs out
+    cancel_event = threading.Event()
+    timer = None
+    if budget is not None:
+        timer = threading.Timer(budget.crawl_remaining(), cancel_event.set)
+        timer.daemon = True
+        timer.start()
+    try:
+        posts = list(iter_posts(cancel_event=cancel_event, **crawl_kwargs))
+    finally:
+        if timer is not None:
+            timer.cancel()
+    partial = cancel_event.is_set()
+    if partial:
+        logging.warning(
+            f"Feed {feed_id}: Time budget for crawling exhausted after {len(posts)} posts"
+        )
 
-    if not api_base_url or not api_key:
-        error_msg = (
-            "Missing required environment variables: "
-            "`OBSTRACTS_API_BASE_URL` and/or `OBSTRACTS_API_KEY`"
+    with metrics.stage("select"):
+        api_posts, result = select_posts_for_upload(feed_config, posts, lastmod_min_date)
+    if not result:
+        # Upload posts to Obstracts with optional batching
+        result = api_client.create_posts_bulk(
+            feed_id,
+            feed_config.get("profile_id"),
+            api_posts,
+            posts_per_job,
+            deadline=budget.deadline if budget is not None else None,
         )
-        logging.error(error_msg)
-        gh_output.add_summary(f"## ❌ Error\n\n{error_msg}")
-        gh_output.write_summary()
-        sys.exit(1)
 
-    logging.info(f"Using Obstracts API: {api_base_url}")
+    pending_links = set(result.get("pending_links", []))
+    partial = partial or any(job.get("state") == "deferred" for job in result.get("jobs", []))
+    result["partial"] = partial
+    if partial or (checkpoint and not result["success"]):
+        done_urls.update(post["url"] for post in posts if post["url"] not in pending_links)
+        result["checkpoint"] = {
+            "lastmod_min": lastmod_min_date.isoformat() if lastmod_min_date else None,
+            "done_urls": sorted(done_urls),
+        }
+    else:
+        result["checkpoint"] = None
+    return result
 
-    # Initialize API client
-    api_client = ObstractsAPIClient(api_base_url, api_key)
 
-    # Get feed_id for logging
+async def async_process_feed(
+    feed_config: Dict,
+    api_client: "AsyncObstractsAPIClient",
+    posts_per_job: Optional[int] = None,
+    session=None,
+) -> Dict:
+    """
+    Async variant of process_feed.
+
+    Args:
+        feed_config: Feed configuration dictionary
+        api_client: Async Obstracts API client
+        posts_per_job: Maximum number of posts per job
+        session: Optional aiohttp session shared with other feeds for crawling
+
+    Returns:
+        Statistics dictionary with job info
+    """
     feed_id = feed_config.get("feed_id")
-    logging.info(f"Processing feed: {feed_id}")
 
-    feed_name = feed_config.get("name", os.path.basename(config_path))
+    feed_details = await api_client.get_feed_details(feed_id)  # Ensure feed exists
+    crawl_kwargs, lastmod_min_date, result = plan_feed_sync(feed_config, feed_details)
+    if result:
+        return result
+
+    # Fetch posts from sitemap
+    posts = await async_sitemap2posts(session=session, **crawl_kwargs)
+
+    api_posts, result = select_posts_for_upload(feed_config, posts, lastmod_min_date)
+    if result:
+        return result
+
+    # Upload posts to Obstracts with optional batching
+    return await api_client.create_posts_bulk(
+        feed_id, feed_config.get("profile_id"), api_posts, posts_per_job
+    )
+
+
+def write_feed_summary(
+    gh_output: GitHubActionsOutput, feed_name: str, feed_id: str, result: Dict
+):
+    """
+    Add the report for one synced feed to a GitHub Actions summary.
+
+    Args:
+        gh_output: GitHub Actions output handler to add the report to
+        feed_name: Human-readable feed name
+        feed_id: The ID of the synced feed
+        result: Result dictionary returned by process_feed
+    """
+    total_posts = result["posts_count"]
+    submitted_posts = result.get("submitted_posts", 0)
+
     # Add GitHub Actions summary header
     gh_output.add_summary(f"# 🔄 Feed Sync Report: {feed_name}\n")
     gh_output.add_summary(
@@ -725,24 +1465,6 @@ def sync_feeds(config_path: str, posts_per_job: Optional[int] = None):
     gh_output.add_summary(f"**Feed ID:** `{feed_id}`\n")
     gh_output.add_summary("---\n")
 
-    # Process the feed
-    try:
-        result = process_feed(feed_config, api_client, posts_per_job)
-    except Exception as e:
-        logging.exception(f"Feed {feed_id}: Sync failed")
-        result = {
-            "feed_id": feed_id,
-            "posts_count": 0,
-            "job_id": None,
-            "success": False,
-            "error": format_exception_message(e),
-            "jobs": [],
-            "submitted_posts": 0,
-        }
-
-    total_posts = result["posts_count"]
-    submitted_posts = result.get("submitted_posts", 0)
-
     # Add to GitHub Actions summary
     status_icon = "✅" if result["success"] else "❌"
     gh_output.add_summary(f"\n## {status_icon} Feed: `{result['feed_id']}`\n\n")
@@ -791,6 +1513,8 @@ def sync_feeds(config_path: str, posts_per_job: Optional[int] = None):
                 state_display = "❌ failed"
             elif state == "skipped":
                 state_display = "⏭️ skipped"
+            elif state == "deferred":
+                state_display = "⏱️ deferred"
             else:
                 state_display = state
 
@@ -815,12 +1539,65 @@ def sync_feeds(config_path: str, posts_per_job: Optional[int] = None):
     gh_output.add_summary(
         f"- **Status:** {'✅ Success' if result['success'] else '❌ Failed'}\n"
     )
+    if result.get("partial"):
+        gh_output.add_summary(
+            "- **Time Budget:** ⏱️ exhausted, partial sync; the next run resumes from the checkpoint\n"
+        )
+
+
+def sync_feed(
+    config_path: str,
+    feed_config: Dict,
+    api_client: ObstractsAPIClient,
+    posts_per_job: Optional[int] = None,
+    budget: Optional[TimeBudget] = None,
+    checkpoint: Optional[Dict] = None,
+) -> Dict:
+    """
+    Synchronize a single, already validated feed and write its summary.
+
+    Args:
+        config_path: Path the feed configuration was loaded from
+        feed_config: Feed configuration dictionary
+        api_client: Obstracts API client (may be shared between feeds)
+        posts_per_job: Maximum number of posts per job
+        budget: Optional wall-clock budget shared by all feeds of the run
+        checkpoint: Checkpoint left by an interrupted run of this feed
+
+    Returns:
+        Result dictionary from process_feed, with name, config_path and duration added
+    """
+    gh_output = GitHubActionsOutput()
+    start_time = time.monotonic()
+
+    # Get feed_id for logging
+    feed_id = feed_config.get("feed_id")
+    logging.info(f"Processing feed: {feed_id}")
+
+    feed_name = feed_config.get("name", os.path.basename(config_path))
+
+    # Process the feed
+    try:
+        result = process_feed(
+            feed_config, api_client, posts_per_job, budget=budget, checkpoint=checkpoint
+        )
+    except Exception as e:
+        logging.exception(f"Feed {feed_id}: Sync failed")
+        result = {
+            "feed_id": feed_id,
+            "posts_count": 0,
+            "job_id": None,
+            "success": False,
+            "error": format_exception_message(e),
+            "jobs": [],
+            "submitted_posts": 0,
+        }
+
+    result["name"] = feed_name
+    result["config_path"] = config_path
+    result["duration"] = time.monotonic() - start_time
 
-    # Set GitHub Actions outputs
-    gh_output.set_output("posts_found", str(total_posts))
-    gh_output.set_output("posts_submitted", str(submitted_posts))
-    gh_output.set_output("success", str(result["success"]).lower())
-    gh_output.set_output("feed_id", feed_id)
+    write_feed_summary(gh_output, feed_name, feed_id, result)
 
     # Write GitHub Actions summary
     gh_output.write_summary()
@@ -829,41 +1606,718 @@ def sync_feeds(config_path: str, posts_per_job: Optional[int] = None):
     logging.info("=" * 60)
     logging.info("SYNC COMPLETE")
     logging.info(f"Feed ID: {feed_id}")
-    logging.info(f"Posts fetched: {total_posts}")
-    logging.info(f"Posts submitted: {submitted_posts}")
+    logging.info(f"Posts fetched: {result['posts_count']}")
+    logging.info(f"Posts submitted: {result.get('submitted_posts', 0)}")
     logging.info(f"Status: {'Success' if result['success'] else 'Failed'}")
+    if result.get("stage_durations"):
+        stages = ", ".join(
+            f"{stage} {seconds:.1f}s" for stage, seconds in result["stage_durations"].items()
+        )
+        logging.info(f"Stage durations: {stages}")
+    if result.get("partial"):
+        logging.info("Partial sync: the next run resumes from the checkpoint")
     logging.info("=" * 60)
 
-    # Exit with error code if feed failed
-    if not result["success"]:
+    return result
+
+
+def write_run_summary(
+    gh_output: GitHubActionsOutput, results: List[Dict], invalid_configs: List[str]
+):
+    """
+    Add an overview table for a multi-feed run to a GitHub Actions summary.
+
+    Args:
+        gh_output: GitHub Actions output handler to add the overview to
+        results: Result dictionaries returned by sync_feed
+        invalid_configs: Config paths that failed loading or validation
+    """
+    succeeded = sum(1 for result in results if result["success"])
+    gh_output.add_summary(f"# 📦 Multi-Feed Sync: {succeeded}/{len(results)} succeeded\n")
+    gh_output.add_summary("| Feed | Status | Posts Found | Posts Submitted | Duration |")
+    gh_output.add_summary("|------|--------|-------------|-----------------|----------|")
+    for result in results:
+        status = "✅" if result["success"] else "❌"
+        gh_output.add_summary(
+            f"| {result['name']} | {status} | {result['posts_count']} "
+            f"| {result.get('submitted_posts', 0)} | {result['duration']:.1f}s |"
+        )
+    for config_path in invalid_configs:
+        gh_output.add_summary(f"| `{config_path}` | ❌ invalid config | 0 | 0 | - |")
+    gh_output.add_summary("\n")
+
+
+def format_bytes(size: float) -> str:
+    """Format a byte count for humans, e.g. 1.5 MiB."""
+    for unit in ["B", "KiB", "MiB"]:
+        if size < 1024:
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GiB"
+
+
+def write_metrics_summary(gh_output: GitHubActionsOutput, snapshot: Dict):
+    """
+    Add the run metrics (stage times, requests, extraction CPU) to a GitHub Actions summary.
+
+    Args:
+        gh_output: GitHub Actions output handler to add the metrics to
+        snapshot: Metrics snapshot from sitemap2posts.metrics.snapshot()
+    """
+    gh_output.add_summary("## ⏱️ Run Metrics\n")
+    gh_output.add_summary(
+        "Stage times are summed over feeds, so concurrent feeds can add up to more than the run.\n"
+    )
+    if snapshot["stage_seconds"]:
+        gh_output.add_summary("| Stage | Seconds |")
+        gh_output.add_summary("|-------|---------|")
+        for stage, seconds in snapshot["stage_seconds"].items():
+            gh_output.add_summary(f"| {stage} | {seconds:.1f} |")
+        gh_output.add_summary("\n")
+
+    if snapshot["requests"]:
+        gh_output.add_summary("| Requests | Count | Statuses | Received | Sent | p50 | p95 |")
+        gh_output.add_summary("|----------|-------|----------|----------|------|-----|-----|")
+        for kind, entry in snapshot["requests"].items():
+            statuses = ", ".join(
+                f"{status}: {count}" for status, count in entry["statuses"].items()
+            )
+            gh_output.add_summary(
+                f"| {kind} | {entry['count']} | {statuses} "
+                f"| {format_bytes(entry['bytes_received'])} | {format_bytes(entry['bytes_sent'])} "
+                f"| {entry['latency_p50']:.2f}s | {entry['latency_p95']:.2f}s |"
+            )
+        gh_output.add_summary("\n")
+
+    extracted = snapshot["counters"].get("posts_extracted", 0)
+    extract_cpu = snapshot["cpu_seconds"].get("extract", 0.0)
+    if extracted:
+        gh_output.add_summary(
+            f"- **Extraction CPU:** {extract_cpu:.1f}s for {extracted} posts "
+            f"({1000 * extract_cpu / extracted:.0f} ms/post)\n"
+        )
+    counters = snapshot["counters"]
+    gh_output.add_summary(
+        f"- **Sitemap Cache Hits:** {counters.get('sitemap_cache_hits', 0)}\n"
+    )
+    dns_lookups = counters.get("dns_cache_hits", 0) + counters.get("dns_cache_misses", 0)
+    if dns_lookups:
+        gh_output.add_summary(
+            f"- **DNS Cache Hits:** {counters.get('dns_cache_hits', 0)}/{dns_lookups} new connections\n"
+        )
+    tls_connections = counters.get("tls_sessions_resumed", 0) + counters.get("tls_full_handshakes", 0)
+    if tls_connections:
+        gh_output.add_summary(
+            f"- **TLS Sessions Resumed:** {counters.get('tls_sessions_resumed', 0)}/{tls_connections} new connections\n"
+        )
+
+    limited = {
+        host: totals
+        for host, totals in snapshot["hosts"].items()
+        if totals["timeouts"] or totals["too_large"] or totals["skipped"]
+    }
+    if limited:
+        gh_output.add_summary("| Host | URLs | Seconds | Timeouts | Too Large | Skipped |")
+        gh_output.add_summary("|------|------|---------|----------|-----------|---------|")
+        for host, totals in limited.items():
+            gh_output.add_summary(
+                f"| {host} | {totals['urls']} | {totals['seconds']:.1f} | {totals['timeouts']} "
+                f"| {totals['too_large']} | {totals['skipped']} |"
+            )
+        gh_output.add_summary("\n")
+
+    if snapshot["slowest_urls"]:
+        gh_output.add_summary("### 🐢 Slowest URLs\n")
+        gh_output.add_summary("| URL | Status | Time | Size | Extraction |")
+        gh_output.add_summary("|-----|--------|------|------|------------|")
+        for entry in snapshot["slowest_urls"]:
+            extract = entry["extract_seconds"]
+            gh_output.add_summary(
+                f"| {entry['url']} | {entry['status']} | {entry['seconds']:.2f}s "
+                f"| {format_bytes(entry['bytes'])} | {f'{extract:.2f}s' if extract is not None else '-'} |"
+            )
+        gh_output.add_summary("\n")
+
+
+def write_profile_summary(gh_output: GitHubActionsOutput, summary: Dict):
+    """
+    Add the top functions and allocation sites of every profiled stage to a GitHub Actions summary.
+
+    Args:
+        gh_output: GitHub Actions output handler to add the profile to
+        summary: Profile summary from sitemap2posts.profiler.summary()
+    """
+    gh_output.add_summary("## 🔬 Profile\n")
+    for stage, entry in summary.items():
+        peak = entry.get("peak_bytes")
+        title = f"{stage}: {entry.get('total_seconds', 0):.1f}s profiled"
+        if peak is not None:
+            title += f", peak {format_bytes(peak)}"
+        gh_output.add_summary(f"<details><summary>{title}</summary>\n")
+        if entry.get("functions"):
+            gh_output.add_summary("| Function | Calls | Own | Cumulative |")
+            gh_output.add_summary("|----------|-------|-----|------------|")
+            for function in entry["functions"]:
+                gh_output.add_summary(
+                    f"| `{function['function']}` | {function['calls']} "
+                    f"| {function['own_seconds']:.3f}s | {function['cumulative_seconds']:.3f}s |"
+                )
+            gh_output.add_summary("\n")
+        if entry.get("allocations"):
+            gh_output.add_summary("| Allocated at | Size | Blocks |")
+            gh_output.add_summary("|--------------|------|--------|")
+            for allocation in entry["allocations"]:
+                gh_output.add_summary(
+                    f"| `{allocation['line']}` | {format_bytes(allocation['bytes'])} | {allocation['count']} |"
+                )
+            gh_output.add_summary("\n")
+        gh_output.add_summary("</details>\n")
+
+
+def write_metrics_file(metrics_file: str):
+    """
+    Write the run metrics to a JSON file, or a Prometheus textfile if it ends in .prom.
+
+    Args:
+        metrics_file: Path to write to
+    """
+    try:
+        metrics.write(metrics_file, prefix="obstracts_sync")
+    except IOError as e:
+        logging.error(f"Failed to write metrics file {metrics_file}: {e}")
+
+
+def update_stats_file(
+    stats_path: str, results: List[Dict], history: int = DEFAULT_STATS_HISTORY
+):
+    """
+    Append per-feed run duration and post counts to a JSON stats file.
+
+    The file is read by obstracts/discover_feeds.py --shards to balance
+    feeds across matrix jobs by expected cost. It also holds the checkpoints
+    of feeds interrupted by --time-budget.
+
+    Args:
+        stats_path: Path to the stats JSON file (created if missing)
+        results: Result dictionaries returned by sync_feed
+        history: Number of most recent runs to keep per feed
+    """
+    try:
+        with open(stats_path, "r", encoding="utf-8") as f:
+            stats = json.load(f)
+    except FileNotFoundError:
+        stats = {}
+    except (json.JSONDecodeError, IOError) as e:
+        logging.warning(f"Ignoring unreadable stats file {stats_path}: {e}")
+        stats = {}
+
+    feeds = stats.setdefault("feeds", {})
+    checkpoints = stats.setdefault("checkpoints", {})
+    finished = datetime.now(timezone.utc).isoformat()
+    for result in results:
+        config_key = os.path.normpath(result["config_path"])
+        records = feeds.setdefault(config_key, [])
+        records.append(
+            {
+                "finished": finished,
+                "duration": round(result["duration"], 3),
+                "posts": result["posts_count"],
+                "success": result["success"],
+            }
+        )
+        del records[:-history]
+
+        # A completed feed leaves a marker so merging stats from several
+        # jobs drops older checkpoints of it
+        if "checkpoint" in result:
+            checkpoint = result["checkpoint"] or {"complete": True}
+            checkpoints[config_key] = {"updated": finished, **checkpoint}
+
+    tmp_path = f"{stats_path}.tmp"
+    try:
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(stats, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, stats_path)
+        logging.info(f"Run stats written to {stats_path}")
+    except IOError as e:
+        logging.error(f"Failed to write stats file {stats_path}: {e}")
+
+
+def load_checkpoints(stats_path: str) -> Dict[str, Dict]:
+    """
+    Read the checkpoints of interrupted feed syncs from a stats file.
+
+    Args:
+        stats_path: Path to the stats JSON file written by update_stats_file
+
+    Returns:
+        Dictionary mapping normalized config paths to unfinished checkpoints
+    """
+    try:
+        with open(stats_path, "r", encoding="utf-8") as f:
+            stats = json.load(f)
+    except FileNotFoundError:
+        return {}
+    except (json.JSONDecodeError, IOError) as e:
+        logging.warning(f"Ignoring unreadable stats file {stats_path}: {e}")
+        return {}
+
+    return {
+        config_key: checkpoint
+        for config_key, checkpoint in stats.get("checkpoints", {}).items()
+        if not checkpoint.get("complete")
+    }
+
+
+def load_matrix_config_paths(matrix_path: str) -> List[str]:
+    """
+    Read config paths from the matrix JSON printed by obstracts/discover_feeds.py.
+
+    Args:
+        matrix_path: Path to the matrix JSON file, or '-' to read from stdin
+
+    Returns:
+        List of config paths in matrix order
+    """
+    if matrix_path == "-":
+        text = sys.stdin.read()
+    else:
+        with open(matrix_path, "r", encoding="utf-8") as f:
+            text = f.read()
+
+    # Accept the --github-output form (matrix=...) as well as plain JSON
+    text = text.strip()
+    if text.startswith("matrix="):
+        text = text[len("matrix=") :]
+    matrix = json.loads(text)
+
+    entries = matrix.get("include", []) if isinstance(matrix, dict) else matrix
+    config_paths = []
+    for entry in entries:
+        config_paths.extend(entry.get("config_paths") or [entry["config_path"]])
+    return config_paths
+
+
+def create_api_client(
+    gh_output: GitHubActionsOutput,
+    gzip_requests: bool = False,
+    pool_size: int = DEFAULT_API_POOL_SIZE,
+) -> ObstractsAPIClient:
+    """
+    Create an Obstracts API client from the environment, exiting if unconfigured.
+
+    Args:
+        gh_output: GitHub Actions output handler for the error summary
+        gzip_requests: Send bulk request bodies gzip-compressed
+        pool_size: Connections kept open to the Obstracts API
+
+    Returns:
+        Configured ObstractsAPIClient instance
+    """
+    # Get API credentials from environment
+    api_base_url = os.getenv("OBSTRACTS_API_BASE_URL")
+    api_key = os.getenv("OBSTRACTS_API_KEY")
+
+    if not api_base_url or not api_key:
+        error_msg = (
+            "Missing required environment variables: "
+            "`OBSTRACTS_API_BASE_URL` and/or `OBSTRACTS_API_KEY`"
+        )
+        logging.error(error_msg)
+        gh_output.add_summary(f"## ❌ Error\n\n{error_msg}")
+        gh_output.write_summary()
+        sys.exit(1)
+
+    logging.info(f"Using Obstracts API: {api_base_url}")
+    return ObstractsAPIClient(
+        api_base_url, api_key, gzip_requests=gzip_requests, pool_size=pool_size
+    )
+
+
+def sync_feeds(
+    config_paths: List[str],
+    posts_per_job: Optional[int] = None,
+    gzip_requests: bool = False,
+    max_concurrent_feeds: int = 1,
+    max_concurrent_requests: Optional[int] = None,
+    dns_ttl: float = DEFAULT_DNS_TTL,
+    stats_file: Optional[str] = None,
+    time_budget: Optional[float] = None,
+    upload_reserve: float = DEFAULT_UPLOAD_RESERVE,
+    metrics_file: Optional[str] = None,
+    profile_dir: Optional[str] = None,
+    profile_top: int = DEFAULT_PROFILE_TOP,
+):
+    """
+    Synchronize one or more feeds from configuration files.
+
+    All feeds share one Obstracts API client and the sitemap2posts HTTP
+    session and caches. Each feed still gets its own summary.
+
+    With a time budget, feeds interrupted by it are checkpointed in the stats
+    file, and resumed from there by the next run.
+
+    Args:
+        config_paths: Paths to configuration JSON files (each containing a single feed)
+        posts_per_job: Maximum number of posts per job
+        gzip_requests: Send bulk request bodies gzip-compressed
+        max_concurrent_feeds: Number of feeds synced at the same time
+        max_concurrent_requests: Cap on in-flight sitemap/article requests across all feeds
+        dns_ttl: Seconds resolved host addresses are reused for new connections (0 = no cache)
+        stats_file: Optional JSON file to record per-feed run duration and post counts in
+        time_budget: Optional wall-clock budget in seconds for the whole run
+        upload_reserve: Seconds of the budget kept for uploading fetched posts
+        metrics_file: Optional file for the run metrics (JSON, or Prometheus textfile for *.prom)
+        profile_dir: Optional directory for per-stage cProfile and tracemalloc profiles
+        profile_top: Functions and allocation sites listed per stage in the profile summary
+    """
+    budget = TimeBudget(time_budget, upload_reserve) if time_budget else None
+    if isinstance(config_paths, str):
+        config_paths = [config_paths]
+
+    # Initialize GitHub Actions output
+    gh_output = GitHubActionsOutput()
+
+    # Load and validate every configuration up front
+    feeds = []
+    invalid_configs = []
+    for config_path in config_paths:
+        feed_config = load_config(config_path)
+        if feed_config is not None and validate_config(feed_config):
+            feeds.append((config_path, feed_config))
+        else:
+            invalid_configs.append(config_path)
+
+    if invalid_configs:
+        error_msg = "Configuration validation failed. Please check the errors above."
+        logging.error(error_msg)
+        details = "".join(f"\n- `{path}`" for path in invalid_configs)
+        gh_output.add_summary(f"## ❌ Configuration Error\n\n{error_msg}\n{details}\n")
+        gh_output.write_summary()
+        gh_output.summary_lines = []
+        if not feeds:
+            sys.exit(1)
+
+    # Initialize API client, shared by all feeds
+    api_client = create_api_client(
+        gh_output,
+        gzip_requests=gzip_requests,
+        pool_size=max(max_concurrent_feeds, DEFAULT_API_POOL_SIZE),
+    )
+    set_max_concurrent_requests(max_concurrent_requests)
+    set_dns_ttl(dns_ttl)
+    checkpoints = load_checkpoints(stats_file) if stats_file else {}
+    metrics.reset()
+    if profile_dir:
+        profiler.enable(profile_top)
+
+    def run(feed):
+        config_path, feed_config = feed
+        return sync_feed(
+            config_path,
+            feed_config,
+            api_client,
+            posts_per_job,
+            budget=budget,
+            checkpoint=checkpoints.get(os.path.normpath(config_path)),
+        )
+
+    if len(feeds) == 1 and not invalid_configs:
+        result = run(feeds[0])
+
+        # Set GitHub Actions outputs
+        gh_output.set_output("posts_found", str(result["posts_count"]))
+        gh_output.set_output("posts_submitted", str(result.get("submitted_posts", 0)))
+        gh_output.set_output("success", str(result["success"]).lower())
+        gh_output.set_output("feed_id", result["feed_id"])
+        results = [result]
+
+        write_metrics_summary(gh_output, metrics.snapshot())
+        if profile_dir:
+            write_profile_summary(gh_output, profiler.write(profile_dir))
+        gh_output.write_summary()
+    else:
+        logging.info(
+            f"Syncing {len(feeds)} feeds, up to {max_concurrent_feeds} at a time"
+        )
+        set_log_groups(max_concurrent_feeds == 1)
+        with ThreadPoolExecutor(
+            max_workers=max_concurrent_feeds, thread_name_prefix="feed"
+        ) as executor:
+            results = list(executor.map(run, feeds))
+
+        write_run_summary(gh_output, results, invalid_configs)
+        write_metrics_summary(gh_output, metrics.snapshot())
+        if profile_dir:
+            write_profile_summary(gh_output, profiler.write(profile_dir))
+        gh_output.write_summary()
+
+        success = not invalid_configs and all(r["success"] for r in results)
+        gh_output.set_output(
+            "posts_found", str(sum(r["posts_count"] for r in results))
+        )
+        gh_output.set_output(
+            "posts_submitted", str(sum(r.get("submitted_posts", 0) for r in results))
+        )
+        gh_output.set_output("success", str(success).lower())
+        gh_output.set_output("feeds_synced", str(len(results)))
+
+    if stats_file:
+        update_stats_file(stats_file, results)
+    if metrics_file:
+        write_metrics_file(metrics_file)
+
+    # Exit with error code if any feed failed
+    if invalid_configs or not all(result["success"] for result in results):
         sys.exit(1)
 
 
+def next_sync_interval(
+    state: Dict,
+    result: Dict,
+    now: float,
+    min_interval: float = DEFAULT_DAEMON_MIN_INTERVAL,
+    max_interval: float = DEFAULT_DAEMON_MAX_INTERVAL,
+) -> float:
+    """
+    Update a feed's daemon state after a run and pick the delay before the next one.
+
+    The posting rate is an exponentially weighted average of new posts per
+    second between successful runs. The interval aims at about one new post
+    per run, so busy feeds are polled often and quiet ones back off.
+
+    Args:
+        state: Per-feed scheduler state, updated in place
+        result: Result dictionary returned by sync_feed
+        now: Monotonic time the run finished at
+        min_interval: Shortest interval in seconds
+        max_interval: Longest interval in seconds
+
+    Returns:
+        Seconds until the feed should be synced again, before jitter
+    """
+    if not result["success"]:
+        # Retry failed feeds soon, without touching the observed rate
+        return min_interval
+
+    last_success = state.get("last_success")
+    state["last_success"] = now
+    if last_success is None:
+        # The first run also picks up the backlog, so it says nothing about the rate
+        state["interval"] = min_interval
+        return min_interval
+
+    observed_rate = result.get("submitted_posts", 0) / max(now - last_success, 1.0)
+    rate = state.get("rate")
+    if rate is None:
+        rate = observed_rate
+    else:
+        rate = DEFAULT_RATE_SMOOTHING * observed_rate + (1 - DEFAULT_RATE_SMOOTHING) * rate
+    state["rate"] = rate
+
+    if rate > 0:
+        interval = 1 / rate
+    else:
+        interval = state.get("interval", min_interval) * 2
+    interval = max(min_interval, min(max_interval, interval))
+    state["interval"] = interval
+    return interval
+
+
+def sync_feed_from_path(
+    config_path: str, api_client: ObstractsAPIClient, posts_per_job: Optional[int] = None
+) -> Dict:
+    """
+    Load, validate and synchronize a single feed configuration file.
+
+    Args:
+        config_path: Path to the feed configuration JSON file
+        api_client: Obstracts API client (may be shared between feeds)
+        posts_per_job: Maximum number of posts per job
+
+    Returns:
+        Result dictionary from sync_feed, or a failed result for an invalid config
+    """
+    feed_config = load_config(config_path)
+    if feed_config is None or not validate_config(feed_config):
+        return {
+            "feed_id": None,
+            "posts_count": 0,
+            "job_id": None,
+            "success": False,
+            "error": "Invalid configuration",
+            "jobs": [],
+            "submitted_posts": 0,
+            "name": os.path.basename(config_path),
+            "config_path": config_path,
+            "duration": 0.0,
+        }
+    return sync_feed(config_path, feed_config, api_client, posts_per_job)
+
+
+def run_daemon(
+    config_paths: List[str],
+    posts_per_job: Optional[int] = None,
+    gzip_requests: bool = False,
+    max_concurrent_feeds: int = 1,
+    max_concurrent_requests: Optional[int] = None,
+    dns_ttl: float = DEFAULT_DNS_TTL,
+    stats_file: Optional[str] = None,
+    min_interval: float = DEFAULT_DAEMON_MIN_INTERVAL,
+    max_interval: float = DEFAULT_DAEMON_MAX_INTERVAL,
+    jitter: float = DEFAULT_DAEMON_JITTER,
+    metrics_file: Optional[str] = None,
+):
+    """
+    Keep synchronizing feeds, each on its own adaptive interval, until stopped.
+
+    The HTTP session, sitemap cache and API client stay warm between runs.
+    Configs are re-read before every run, so edits apply without a restart.
+    SIGINT/SIGTERM stop scheduling new runs and wait for running feeds.
+
+    Args:
+        config_paths: Paths to configuration JSON files (each containing a single feed)
+        posts_per_job: Maximum number of posts per job
+        gzip_requests: Send bulk request bodies gzip-compressed
+        max_concurrent_feeds: Number of feeds synced at the same time
+        max_concurrent_requests: Cap on in-flight sitemap/article requests across all feeds
+        dns_ttl: Seconds resolved host addresses are reused for new connections (0 = no cache)
+        stats_file: Optional JSON file to record per-feed run duration and post counts in
+        min_interval: Shortest interval between runs of one feed, in seconds
+        max_interval: Longest interval between runs of one feed, in seconds
+        jitter: Random +/- fraction applied to every interval
+        metrics_file: Optional file for the metrics since the daemon started,
+            rewritten after every run (JSON, or Prometheus textfile for *.prom)
+    """
+    gh_output = GitHubActionsOutput()
+    api_client = create_api_client(
+        gh_output,
+        gzip_requests=gzip_requests,
+        pool_size=max(max_concurrent_feeds, DEFAULT_API_POOL_SIZE),
+    )
+    set_max_concurrent_requests(max_concurrent_requests)
+    set_dns_ttl(dns_ttl)
+    set_log_groups(max_concurrent_feeds == 1)
+
+    stop_event = threading.Event()
+
+    def request_stop(signum, frame):
+        logging.info(f"Received signal {signum}, stopping after running feeds finish")
+        stop_event.set()
+
+    signal.signal(signal.SIGINT, request_stop)
+    signal.signal(signal.SIGTERM, request_stop)
+
+    # Spread the first runs over a fraction of the shortest interval
+    now = time.monotonic()
+    schedule = [
+        (now + random.uniform(0, jitter * min_interval), config_path)
+        for config_path in config_paths
+    ]
+    heapq.heapify(schedule)
+    states = {config_path: {} for config_path in config_paths}
+    running = {}
+
+    logging.info(
+        f"Daemon started with {len(config_paths)} feeds, "
+        f"intervals {min_interval:.0f}s-{max_interval:.0f}s, "
+        f"up to {max_concurrent_feeds} at a time"
+    )
+
+    with ThreadPoolExecutor(
+        max_workers=max_concurrent_feeds, thread_name_prefix="feed"
+    ) as executor:
+        while not stop_event.is_set() or running:
+            now = time.monotonic()
+            while (
+                not stop_event.is_set()
+                and schedule
+                and schedule[0][0] <= now
+                and len(running) < max_concurrent_feeds
+            ):
+                _, config_path = heapq.heappop(schedule)
+                future = executor.submit(
+                    sync_feed_from_path, config_path, api_client, posts_per_job
+                )
+                running[future] = config_path
+
+            # Sleep until the next feed is due, a run finishes or a stop is requested
+            timeout = 1.0
+            if not stop_event.is_set() and schedule and len(running) < max_concurrent_feeds:
+                timeout = min(timeout, max(schedule[0][0] - now, 0))
+            if running:
+                done, _ = wait(running, timeout=timeout, return_when=FIRST_COMPLETED)
+            else:
+                stop_event.wait(timeout)
+                done = set()
+
+            finished = []
+            for future in done:
+                config_path = running.pop(future)
+                result = future.result()
+                finished.append(result)
+                interval = next_sync_interval(
+                    states[config_path],
+                    result,
+                    time.monotonic(),
+                    min_interval=min_interval,
+                    max_interval=max_interval,
+                )
+                interval *= random.uniform(1 - jitter, 1 + jitter)
+                heapq.heappush(schedule, (time.monotonic() + interval, config_path))
+                logging.info(
+                    f"Next sync of {result['name']} in {interval / 60:.1f} minutes"
+                )
+
+            if finished and stats_file:
+                update_stats_file(stats_file, finished)
+            if finished and metrics_file:
+                write_metrics_file(metrics_file)
+
+    logging.info("Daemon stopped")
+
+
 def main():
     """Main entry point."""
     parser = argparse.ArgumentParser(
-        description="Synchronize blog posts from a sitemap to an Obstracts feed. Processes one feed per run.",
+        description="Synchronize blog posts from sitemaps to Obstracts feeds. Processes one or more feed configs per run.",
         formatter_class=argparse.RawDescriptionHelpFormatter,
         epilog="""
 Environment Variables:
   OBSTRACTS_API_BASE_URL    Base URL for the Obstracts API
   OBSTRACTS_API_KEY         API key for authentication
 
-Example:
+Examples:
   export OBSTRACTS_API_BASE_URL="https://management.obstracts.staging.signalscorps.com/obstracts_api"
   export OBSTRACTS_API_KEY="your-api-key"
-  python obstracts_sync.py feed_config.json
+  python obstracts_sync.py feed_config.json --posts-per-job 64
+
+  # Sync many feeds in one process, 4 at a time
+  python obstracts_sync.py obstracts/config/main/*.json --posts-per-job 64 --max-concurrent-feeds 4
 
-Note: This script processes ONE feed per run. Use GitHub Actions matrix 
-strategy or run multiple times with different config files to process 
-multiple feeds in parallel.
+  # Sync every feed found by discover_feeds.py
+  python obstracts/discover_feeds.py --include main | python obstracts_sync.py --from-matrix - --posts-per-job 64
+
+  # Keep running, syncing each feed on an interval adapted to how often it posts
+  python obstracts_sync.py obstracts/config/main/*.json --posts-per-job 64 --daemon --max-concurrent-feeds 4
+
+Note: With several configs, feeds share one HTTP connection pool, one
+Obstracts API session and the sitemap cache. Each feed still gets its
+own summary, and the run exits non-zero if any feed fails.
         """,
     )
 
     parser.add_argument(
         "config",
         type=str,
-        help="Path to the feed configuration JSON file (single feed)",
+        nargs="*",
+        help="Path(s) to feed configuration JSON files (one feed per file)",
+    )
+
+    parser.add_argument(
+        "--from-matrix",
+        metavar="FILE",
+        help="Read config paths from the matrix JSON printed by obstracts/discover_feeds.py ('-' for stdin)",
     )
 
     parser.add_argument(
@@ -880,14 +2334,164 @@ multiple feeds in parallel.
         help="Maximum number of posts to send per job (default: no batching, all posts in one job)",
     )
 
+    parser.add_argument(
+        "--gzip-requests",
+        action="store_true",
+        help="Gzip-compress bulk post request bodies (Content-Encoding: gzip)",
+    )
+
+    parser.add_argument(
+        "--max-concurrent-feeds",
+        type=int,
+        default=1,
+        help="Number of feeds to sync at the same time when several configs are given (default: 1)",
+    )
+
+    parser.add_argument(
+        "--max-concurrent-requests",
+        type=int,
+        default=None,
+        help="Global cap on in-flight sitemap/article requests across all feeds (default: no cap)",
+    )
+
+    parser.add_argument(
+        "--dns-ttl",
+        type=float,
+        default=DEFAULT_DNS_TTL,
+        metavar="SECONDS",
+        help=f"Reuse resolved host addresses for new connections for this long, across all feeds; 0 resolves every time (default: {DEFAULT_DNS_TTL})",
+    )
+
+    parser.add_argument(
+        "--stats-file",
+        metavar="FILE",
+        help="Record per-feed run duration and post counts in this JSON file (read by discover_feeds.py --shards)",
+    )
+
+    parser.add_argument(
+        "--time-budget",
+        type=float,
+        metavar="SECONDS",
+        help="Wall-clock budget for the run; when it runs out, fetched posts are uploaded and the rest is checkpointed in --stats-file for the next run",
+    )
+
+    parser.add_argument(
+        "--upload-reserve",
+        type=float,
+        default=DEFAULT_UPLOAD_RESERVE,
+        metavar="SECONDS",
+        help=f"Part of --time-budget kept for uploading once fetching stops (default: {DEFAULT_UPLOAD_RESERVE})",
+    )
+
+    parser.add_argument(
+        "--metrics-file",
+        metavar="FILE",
+        help="Write per-stage times, request counts, bytes, fetch latency p50/p95, cache hits and extraction CPU time to FILE: a Prometheus textfile if it ends in .prom, JSON otherwise",
+    )
+
+    parser.add_argument(
+        "--profile",
+        metavar="DIR",
+        help="Profile each stage with cProfile and tracemalloc; write the profiles and a top-N summary to DIR and add the summary to the job summary",
+    )
+
+    parser.add_argument(
+        "--profile-top",
+        type=int,
+        default=DEFAULT_PROFILE_TOP,
+        metavar="N",
+        help=f"Functions and allocation sites listed per stage in the --profile summary (default: {DEFAULT_PROFILE_TOP})",
+    )
+
+    parser.add_argument(
+        "--daemon",
+        action="store_true",
+        help="Keep running and sync each feed on its own interval, adapted to how often it posts",
+    )
+
+    parser.add_argument(
+        "--min-interval",
+        type=float,
+        default=DEFAULT_DAEMON_MIN_INTERVAL,
+        help=f"Daemon mode: shortest interval between syncs of one feed in seconds (default: {DEFAULT_DAEMON_MIN_INTERVAL})",
+    )
+
+    parser.add_argument(
+        "--max-interval",
+        type=float,
+        default=DEFAULT_DAEMON_MAX_INTERVAL,
+        help=f"Daemon mode: longest interval between syncs of one feed in seconds (default: {DEFAULT_DAEMON_MAX_INTERVAL})",
+    )
+
+    parser.add_argument(
+        "--jitter",
+        type=float,
+        default=DEFAULT_DAEMON_JITTER,
+        help=f"Daemon mode: random +/- fraction applied to every interval (default: {DEFAULT_DAEMON_JITTER})",
+    )
+
     args = parser.parse_args()
 
+    config_paths = list(args.config)
+    if args.from_matrix:
+        config_paths.extend(load_matrix_config_paths(args.from_matrix))
+    if not config_paths:
+        parser.error("at least one config path or --from-matrix is required")
+
     # Set logging level
     if args.verbose:
         logging.getLogger().setLevel(logging.DEBUG)
 
+    if args.time_budget is not None:
+        if args.daemon:
+            parser.error("--time-budget cannot be combined with --daemon")
+        if not args.stats_file:
+            parser.error("--time-budget requires --stats-file to keep checkpoints in")
+        if args.time_budget <= 0 or args.upload_reserve < 0:
+            parser.error("--time-budget must be positive and --upload-reserve not negative")
+
+    if args.profile_top < 1:
+        parser.error("--profile-top must be a positive count")
+    if args.dns_ttl < 0:
+        parser.error("--dns-ttl must not be negative")
+
+    if args.daemon:
+        if args.profile:
+            parser.error("--profile cannot be combined with --daemon")
+        if not 0 < args.min_interval <= args.max_interval:
+            parser.error("--min-interval must be positive and not above --max-interval")
+        if not 0 <= args.jitter < 1:
+            parser.error("--jitter must be between 0 and 1")
+        run_daemon(
+            list(dict.fromkeys(config_paths)),
+            args.posts_per_job,
+            gzip_requests=args.gzip_requests,
+            max_concurrent_feeds=args.max_concurrent_feeds,
+            max_concurrent_requests=args.max_concurrent_requests,
+            dns_ttl=args.dns_ttl,
+            stats_file=args.stats_file,
+            min_interval=args.min_interval,
+            max_interval=args.max_interval,
+            jitter=args.jitter,
+            metrics_file=args.metrics_file,
+        )
+        return
+
     # Run sync
-    sync_feeds(args.config, args.posts_per_job)
+    sync_feeds(
+        list(dict.fromkeys(config_paths)),
+        args.posts_per_job,
+        gzip_requests=args.gzip_requests,
+        max_concurrent_feeds=args.max_concurrent_feeds,
+        max_concurrent_requests=args.max_concurrent_requests,
+        dns_ttl=args.dns_ttl,
+        stats_file=args.stats_file,
+        time_budget=args.time_budget,
+        upload_reserve=args.upload_reserve,
+        metrics_file=args.metrics_file,
+        profile_dir=args.profile,
+        profile_top=args.profile_top,
+    )
 
 
 if __name__ == "__main__":
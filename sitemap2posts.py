@@ -1,19 +1,47 @@
-from functools import lru_cache
+import asyncio
+import contextlib
+import contextvars
+import cProfile
+import functools
+import gzip
+import heapq
+import io
+import os
+import pstats
+import socket
+import ssl
+import sys
+import threading
+import time
+import tracemalloc
+import uuid
+import zlib
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from typing import Optional
 
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.exceptions import ReadTimeoutError
+from urllib3.util.connection import allowed_gai_family
+from lxml import etree
 import json
-from urllib.parse import urljoin
+from urllib.parse import parse_qsl, urlencode, urljoin, urlparse, urlsplit, urlunsplit
 import re
 import argparse
 import logging
-from datetime import datetime, timezone
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta, timezone
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait,
+)
 from fnmatch import fnmatch
-from newspaper import Article
-from htmldate import find_date
 from email.utils import parsedate_to_datetime
-from dateutil.parser import parse as parse_dt
 
 # Set up logging
 logging.basicConfig(
@@ -22,23 +50,36 @@ logging.basicConfig(
 
 lastmod_default = datetime.now(timezone.utc)
 
-# Save the original default method
-JSONEncoder_olddefault = json.JSONEncoder.default
 DEFAULT_TIMEOUT = 20
-
-
-# Define the new default method
-def JSONEncoder_newdefault(self, obj):
+DEFAULT_POOL_SIZE = 32
+# Seconds the resolved addresses of a host are reused for new connections
+DEFAULT_DNS_TTL = 300
+# Article fetch threads, and how many fetches may be queued or running at once
+DEFAULT_FETCH_WORKERS = 10
+DEFAULT_MAX_IN_FLIGHT = 2 * DEFAULT_FETCH_WORKERS
+# Bytes read at a time when streaming a body
+FETCH_CHUNK_SIZE = 64 * 1024
+# gzip sitemaps: magic bytes, zlib window bits for the gzip header, and the
+# most XML inflated from one piece of compressed data at a time
+GZIP_MAGIC = b"\x1f\x8b"
+GZIP_WBITS = 16 + zlib.MAX_WBITS
+INFLATE_CHUNK_SIZE = 256 * 1024
+# Sitemap index and URL set entries
+ENTRY_TAGS = ("sitemap", "url")
+# Functions and allocation sites listed per stage by --profile
+DEFAULT_PROFILE_TOP = 25
+# Most URLs and child sitemaps kept by sitemap_cache, across all feeds
+DEFAULT_SITEMAP_CACHE_ITEMS = 200_000
+USER_AGENT = "Sitemap2post/0.0.1 (+https://github.com/muchdogesec/sitemap2posts)"
+
+
+def json_default(obj):
+    """json.dump() default= that writes datetimes as ISO 8601 (naive ones as UTC)."""
     if isinstance(obj, datetime):
         if obj.tzinfo is None:
             obj = obj.replace(tzinfo=timezone.utc)
         return obj.isoformat()
-    # Call the original method for other types
-    return JSONEncoder_olddefault(self, obj)
-
-
-# Replace the default method with the new one
-json.JSONEncoder.default = JSONEncoder_newdefault
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
 
 
 class FetchSitemapError(Exception):
@@ -54,22 +95,960 @@ def make_dt_utc(dt: datetime) -> datetime:
     return dt.astimezone(timezone.utc)
 
 
-def fetch_url(url, timeout=DEFAULT_TIMEOUT):
-    """Fetch URL with error handling."""
+@dataclass(slots=True)
+class UrlRecord:
+    """A post URL listed in a sitemap.
+
+    Records are slotted and share one interned string per sitemap and host,
+    so large sites cost one small object per URL.
+    """
+
+    url: str
+    lastmod: Optional[datetime]
+    sitemap: str
+    host: str = field(init=False)
+
+    def __post_init__(self):
+        self.sitemap = sys.intern(self.sitemap)
+        self.host = sys.intern(urlsplit(self.url).netloc)
+
+
+class ResponseCache:
+    """Thread-safe cache of parsed responses, revalidated with conditional requests.
+
+    Entries are only stored for responses carrying an ETag or Last-Modified
+    header, so a cached value is never served without asking the server first.
+    Each entry counts as size items (e.g. the URLs of a sitemap), and the
+    least recently used entries are dropped once more than max_items are
+    cached, so long-running processes do not keep every feed's URLs.
+    """
+
+    def __init__(self, max_items=DEFAULT_SITEMAP_CACHE_ITEMS):
+        self.max_items = max_items
+        self._entries = OrderedDict()
+        self._items = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def conditional_headers(self, url):
+        """Return If-None-Match / If-Modified-Since headers for a cached URL."""
+        with self._lock:
+            entry = self._entries.get(url)
+        if not entry:
+            return {}
+        headers = {}
+        if entry["etag"]:
+            headers["If-None-Match"] = entry["etag"]
+        if entry["last_modified"]:
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def lookup(self, url, response):
+        """Return the cached value if response is a 304 for a cached URL, else None."""
+        with self._lock:
+            entry = self._entries.get(url)
+            if entry and response.status_code == 304:
+                self._entries.move_to_end(url)
+                self.hits += 1
+                return entry["value"]
+            self.misses += 1
+        return None
+
+    def store(self, url, response, value, size=1):
+        """Cache value for url if the response can be revalidated later."""
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        with self._lock:
+            old = self._entries.pop(url, None)
+            if old:
+                self._items -= old["size"]
+            if not (etag or last_modified) or size > self.max_items:
+                return
+            self._entries[url] = {
+                "etag": etag,
+                "last_modified": last_modified,
+                "value": value,
+                "size": size,
+            }
+            self._items += size
+            while self._items > self.max_items:
+                _, evicted = self._entries.popitem(last=False)
+                self._items -= evicted["size"]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._items = 0
+
+
+sitemap_cache = ResponseCache()
+
+
+def percentile(values, fraction):
+    """Nearest-rank percentile of a list of numbers (None if empty)."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[max(0, min(len(ordered) - 1, round(fraction * len(ordered)) - 1))]
+
+
+# Up to Python 3.11 a cProfile.Profile only sees the thread that enabled it.
+# From 3.12 it is built on sys.monitoring: it sees every thread, and only one
+# can be enabled in the process at a time.
+PROFILE_PER_THREAD = sys.version_info < (3, 12)
+
+
+class StageProfiler:
+    """cProfile and tracemalloc profiles per pipeline stage, for --profile.
+
+    Up to Python 3.11, every thread working for a stage (the caller, fetch
+    workers, asyncio.to_thread workers) gets its own cProfile.Profile, and
+    they are merged per stage when written. Stages already being profiled
+    in a thread are not profiled again there, so overlapping async stages
+    count towards the first one. From 3.12, the profile of the calling
+    thread also sees its workers, and only one stage is profiled at a time
+    in the whole process: stages overlapping it (e.g. of concurrent feeds)
+    count towards it.
+
+    Memory peaks come from tracemalloc, which traces the whole process: with
+    concurrent feeds, a stage's peak includes whatever else was running.
+    The snapshot kept per stage is taken at the end of its biggest run.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.top = DEFAULT_PROFILE_TOP
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._profiles = []
+        self._stage_profiles = {}
+        self._process_active = False
+        self._memory = {}
+        self._memory_stages = 0
+
+    def enable(self, top=DEFAULT_PROFILE_TOP):
+        """Start profiling stages; top is the number of entries in summaries."""
+        self.top = top
+        self.enabled = True
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def disable(self):
+        self.enabled = False
+        tracemalloc.stop()
+
+    def _stage_profile(self, stage):
+        """The profile of stage for this thread (for the process from 3.12)."""
+        if PROFILE_PER_THREAD:
+            profiles = getattr(self._local, "profiles", None)
+            if profiles is None:
+                profiles = self._local.profiles = {}
+        else:
+            profiles = self._stage_profiles
+        with self._lock:
+            profile = profiles.get(stage)
+            if profile is None:
+                profile = profiles[stage] = cProfile.Profile()
+                self._profiles.append((stage, profile))
+        return profile
+
+    def _claim(self):
+        """Mark a profile as running in this thread (in the process from 3.12); False if one already is."""
+        if PROFILE_PER_THREAD:
+            if getattr(self._local, "active", False):
+                return False
+            self._local.active = True
+            return True
+        with self._lock:
+            if self._process_active:
+                return False
+            self._process_active = True
+            return True
+
+    def _release(self):
+        if PROFILE_PER_THREAD:
+            self._local.active = False
+        else:
+            with self._lock:
+                self._process_active = False
+
+    @contextlib.contextmanager
+    def profile(self, stage, memory=True):
+        """Profile the with block as part of stage (memory: also track its peak)."""
+        if not self.enabled or not self._claim():
+            yield
+            return
+
+        if memory:
+            with self._lock:
+                if not self._memory_stages:
+                    tracemalloc.reset_peak()
+                self._memory_stages += 1
+        profile = self._stage_profile(stage)
+        profile.enable()
+        try:
+            yield
+        finally:
+            profile.disable()
+            self._release()
+            if memory:
+                self._record_memory(stage)
+
+    def _record_memory(self, stage):
+        _, peak = tracemalloc.get_traced_memory()
+        with self._lock:
+            self._memory_stages -= 1
+            previous = self._memory.get(stage)
+            if previous is not None and previous[0] >= peak:
+                return
+        snapshot = tracemalloc.take_snapshot()
+        with self._lock:
+            previous = self._memory.get(stage)
+            if previous is None or previous[0] < peak:
+                self._memory[stage] = (peak, snapshot)
+
+    def wrap(self, stage, func):
+        """Return func profiled as part of stage when it runs, for worker threads.
+
+        From Python 3.12 the calling thread's profile already sees its
+        workers, so func is returned as it is.
+        """
+        if not self.enabled or not PROFILE_PER_THREAD:
+            return func
+
+        @functools.wraps(func)
+        def profiled(*args, **kwargs):
+            with self.profile(stage, memory=False):
+                return func(*args, **kwargs)
+
+        return profiled
+
+    def stats(self):
+        """Return the merged pstats.Stats of every stage."""
+        with self._lock:
+            profiles = list(self._profiles)
+        merged = {}
+        for stage, profile in profiles:
+            stats = pstats.Stats(profile)
+            if stage in merged:
+                merged[stage].add(stats)
+            else:
+                merged[stage] = stats
+        return merged
+
+    def summary(self):
+        """Return the top functions (by own time) and allocation sites of every stage."""
+        summary = {}
+        for stage, stats in self.stats().items():
+            functions = sorted(
+                stats.stats.items(), key=lambda item: item[1][2], reverse=True
+            )[: self.top]
+            summary[stage] = {
+                "total_seconds": round(stats.total_tt, 3),
+                "functions": [
+                    {
+                        "function": name
+                        if filename == "~"
+                        else f"{os.path.basename(filename)}:{line}({name})",
+                        "calls": calls,
+                        "own_seconds": round(own, 4),
+                        "cumulative_seconds": round(cumulative, 4),
+                    }
+                    for (filename, line, name), (_, calls, own, cumulative, _) in functions
+                ],
+            }
+        with self._lock:
+            memory = dict(self._memory)
+        for stage, (peak, snapshot) in memory.items():
+            entry = summary.setdefault(stage, {})
+            entry["peak_bytes"] = peak
+            entry["allocations"] = [
+                {
+                    "line": f"{statistic.traceback[0].filename}:{statistic.traceback[0].lineno}",
+                    "bytes": statistic.size,
+                    "count": statistic.count,
+                }
+                for statistic in snapshot.statistics("lineno")[: self.top]
+            ]
+        return summary
+
+    def write(self, directory):
+        """Write <stage>.prof, <stage>.tracemalloc, summary.json and summary.txt to directory.
+
+        .prof files load with pstats (or snakeviz); .tracemalloc files with
+        tracemalloc.Snapshot.load().
+        """
+        os.makedirs(directory, exist_ok=True)
+        text = io.StringIO()
+        for stage, stats in self.stats().items():
+            stats.dump_stats(os.path.join(directory, f"{stage}.prof"))
+            text.write(f"=== {stage}: top {self.top} functions by own time\n")
+            stats.stream = text
+            stats.sort_stats("tottime").print_stats(self.top)
+        with self._lock:
+            memory = dict(self._memory)
+        for stage, (peak, snapshot) in memory.items():
+            snapshot.dump(os.path.join(directory, f"{stage}.tracemalloc"))
+            text.write(f"=== {stage}: peak {peak / 2**20:.1f} MiB, live allocations at its end\n")
+            for statistic in snapshot.statistics("lineno")[: self.top]:
+                text.write(f"{statistic}\n")
+            text.write("\n")
+        summary = self.summary()
+        with open(os.path.join(directory, "summary.json"), "w", encoding="utf-8") as f:
+            json.dump(summary, f, indent=2)
+        with open(os.path.join(directory, "summary.txt"), "w", encoding="utf-8") as f:
+            f.write(text.getvalue())
+        logging.info(f"Profiles written to {directory}")
+        return summary
+
+
+# Disabled unless --profile is given
+profiler = StageProfiler()
+
+
+class RunMetrics:
+    """Thread-safe timings and counters for a run, across every feed crawled.
+
+    Stage times are wall-clock seconds summed over all calls, so stages of
+    feeds crawled concurrently can add up to more than the run took;
+    collect_stages() also gives the stage times of one feed.
+    Requests are grouped by kind (robots, sitemap, article, ...), with
+    status counts, body bytes and latency p50/p95 over the most recent
+    LATENCY_SAMPLES requests, so long-running processes stay bounded.
+    Article fetches are also tracked per URL: totals per host and the
+    SLOWEST_URLS slowest URLs, with their size and extraction time.
+    """
+
+    LATENCY_SAMPLES = 10000
+    SLOWEST_URLS = 10
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stage_collector = contextvars.ContextVar("stage_collector", default=None)
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.stage_seconds = {}
+            self.cpu_seconds = {}
+            self.counters = {}
+            self.requests = {}
+            self.hosts = {}
+            # Min-heap of (seconds, sequence, entry), so the fastest is evicted
+            self.slowest = []
+            self.url_sequence = 0
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        """Add the wall time of the with block to stage name (and profile it if enabled)."""
+        start = time.perf_counter()
+        try:
+            with profiler.profile(name):
+                yield
+        finally:
+            seconds = time.perf_counter() - start
+            self.add_stage(name, seconds)
+            durations = self._stage_collector.get()
+            if durations is not None:
+                durations[name] = durations.get(name, 0.0) + seconds
+
+    @contextlib.contextmanager
+    def collect_stages(self, durations):
+        """Also add the stage times of the with block (same thread or task) to durations."""
+        token = self._stage_collector.set(durations)
+        try:
+            yield durations
+        finally:
+            self._stage_collector.reset(token)
+
+    def add_stage(self, name, seconds):
+        with self._lock:
+            self.stage_seconds[name] = self.stage_seconds.get(name, 0.0) + seconds
+
+    def add_cpu(self, name, seconds):
+        with self._lock:
+            self.cpu_seconds[name] = self.cpu_seconds.get(name, 0.0) + seconds
+
+    def count(self, name, amount=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def record_request(self, kind, status, seconds, received=0, sent=0):
+        """Record one HTTP request; status is the status code or "error"."""
+        with self._lock:
+            entry = self.requests.get(kind)
+            if entry is None:
+                entry = self.requests[kind] = {
+                    "statuses": {},
+                    "bytes_received": 0,
+                    "bytes_sent": 0,
+                    "count": 0,
+                    "latencies": deque(maxlen=self.LATENCY_SAMPLES),
+                }
+            status = str(status)
+            entry["statuses"][status] = entry["statuses"].get(status, 0) + 1
+            entry["bytes_received"] += received
+            entry["bytes_sent"] += sent
+            entry["count"] += 1
+            entry["latencies"].append(seconds)
+
+    def record_url(self, url, host, seconds, status, size=0, extract_seconds=None):
+        """Record one article fetch; status is the status code or a fetch_error_status()."""
+        status = str(status)
+        with self._lock:
+            totals = self.hosts.get(host)
+            if totals is None:
+                totals = self.hosts[host] = {
+                    "urls": 0,
+                    "seconds": 0.0,
+                    "bytes": 0,
+                    "timeouts": 0,
+                    "too_large": 0,
+                    "skipped": 0,
+                }
+            totals["urls"] += 1
+            totals["seconds"] += seconds
+            totals["bytes"] += size
+            if status == "timeout":
+                totals["timeouts"] += 1
+            elif status in ("too_large", "skipped"):
+                totals[status] += 1
+
+            entry = {
+                "url": url,
+                "host": host,
+                "seconds": seconds,
+                "status": status,
+                "bytes": size,
+                "extract_seconds": extract_seconds,
+            }
+            self.url_sequence += 1
+            item = (seconds, self.url_sequence, entry)
+            if len(self.slowest) < self.SLOWEST_URLS:
+                heapq.heappush(self.slowest, item)
+            elif seconds > self.slowest[0][0]:
+                heapq.heapreplace(self.slowest, item)
+
+    def snapshot(self):
+        """Return the metrics as a JSON-serializable dict."""
+        with self._lock:
+            requests_by_kind = {
+                kind: {
+                    "count": entry["count"],
+                    "statuses": dict(sorted(entry["statuses"].items())),
+                    "bytes_received": entry["bytes_received"],
+                    "bytes_sent": entry["bytes_sent"],
+                    "latency_p50": percentile(entry["latencies"], 0.5),
+                    "latency_p95": percentile(entry["latencies"], 0.95),
+                }
+                for kind, entry in sorted(self.requests.items())
+            }
+            return {
+                "stage_seconds": dict(self.stage_seconds),
+                "cpu_seconds": dict(self.cpu_seconds),
+                "counters": dict(sorted(self.counters.items())),
+                "requests": requests_by_kind,
+                "hosts": {
+                    host: dict(totals)
+                    for host, totals in sorted(
+                        self.hosts.items(), key=lambda item: -item[1]["seconds"]
+                    )
+                },
+                "slowest_urls": [
+                    dict(entry) for _, _, entry in sorted(self.slowest, reverse=True)
+                ],
+            }
+
+    def to_prometheus(self, prefix="sitemap2posts"):
+        """Render the metrics in the Prometheus text exposition format."""
+        snapshot = self.snapshot()
+        lines = []
+
+        def metric(name, help_text, samples, kind="gauge"):
+            lines.append(f"# HELP {prefix}_{name} {help_text}")
+            lines.append(f"# TYPE {prefix}_{name} {kind}")
+            for labels, value in samples:
+                label_text = ",".join(f'{key}="{value}"' for key, value in labels.items())
+                lines.append(f"{prefix}_{name}{{{label_text}}} {value}")
+
+        requests_by_kind = snapshot["requests"]
+        metric(
+            "stage_seconds",
+            "Wall time per stage, summed over feeds",
+            [({"stage": stage}, seconds) for stage, seconds in snapshot["stage_seconds"].items()],
+        )
+        metric(
+            "cpu_seconds",
+            "Thread CPU time per task",
+            [({"task": task}, seconds) for task, seconds in snapshot["cpu_seconds"].items()],
+        )
+        metric(
+            "events_total",
+            "Event counters, e.g. cache hits",
+            [({"event": event}, count) for event, count in snapshot["counters"].items()],
+            "counter",
+        )
+        metric(
+            "requests_total",
+            "HTTP requests by kind and status",
+            [
+                ({"kind": kind, "status": status}, count)
+                for kind, entry in requests_by_kind.items()
+                for status, count in entry["statuses"].items()
+            ],
+            "counter",
+        )
+        metric(
+            "received_bytes_total",
+            "Response body bytes by request kind",
+            [({"kind": kind}, entry["bytes_received"]) for kind, entry in requests_by_kind.items()],
+            "counter",
+        )
+        metric(
+            "sent_bytes_total",
+            "Request body bytes by request kind",
+            [({"kind": kind}, entry["bytes_sent"]) for kind, entry in requests_by_kind.items()],
+            "counter",
+        )
+        metric(
+            "request_latency_seconds",
+            "Request latency percentiles by kind",
+            [
+                ({"kind": kind, "quantile": quantile}, entry[key])
+                for kind, entry in requests_by_kind.items()
+                for quantile, key in (("0.5", "latency_p50"), ("0.95", "latency_p95"))
+            ],
+        )
+        metric(
+            "limited_urls_total",
+            "Article fetches that timed out, were over the size limit or skipped",
+            [
+                ({"reason": reason}, sum(totals[key] for totals in snapshot["hosts"].values()))
+                for reason, key in (("timeout", "timeouts"), ("too_large", "too_large"), ("skipped", "skipped"))
+            ],
+            "counter",
+        )
+        return "\n".join(lines) + "\n"
+
+    def write(self, path, prefix="sitemap2posts"):
+        """Write the metrics to path: Prometheus textfile for *.prom, else JSON."""
+        if path.endswith(".prom"):
+            content = self.to_prometheus(prefix)
+        else:
+            content = json.dumps(self.snapshot(), indent=2) + "\n"
+        # Replace atomically, so a textfile collector never reads half a file
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(content)
+        os.replace(tmp_path, path)
+        logging.info(f"Metrics written to {path}")
+
+
+# Metrics of everything fetched and extracted by this process
+metrics = RunMetrics()
+
+
+class FetchLimitExceeded(RuntimeError):
+    """An article fetch was abandoned or skipped under FetchLimits.
+
+    status is "timeout", "too_large" or "skipped".
+    """
+
+    def __init__(self, message, status):
+        super().__init__(message)
+        self.status = status
+
+
+class FetchLimits:
+    """Outlier policies for article fetches, shared by the fetch workers of a crawl.
+
+    Args:
+        url_time_budget: Seconds one URL may take, body download included
+            (DEFAULT_TIMEOUT alone only bounds each read)
+        max_body_bytes: Pages with a larger body are abandoned
+        host_timeout_limit: After this many consecutive timeouts on a host,
+            its remaining URLs are skipped without fetching
+    """
+
+    def __init__(self, url_time_budget=None, max_body_bytes=None, host_timeout_limit=None):
+        self.url_time_budget = url_time_budget
+        self.max_body_bytes = max_body_bytes
+        self.host_timeout_limit = host_timeout_limit
+        self.consecutive_timeouts = {}
+        self.blocked_hosts = set()
+        self._lock = threading.Lock()
+
+    def timeout(self, timeout):
+        """Return the request timeout, capped by the URL time budget."""
+        if self.url_time_budget:
+            return min(timeout, self.url_time_budget)
+        return timeout
+
+    def check_host(self, url, host):
+        if host in self.blocked_hosts:
+            raise FetchLimitExceeded(
+                f"Skipped {url}: {host} timed out {self.host_timeout_limit} time(s) in a row",
+                "skipped",
+            )
+
+    def check_size(self, url, size):
+        if self.max_body_bytes and size > self.max_body_bytes:
+            raise FetchLimitExceeded(
+                f"Abandoned {url}: body larger than {self.max_body_bytes} bytes", "too_large"
+            )
+
+    def check_deadline(self, url, start):
+        if self.url_time_budget and time.perf_counter() - start > self.url_time_budget:
+            raise FetchLimitExceeded(
+                f"Abandoned {url}: over the {self.url_time_budget}s time budget", "timeout"
+            )
+
+    def record_status(self, host, status):
+        """Count consecutive timeouts per host and block hosts over host_timeout_limit."""
+        if not self.host_timeout_limit or status == "skipped":
+            return
+        with self._lock:
+            if status != "timeout":
+                self.consecutive_timeouts.pop(host, None)
+                return
+            count = self.consecutive_timeouts.get(host, 0) + 1
+            self.consecutive_timeouts[host] = count
+            if count >= self.host_timeout_limit and host not in self.blocked_hosts:
+                self.blocked_hosts.add(host)
+                logging.warning(
+                    f"{host} timed out {count} time(s) in a row, skipping its remaining URLs"
+                )
+
+
+def fetch_error_status(error):
+    """Classify a failed fetch as "timeout", "too_large", "skipped" or "error"."""
+    if isinstance(error, FetchLimitExceeded):
+        return error.status
+    if isinstance(error.__cause__, (requests.Timeout, asyncio.TimeoutError)):
+        return "timeout"
+    return "error"
+
+
+@contextlib.contextmanager
+def track_post_fetch(url, host, limits=None):
+    """Record one article fetch in metrics (and limits), however it ends.
+
+    Yields a dict that the caller fills in with the response "status", the
+    body "size" and "extract_seconds". Raises FetchLimitExceeded without
+    yielding if limits block the host.
+    """
+    fetch = {"status": None, "size": 0, "extract_seconds": None}
+    start = time.perf_counter()
     try:
-        response = requests.get(
-            url,
-            timeout=timeout,
-            headers={
-                "User-Agent": "Sitemap2post/0.0.1 (+https://github.com/muchdogesec/sitemap2posts)"
-            },
+        if limits is not None:
+            limits.check_host(url, host)
+        yield fetch
+    except Exception as e:
+        if fetch["status"] is None:
+            fetch["status"] = fetch_error_status(e)
+        raise
+    finally:
+        if fetch["status"] is None:
+            # Cancelled while in flight
+            fetch["status"] = "cancelled"
+        elif limits is not None:
+            limits.record_status(host, fetch["status"])
+        metrics.record_url(url, host, time.perf_counter() - start, **fetch)
+
+
+class DnsCache:
+    """Thread-safe cache of resolved host addresses, shared by all fetch workers.
+
+    Entries expire after ttl seconds (the system resolver does not expose
+    record TTLs); a ttl of 0 disables the cache. All addresses of a host are
+    kept in resolver order, so a connection can fall back to the next one.
+    Failed lookups are not cached, and a host whose addresses all fail to
+    connect is evicted so that the next connection resolves it again.
+    Lookups are counted in metrics as dns_cache_hits and dns_cache_misses.
+    """
+
+    def __init__(self, ttl=DEFAULT_DNS_TTL):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries = {}
+
+    def resolve(self, host, port):
+        """Return the addresses to connect to for host:port, or None to resolve as usual."""
+        if self.ttl <= 0:
+            return None
+        key = (host, port)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is not None and entry[1] > now:
+            metrics.count("dns_cache_hits")
+            return entry[0]
+        metrics.count("dns_cache_misses")
+        try:
+            infos = socket.getaddrinfo(host, port, allowed_gai_family(), socket.SOCK_STREAM)
+        except OSError:
+            # Let the connection raise its own resolution error
+            return None
+        addresses = tuple(dict.fromkeys(info[4][0] for info in infos))
+        with self._lock:
+            self._entries[key] = (addresses, now + self.ttl)
+        return addresses
+
+    def evict(self, host, port):
+        with self._lock:
+            self._entries.pop((host, port), None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+dns_cache = DnsCache()
+
+
+def set_dns_ttl(ttl):
+    """Set how long resolved addresses are reused, in seconds (0 = no DNS cache)."""
+    dns_cache.ttl = ttl
+    dns_cache.clear()
+
+
+class SharedSSLContext(ssl.SSLContext):
+    """SSLContext shared by every connection of the HTTP session.
+
+    CA bundles are loaded once instead of for every new connection, and the
+    TLS session of each (host, port) is kept so that new connections from
+    any fetch worker resume it; sessions can only be resumed within the
+    context that made them. Connections are counted in metrics as
+    tls_sessions_resumed or tls_full_handshakes; whether a session can be
+    resumed is up to the server.
+    """
+
+    def __init__(self, protocol=ssl.PROTOCOL_TLS_CLIENT):
+        self._lock = threading.Lock()
+        self._ca_locations = set()
+        self._sessions = {}
+
+    def load_ca_locations(self, cafile=None, capath=None):
+        """load_verify_locations(), once per location."""
+        with self._lock:
+            if (cafile, capath) not in self._ca_locations:
+                self.load_verify_locations(cafile, capath)
+                self._ca_locations.add((cafile, capath))
+
+    def wrap_socket(self, sock, *args, server_hostname=None, session=None, **kwargs):
+        port = sock.getpeername()[1]
+        if session is None and server_hostname:
+            with self._lock:
+                session = self._sessions.get((server_hostname, port))
+        ssl_sock = super().wrap_socket(
+            sock, *args, server_hostname=server_hostname, session=session, **kwargs
+        )
+        metrics.count("tls_sessions_resumed" if ssl_sock.session_reused else "tls_full_handshakes")
+        self.store_session(ssl_sock, port)
+        return ssl_sock
+
+    def store_session(self, ssl_sock, port):
+        """Keep the session of ssl_sock for the next connection to the same host and port."""
+        session = ssl_sock.session
+        if session is not None and ssl_sock.server_hostname:
+            with self._lock:
+                self._sessions[ssl_sock.server_hostname, port] = session
+
+
+def create_ssl_context():
+    """Create the SSL context for the HTTP session (CA bundles are loaded as requests need them)."""
+    context = SharedSSLContext(ssl.PROTOCOL_TLS_CLIENT)
+    context.minimum_version = ssl.TLSVersion.TLSv1_2
+    context.options |= ssl.OP_NO_COMPRESSION
+    context.hostname_checks_common_name = False
+    return context
+
+
+class CachedDnsConnectionMixin:
+    """Connect to the addresses from dns_cache instead of resolving the host every time.
+
+    Like urllib3's own resolution, each address is tried in turn until one
+    connects.
+    """
+
+    def _new_conn(self):
+        host = self._dns_host
+        addresses = dns_cache.resolve(host, self.port)
+        if addresses is None:
+            return super()._new_conn()
+        try:
+            for address in addresses:
+                # The host (used for SNI and certificate checks) is restored before the handshake
+                self._dns_host = address
+                try:
+                    return super()._new_conn()
+                except Exception as e:
+                    error = e
+        finally:
+            self._dns_host = host
+        dns_cache.evict(host, self.port)
+        raise error
+
+
+class CachedHTTPConnection(CachedDnsConnectionMixin, HTTPConnection):
+    pass
+
+
+class CachedHTTPSConnection(CachedDnsConnectionMixin, HTTPSConnection):
+    def getresponse(self, *args, **kwargs):
+        # Dropped by getresponse() when the server closes the connection
+        sock = self.sock
+        response = super().getresponse(*args, **kwargs)
+        # TLS 1.3 servers send session tickets after the handshake, so the
+        # session is only resumable once a response has been read
+        if isinstance(sock, ssl.SSLSocket) and isinstance(sock.context, SharedSSLContext):
+            sock.context.store_session(sock, self.port)
+        return response
+
+
+class CachedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = CachedHTTPConnection
+
+
+class CachedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = CachedHTTPSConnection
+
+
+class CachingHTTPAdapter(HTTPAdapter):
+    """HTTPAdapter whose new connections use dns_cache and one SharedSSLContext."""
+
+    def init_poolmanager(self, connections, maxsize, block=False, **pool_kwargs):
+        pool_kwargs.setdefault("ssl_context", create_ssl_context())
+        super().init_poolmanager(connections, maxsize, block=block, **pool_kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": CachedHTTPConnectionPool,
+            "https": CachedHTTPSConnectionPool,
+        }
+
+    def build_connection_pool_key_attributes(self, request, verify, cert=None):
+        host_params, pool_kwargs = super().build_connection_pool_key_attributes(
+            request, verify, cert
         )
+        if verify is False:
+            # Unverified requests get their own pool and urllib3's own contexts
+            pool_kwargs["ssl_context"] = None
+        return host_params, pool_kwargs
+
+    def cert_verify(self, conn, url, verify, cert):
+        super().cert_verify(conn, url, verify, cert)
+        ssl_context = self.poolmanager.connection_pool_kw["ssl_context"]
+        if conn.cert_reqs == "CERT_REQUIRED" and isinstance(ssl_context, SharedSSLContext):
+            # Load the CA bundle into the shared context once, not on every connect
+            ssl_context.load_ca_locations(conn.ca_certs, conn.ca_cert_dir)
+            conn.ca_certs = conn.ca_cert_dir = None
+
+
+_session = None
+_session_lock = threading.Lock()
+_request_semaphore = None
+
+
+def get_session():
+    """Return the process-wide HTTP session shared by all fetch workers.
+
+    Its connections are kept alive and pooled per host; new connections
+    reuse cached DNS lookups and TLS sessions (see DnsCache, SharedSSLContext).
+    """
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            adapter = CachingHTTPAdapter(
+                pool_connections=DEFAULT_POOL_SIZE, pool_maxsize=DEFAULT_POOL_SIZE
+            )
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            session.headers["User-Agent"] = USER_AGENT
+            _session = session
+    return _session
+
+
+def set_max_concurrent_requests(limit):
+    """Cap the number of in-flight requests across all threads (None = no cap)."""
+    global _request_semaphore
+    _request_semaphore = threading.BoundedSemaphore(limit) if limit else None
+
+
+def fetch_url(
+    url, timeout=DEFAULT_TIMEOUT, headers=None, kind="page", limits=None, sink=None
+):
+    """Fetch URL with error handling, recording it in metrics under kind.
+
+    With limits (FetchLimits), the body is streamed and the fetch abandoned
+    with FetchLimitExceeded once over the time budget or size limit. With
+    sink, the body of a successful response is passed to sink(chunk) as it
+    downloads instead of being kept, and the response content is empty.
+    """
+    try:
+        with _request_semaphore or contextlib.nullcontext():
+            start = time.perf_counter()
+            try:
+                if limits is None and sink is None:
+                    response = get_session().get(url, timeout=timeout, headers=headers)
+                    received = len(response.content)
+                else:
+                    response, received = fetch_streamed(
+                        url, timeout, headers, start, limits, sink
+                    )
+            except Exception:
+                metrics.record_request(kind, "error", time.perf_counter() - start)
+                raise
+            metrics.record_request(
+                kind, response.status_code, time.perf_counter() - start, received
+            )
 
         return response
     except requests.RequestException as e:
         raise RuntimeError(f"Error fetching {url}") from e
 
 
+def fetch_streamed(url, timeout, headers, start, limits=None, sink=None):
+    """GET url in chunks, enforcing limits and passing successful bodies to sink.
+
+    Returns (FetchedResponse, body bytes received).
+    """
+    if limits is not None:
+        timeout = limits.timeout(timeout)
+    with get_session().get(url, timeout=timeout, headers=headers, stream=True) as response:
+        length = response.headers.get("Content-Length", "")
+        if limits is not None and length.isdigit():
+            limits.check_size(url, int(length))
+        if not response.ok:
+            sink = None
+        chunks = []
+        size = 0
+        try:
+            for chunk in response.iter_content(FETCH_CHUNK_SIZE):
+                size += len(chunk)
+                if limits is not None:
+                    limits.check_size(url, size)
+                    limits.check_deadline(url, start)
+                if sink is not None:
+                    sink(chunk)
+                else:
+                    chunks.append(chunk)
+        except requests.ConnectionError as e:
+            # requests reports a read timeout while streaming as a ConnectionError
+            if e.args and isinstance(e.args[0], ReadTimeoutError):
+                raise requests.ReadTimeout(*e.args) from e
+            raise
+        fetched = FetchedResponse(
+            url,
+            response.status_code,
+            response.reason,
+            response.headers,
+            b"".join(chunks),
+            response.encoding,
+        )
+        return fetched, size
+
+
 def get_sitemaps_from_robots(url, sitemap_allow_list=None):
     """Extract sitemap URLs from robots.txt.
 
@@ -78,7 +1057,7 @@ def get_sitemaps_from_robots(url, sitemap_allow_list=None):
     """
     logging.info(f"Fetching robots.txt from {url}")
     robots_url = urljoin(url, "/robots.txt")
-    response = fetch_url(robots_url)
+    response = fetch_url(robots_url, kind="robots")
 
     if not response.ok:
         logging.error(
@@ -87,7 +1066,12 @@ def get_sitemaps_from_robots(url, sitemap_allow_list=None):
         return []
 
     logging.info("Successfully fetched robots.txt")
-    sitemaps = re.findall(r"Sitemap: (.*)", response.text, re.IGNORECASE)
+    return parse_robots_sitemaps(response.text)
+
+
+def parse_robots_sitemaps(robots_txt):
+    """Return the Sitemap entries of a robots.txt body."""
+    sitemaps = re.findall(r"Sitemap: (.*)", robots_txt, re.IGNORECASE)
 
     if not sitemaps:
         logging.error("No sitemaps found in robots.txt.")
@@ -96,93 +1080,324 @@ def get_sitemaps_from_robots(url, sitemap_allow_list=None):
     return sitemaps
 
 
-@lru_cache(maxsize=None)
-def parse_sitemap_content(soup, sitemap_url):
-    """Parse sitemap XML content and return URLs with type indicator."""
-    if soup.find("sitemapindex"):
-        logging.info(f"{sitemap_url} is a sitemap index")
-        sitemap_urls = [sitemap.text.strip() for sitemap in soup.find_all("loc")]
-        logging.info(f"Found {len(sitemap_urls)} sitemap(s) in sitemap index")
-        return sitemap_urls, True
-
-    if soup.find("urlset"):
-        logging.info(f"{sitemap_url} is a URL set")
-        urls = []
-        for url in soup.find_all("url"):
-            loc = url.find("loc")
-            lastmod = url.find("lastmod")
-            if lastmod:
-                lastmod = make_dt_utc(parse_dt(lastmod.text.strip()))
-            if loc:
-                urls.append((loc.text.strip(), lastmod))
-        logging.info(f"Found {len(urls)} URL(s) in sitemap")
-        return urls, False
-
-    logging.warning(f"Unrecognized sitemap format for {sitemap_url}")
-    return [], False
+class SitemapParser:
+    """Incremental sitemap parser, fed the body chunk by chunk as it downloads.
+
+    Gzip bodies (sitemap.xml.gz served without Content-Encoding) are
+    recognized by their magic bytes and inflated on the fly. Entries are
+    dropped from the tree once read, so neither the inflated XML nor the
+    whole document is ever held in memory. Elements are matched by local
+    name, so sitemaps with or without the sitemaps.org namespace parse alike.
+    """
+
+    def __init__(self, sitemap_url):
+        self.sitemap_url = sitemap_url
+        self.parser = etree.XMLPullParser(
+            events=("end",), recover=True, resolve_entities=False, no_network=True
+        )
+        self.head = b""
+        self.decompressor = None
+        self.plain = False
+        self.loc = None
+        self.lastmod = None
+        self.sitemaps = []
+        self.urls = []
+
+    def feed(self, data):
+        if not self.plain and self.decompressor is None:
+            # Wait for enough bytes to tell gzip from XML
+            self.head += data
+            if len(self.head) < len(GZIP_MAGIC):
+                return
+            data, self.head = self.head, b""
+            if data.startswith(GZIP_MAGIC):
+                self.decompressor = zlib.decompressobj(GZIP_WBITS)
+            else:
+                self.plain = True
+
+        if self.plain:
+            self.parser.feed(data)
+            self.read_events()
+            return
+        for piece in self.inflate(data):
+            self.parser.feed(piece)
+            self.read_events()
+
+    def inflate(self, data):
+        """Yield data inflated in pieces of at most INFLATE_CHUNK_SIZE bytes."""
+        try:
+            while data:
+                piece = self.decompressor.decompress(data, INFLATE_CHUNK_SIZE)
+                if piece:
+                    yield piece
+                if not self.decompressor.eof:
+                    data = self.decompressor.unconsumed_tail
+                    continue
+                # Another gzip member may follow; anything else is padding
+                data = self.decompressor.unused_data
+                if not data.startswith(GZIP_MAGIC):
+                    return
+                self.decompressor = zlib.decompressobj(GZIP_WBITS)
+        except zlib.error as e:
+            raise FetchSitemapError(f"Corrupt gzip data in sitemap {self.sitemap_url}") from e
+
+    def read_events(self):
+        for _, element in self.parser.read_events():
+            name = local_name(element)
+            if name in ("loc", "lastmod"):
+                # Skip extension tags such as <image:loc> inside an entry
+                parent = element.getparent()
+                if parent is None or local_name(parent) not in ENTRY_TAGS:
+                    continue
+                value = (element.text or "").strip()
+                if name == "loc":
+                    self.loc = value
+                else:
+                    self.lastmod = value
+            elif name in ENTRY_TAGS:
+                if name == "sitemap" and self.loc:
+                    self.sitemaps.append(self.loc)
+                elif self.loc:
+                    lastmod = parse_lastmod(self.lastmod) if self.lastmod else None
+                    self.urls.append(UrlRecord(self.loc, lastmod, self.sitemap_url))
+                self.loc = self.lastmod = None
+                # Free the entry and the ones before it
+                element.clear()
+                while element.getprevious() is not None:
+                    del element.getparent()[0]
+
+    def close(self):
+        """Finish parsing and return URLs with type indicator, like parse_sitemap_response()."""
+        if self.head:
+            self.plain = True
+            self.parser.feed(self.head)
+        try:
+            root = self.parser.close()
+        except etree.XMLSyntaxError:
+            root = None
+        self.read_events()
+
+        name = local_name(root) if root is not None else None
+        if name == "sitemapindex":
+            logging.info(f"{self.sitemap_url} is a sitemap index")
+            logging.info(f"Found {len(self.sitemaps)} sitemap(s) in sitemap index")
+            return self.sitemaps, True
+
+        if name == "urlset":
+            logging.info(f"{self.sitemap_url} is a URL set")
+            logging.info(f"Found {len(self.urls)} URL(s) in sitemap")
+            return self.urls, False
+
+        logging.warning(f"Unrecognized sitemap format for {self.sitemap_url}")
+        return [], False
+
+
+def local_name(element):
+    """Tag name of an lxml element without its namespace."""
+    tag = element.tag
+    return tag[tag.rfind("}") + 1 :] if isinstance(tag, str) else None
+
+
+def parse_lastmod(text):
+    """Parse a sitemap <lastmod> as a UTC datetime.
+
+    W3C datetimes go through datetime.fromisoformat(); anything else falls
+    back to dateutil, which is much slower and only imported when needed.
+    """
+    try:
+        return make_dt_utc(datetime.fromisoformat(text))
+    except ValueError:
+        from dateutil.parser import parse as parse_dt
+
+        return make_dt_utc(parse_dt(text))
+
+
+def parse_sitemap_response(content, sitemap_url):
+    """Parse a fetched sitemap body (XML or gzip) and return URLs with type indicator.
+
+    Sitemap indexes yield child sitemap URLs; URL sets yield UrlRecords.
+    """
+    parser = SitemapParser(sitemap_url)
+    for offset in range(0, len(content), FETCH_CHUNK_SIZE):
+        parser.feed(content[offset : offset + FETCH_CHUNK_SIZE])
+    return parser.close()
 
 
 def get_sitemap_urls(sitemap_url):
-    """Fetch and parse a sitemap URL."""
+    """Fetch a sitemap URL, parsing it (plain or gzip XML) as it downloads."""
     logging.info(f"Fetching sitemap from {sitemap_url}")
-    response = fetch_url(sitemap_url)
+    parser = SitemapParser(sitemap_url)
+    response = fetch_url(
+        sitemap_url,
+        headers=sitemap_cache.conditional_headers(sitemap_url),
+        kind="sitemap",
+        sink=parser.feed,
+    )
+
+    cached = sitemap_cache.lookup(sitemap_url, response)
+    if cached is not None:
+        logging.info(f"{sitemap_url} not modified, using cached copy")
+        metrics.count("sitemap_cache_hits")
+        return cached
 
     if not response.ok:
         raise FetchSitemapError(
             f"Failed to fetch sitemap from {sitemap_url}: {response.status_code} {response.reason}"
         )
 
-    soup = BeautifulSoup(response.content, "lxml-xml")
-    return parse_sitemap_content(soup, sitemap_url)
+    result = parser.close()
+    sitemap_cache.store(sitemap_url, response, result, size=len(result[0]))
+    return result
+
+
+# Rules applied by canonicalize_url(); all are on by default
+URL_CANONICAL_RULES = ("https", "www", "trailing_slash", "fragment", "utm")
+DEFAULT_PORTS = {"http": ":80", "https": ":443"}
+
+
+def canonicalize_url(url, rules=URL_CANONICAL_RULES):
+    """Normalize a URL so that trivial variants of the same page compare equal.
+
+    The scheme and host are lowercased and default ports dropped. Rules:
+    https (http counts as https), www (drop a leading "www."),
+    trailing_slash (drop trailing slashes from the path), fragment (drop
+    "#..."), utm (drop utm_* query parameters).
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    netloc = parts.netloc.lower()
+    default_port = DEFAULT_PORTS.get(scheme)
+    if default_port and netloc.endswith(default_port):
+        netloc = netloc[: -len(default_port)]
+    if "https" in rules and scheme == "http":
+        scheme = "https"
+    if "www" in rules and netloc.startswith("www."):
+        netloc = netloc[len("www.") :]
+    path = parts.path or "/"
+    if "trailing_slash" in rules:
+        path = path.rstrip("/") or "/"
+    query = parts.query
+    if "utm" in rules and "utm_" in query.lower():
+        query = urlencode(
+            [
+                (key, value)
+                for key, value in parse_qsl(query, keep_blank_values=True)
+                if not key.lower().startswith("utm_")
+            ]
+        )
+    fragment = "" if "fragment" in rules else parts.fragment
+    return urlunsplit((scheme, netloc, path, query, fragment))
+
 
+def dedupe_urls(url_list, canonical_rules=URL_CANONICAL_RULES):
+    """Deduplicate UrlRecords into a {url: UrlRecord} dict, keeping the newest lastmod.
 
-def dedupe_urls(url_list):
+    URLs are compared after canonicalize_url() with canonical_rules (no
+    rules: exact match). The URL of the kept entry is fetched as listed.
+    """
     logging.info("Deduplicating URLs")
-    unique_urls = {}
-    for url, lastmod, sitemap in url_list:
-        if url not in unique_urls or (
-            lastmod and unique_urls[url]["lastmod"] > lastmod
+    records = {}
+    for record in url_list:
+        key = (
+            canonicalize_url(record.url, canonical_rules)
+            if canonical_rules
+            else record.url
+        )
+        kept = records.get(key)
+        if kept is None or (
+            record.lastmod and (kept.lastmod is None or record.lastmod > kept.lastmod)
         ):
-            unique_urls[url] = {"lastmod": lastmod, "sitemap": sitemap}
+            records[key] = record
+    unique_urls = {record.url: record for record in records.values()}
     logging.info(f"Deduplication complete, {len(unique_urls)} unique URLs remaining")
     return unique_urls
 
 
-def get_post_title(url, check_404=False):
+def get_post_title(url, check_404=False, archive=None, record=None, limits=None):
     """Fetch the title of a post from its URL.
 
     Args:
         url: The URL to fetch
         check_404: If True, return None for 404 responses instead of fetching title
+        archive: Optional PageArchive that extracted pages are written to
+        record: The URL's UrlRecord, stored in the archive with the page
+        limits: Optional FetchLimits applied to the fetch
 
     Returns:
         Tuple of (data, is_valid) where is_valid indicates if URL is not 404
     """
     logging.debug(f"Fetching post title from {url}")
-    response = fetch_url(url)
+    host = record.host if record is not None else urlsplit(url).netloc
+    with track_post_fetch(url, host, limits) as fetch:
+        response = fetch_url(url, kind="article", limits=limits)
+        fetch["status"] = response.status_code
+        fetch["size"] = len(response.content)
 
-    data = dict()
+        if not check_post_response(url, response, check_404):
+            return None, False
+
+        if archive is not None:
+            archive.write(url, response, record)
+        start = time.perf_counter()
+        data = extract_post_data(url, response.text, response.headers)
+        fetch["extract_seconds"] = time.perf_counter() - start
+        return data, True
+
+
+def check_post_response(url, response, check_404=False):
+    """Return True if a fetched post response should be extracted.
 
+    Raises RuntimeError for unexpected non-200 responses.
+    """
     if not response:
         logging.debug(f"Failed to fetch URL {url}")
-        return None, False
-
-    last_modified = response.headers.get("Last-Modified")
-    if last_modified:
-        data["modified_header"] = make_dt_utc(parsedate_to_datetime(last_modified))
+        return False
 
     # Check for 404 if requested
     if check_404 and response.status_code == 404:
         logging.info(f"URL {url} returned 404. Excluding from results.")
-        return None, False
+        return False
 
     if response.status_code != 200:
         raise RuntimeError(
             f"Failed to fetch URL {url}: {response.status_code} {response.reason}"
         )
+    return True
+
+
+def extract_post_data(url, html, headers=None):
+    """Extract title, dates and metadata from a fetched post page.
+
+    Args:
+        url: The URL the page was fetched from
+        html: The page body
+        headers: Optional response headers (for Last-Modified)
+
+    Returns:
+        Dictionary of extracted post data
+    """
+    cpu_start = time.thread_time()
+    try:
+        return _extract_post_data(url, html, headers)
+    finally:
+        metrics.add_cpu("extract", time.thread_time() - cpu_start)
+        metrics.count("posts_extracted")
+
+
+def _extract_post_data(url, html, headers):
+    # newspaper and htmldate take most of the import time, so they are only
+    # imported once a page is extracted
+    from htmldate import find_date
+    from newspaper import Article
+
+    data = dict()
+
+    last_modified = (headers or {}).get("Last-Modified")
+    if last_modified:
+        data["modified_header"] = make_dt_utc(parsedate_to_datetime(last_modified))
 
     article = Article(url)
-    article.download(input_html=response.text)
+    article.download(input_html=html)
     article.parse()
     data["title"] = article.title.strip()
     meta_keywords = [kw for kw in article.meta_keywords if kw.strip()]
@@ -196,8 +1411,10 @@ def get_post_title(url, check_404=False):
         data["meta_description"] = article.meta_description.strip()
     if article.authors:
         data["authors"] = "; ".join(article.authors)
+    if article.canonical_link:
+        data["canonical_link"] = article.canonical_link
     date = find_date(
-        response.text,
+        html,
         url=url,
         extensive_search=True,
         outputformat="%Y-%m-%dT%H:%M:%S%z",
@@ -206,27 +1423,375 @@ def get_post_title(url, check_404=False):
         data["htmldate"] = make_dt_utc(datetime.fromisoformat(date))
 
     logging.debug(f"Successfully fetched title: {data['title']}")
-    return data, True
+    return data
 
 
-def save_to_json(posts, output_filename="sitemap_posts.json"):
+# Response headers that describe the transfer, not the stored (decoded) body
+ARCHIVE_SKIP_HEADERS = {"content-encoding", "content-length", "transfer-encoding"}
+
+
+class PageArchive:
+    """WARC-style store of fetched post pages, for offline re-extraction.
+
+    Each run appends to its own DIR/pages-<timestamp>.warc.gz. Every page is
+    a separate gzip member holding a WARC response record: a header block
+    (target URI, date, plus the sitemap, lastmod and charset of the page)
+    followed by the HTTP status line, headers and body. Members are flushed
+    as they are written, so a crash keeps every page archived so far.
+
+    write() is thread-safe. iter_archived_posts() reads the archive back.
+    """
+
+    def __init__(self, directory):
+        os.makedirs(directory, exist_ok=True)
+        timestamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%fZ")
+        self.path = os.path.join(directory, f"pages-{timestamp}.warc.gz")
+        self.file = open(self.path, "ab")
+        self.lock = threading.Lock()
+        self.count = 0
+
+    def __enter__(self):
+        logging.info(f"Archiving fetched pages to {self.path}")
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        self.file.close()
+        logging.info(f"Archived {self.count} page(s) to {self.path}")
+
+    def write(self, url, response, record=None):
+        """Append one fetched page; record is its UrlRecord, if known."""
+        http_head = [f"HTTP/1.1 {response.status_code} {response.reason or ''}"]
+        http_head += [
+            f"{name}: {value}"
+            for name, value in response.headers.items()
+            if name.lower() not in ARCHIVE_SKIP_HEADERS
+        ]
+        http_head.append(f"Content-Length: {len(response.content)}")
+        block = (
+            "\r\n".join(http_head).encode("iso-8859-1", errors="replace")
+            + b"\r\n\r\n"
+            + response.content
+        )
+
+        fields = {
+            "WARC-Type": "response",
+            "WARC-Record-ID": f"<urn:uuid:{uuid.uuid4()}>",
+            "WARC-Date": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "WARC-Target-URI": url,
+            "Content-Type": "application/http;msgtype=response",
+            "Content-Length": str(len(block)),
+        }
+        if record is not None:
+            fields["X-Sitemap"] = record.sitemap
+            if record.lastmod:
+                fields["X-Sitemap-Lastmod"] = record.lastmod.isoformat()
+        if response.encoding:
+            fields["X-Charset"] = response.encoding
+        head = "WARC/1.1\r\n" + "".join(
+            f"{name}: {value}\r\n" for name, value in fields.items()
+        )
+        member = gzip.compress(
+            head.encode("utf-8") + b"\r\n" + block + b"\r\n\r\n", compresslevel=6
+        )
+        with self.lock:
+            self.file.write(member)
+            self.file.flush()
+            self.count += 1
+
+
+def iter_archive_records(path):
+    """Yield (fields, block) for each WARC record in a .warc.gz file.
+
+    A record cut short by a crash ends the iteration with a warning.
+    """
+    with gzip.open(path, "rb") as f:
+        try:
+            while True:
+                line = f.readline()
+                if not line:
+                    return
+                if not line.strip():
+                    continue
+                fields = {}
+                while True:
+                    line = f.readline()
+                    if not line.strip():
+                        break
+                    name, _, value = line.decode("utf-8").partition(":")
+                    fields[name.strip()] = value.strip()
+                length = int(fields["Content-Length"])
+                block = f.read(length)
+                if len(block) < length:
+                    raise EOFError
+                yield fields, block
+        except (EOFError, gzip.BadGzipFile, KeyError, ValueError):
+            logging.warning(f"{path} ends with a truncated record, skipping it")
+
+
+def parse_archived_response(fields, block):
+    """Rebuild the FetchedResponse stored in a WARC record block."""
+    head, _, body = block.partition(b"\r\n\r\n")
+    status_line, *header_lines = head.decode("iso-8859-1").split("\r\n")
+    _, status, reason = (status_line + " ").split(" ", 2)
+    headers = CaseInsensitiveDict(
+        line.split(": ", 1) for line in header_lines if ": " in line
+    )
+    return FetchedResponse(
+        fields["WARC-Target-URI"],
+        int(status),
+        reason.strip(),
+        headers,
+        body,
+        fields.get("X-Charset"),
+    )
+
+
+def archive_paths(archive_dir):
+    """Archive files in a directory, oldest run first."""
+    return sorted(
+        os.path.join(archive_dir, name)
+        for name in os.listdir(archive_dir)
+        if name.endswith(".warc.gz")
+    )
+
+
+def extract_archived_post(url, html, headers):
+    """Process pool entry point for iter_archived_posts()."""
+    return extract_post_data(url, html, headers)
+
+
+def iter_archived_posts(
+    archive_dir,
+    lastmod_min=None,
+    path_ignore_list=None,
+    path_allow_list=None,
+    url_date_patterns=None,
+    exclude_urls=None,
+    canonical_rules=URL_CANONICAL_RULES,
+    max_workers=None,
+):
+    """Re-extract posts from a PageArchive directory, without any network access.
+
+    The newest archived copy of each URL is used. URLs go through the same
+    dedupe and filters as a crawl (see filter_post_urls()), then pages are
+    extracted in a process pool of max_workers (default: one per CPU), so
+    re-processing is bound by CPU only.
+
+    Yields:
+        Post dictionaries, in completion order
+    """
+    latest = {}
+    for path in archive_paths(archive_dir):
+        for index, (fields, _) in enumerate(iter_archive_records(path)):
+            lastmod = fields.get("X-Sitemap-Lastmod")
+            url = fields["WARC-Target-URI"]
+            record = UrlRecord(
+                url,
+                datetime.fromisoformat(lastmod) if lastmod else None,
+                fields.get("X-Sitemap", ""),
+            )
+            latest[url] = (path, index, record)
+    logging.info(f"Found {len(latest)} archived page(s) in {archive_dir}")
+
+    urls = filter_post_urls(
+        [record for _, _, record in latest.values()],
+        lastmod_min,
+        path_ignore_list,
+        path_allow_list,
+        url_date_patterns,
+        exclude_urls,
+        canonical_rules,
+    )
+    if not urls:
+        return
+    wanted = {latest[url][:2] for url in urls}
+
+    def iter_pages():
+        for path in archive_paths(archive_dir):
+            for index, (fields, block) in enumerate(iter_archive_records(path)):
+                if (path, index) in wanted:
+                    yield parse_archived_response(fields, block)
+
+    count = 0
+    duplicates = CanonicalDuplicates(canonical_rules)
+    pages = iter_pages()
+    future_to_url = {}
+    max_workers = max_workers or os.cpu_count() or 1
+    max_in_flight = 2 * max_workers
+    executor = ProcessPoolExecutor(max_workers=max_workers)
+
+    def fill():
+        while len(future_to_url) < max_in_flight:
+            response = next(pages, None)
+            if response is None:
+                return
+            future = executor.submit(
+                extract_archived_post,
+                response.url,
+                response.text,
+                dict(response.headers),
+            )
+            future_to_url[future] = response.url
+
+    try:
+        fill()
+        while future_to_url:
+            done, _ = wait(future_to_url, return_when=FIRST_COMPLETED)
+            for future in done:
+                url = future_to_url.pop(future)
+                try:
+                    data = future.result()
+                except Exception as e:
+                    logging.error(f"Error extracting archived page {url}: {e}")
+                    continue
+                post = {
+                    "url": url,
+                    "lastmod": urls[url].lastmod,
+                    "sitemap": urls[url].sitemap,
+                    **data,
+                }
+                if duplicates.is_duplicate(post):
+                    continue
+                count += 1
+                yield post
+            fill()
+    finally:
+        # One blocking shutdown: drops queued pages if the consumer stopped early
+        executor.shutdown(cancel_futures=True)
+
+    logging.info(f"{count} post(s) re-extracted from archive")
+
+
+def sort_posts(posts):
+    """Fill in missing lastmods and sort by sitemap, then lastmod (newest first)."""
     for post in posts:
         if post["lastmod"] is None:
             post["lastmod"] = lastmod_default
 
     # Sort posts by sitemap first, and then by lastmod (newest first)
-    sorted_posts = sorted(
-        posts, key=lambda x: (x["sitemap"], x["lastmod"]), reverse=True
-    )
+    return sorted(posts, key=lambda x: (x["sitemap"], x["lastmod"]), reverse=True)
+
+
+def save_to_json(posts, output_filename="sitemap_posts.json"):
+    sorted_posts = sort_posts(posts)
     logging.info(f"Saving results to {output_filename}")
+    # Write a sibling file and rename it, so readers never see a partial file
+    tmp_filename = f"{output_filename}.tmp"
     try:
-        with open(output_filename, "w", encoding="utf-8") as jsonfile:
-            json.dump(sorted_posts, jsonfile, indent=4)
+        with open(tmp_filename, "w", encoding="utf-8") as jsonfile:
+            json.dump(sorted_posts, jsonfile, indent=4, default=json_default)
+        os.replace(tmp_filename, output_filename)
         logging.info(f"JSON saved successfully with {len(posts)} post(s)")
     except IOError as e:
         raise RuntimeError(f"Failed to save JSON to {output_filename}") from e
 
 
+def save_to_ndjson(posts, output_filename):
+    """Write posts sorted like save_to_json(), one JSON object per line, atomically."""
+    sorted_posts = sort_posts(posts)
+    logging.info(f"Saving results to {output_filename}")
+    tmp_filename = f"{output_filename}.tmp"
+    try:
+        with open(tmp_filename, "w", encoding="utf-8") as f:
+            for post in sorted_posts:
+                f.write(json.dumps(post, default=json_default) + "\n")
+        os.replace(tmp_filename, output_filename)
+        logging.info(f"NDJSON saved successfully with {len(posts)} post(s)")
+    except IOError as e:
+        raise RuntimeError(f"Failed to save NDJSON to {output_filename}") from e
+
+
+def load_posts(output_filename):
+    """Read posts back from a JSON or NDJSON output file; [] if it does not exist.
+
+    lastmod values are parsed back into datetimes so the posts sort and
+    compare like freshly fetched ones.
+    """
+    try:
+        with open(output_filename, encoding="utf-8") as f:
+            content = f.read()
+    except FileNotFoundError:
+        logging.info(f"{output_filename} does not exist yet, nothing to merge")
+        return []
+    if content.lstrip().startswith("["):
+        posts = json.loads(content)
+    else:
+        posts = [json.loads(line) for line in content.splitlines() if line.strip()]
+    for post in posts:
+        if post.get("lastmod"):
+            post["lastmod"] = make_dt_utc(datetime.fromisoformat(post["lastmod"]))
+    logging.info(f"Loaded {len(posts)} existing post(s) from {output_filename}")
+    return posts
+
+
+def merge_posts(existing_posts, posts):
+    """Merge freshly fetched posts into existing ones, replacing entries with the same URL."""
+    merged = {post["url"]: post for post in existing_posts}
+    replaced = sum(1 for post in posts if post["url"] in merged)
+    merged.update((post["url"], post) for post in posts)
+    logging.info(
+        f"Merged {len(posts)} fetched post(s) into {len(existing_posts)} existing: "
+        f"{replaced} updated, {len(posts) - replaced} new"
+    )
+    return list(merged.values())
+
+
+class NdjsonWriter:
+    """Sink that writes each post as one JSON line as soon as it is extracted.
+
+    Lines are flushed as they are written, so the file can be tailed while
+    the crawl runs and a crash keeps every post written so far.
+
+    Example:
+        with NdjsonWriter("posts.ndjson") as writer:
+            sitemap2posts(blog_url, use_robots_txt=True, sink=writer)
+    """
+
+    def __init__(self, output_filename):
+        self.output_filename = output_filename
+        self.file = None
+        self.count = 0
+
+    def __enter__(self):
+        logging.info(f"Streaming results to {self.output_filename}")
+        try:
+            self.file = open(self.output_filename, "w", encoding="utf-8")
+        except IOError as e:
+            raise RuntimeError(f"Failed to open {self.output_filename}") from e
+        return self
+
+    def __exit__(self, *exc_info):
+        self.file.close()
+        logging.info(f"NDJSON saved with {self.count} post(s)")
+
+    def __call__(self, post):
+        if post["lastmod"] is None:
+            post["lastmod"] = lastmod_default
+        self.file.write(json.dumps(post, default=json_default) + "\n")
+        self.file.flush()
+        self.count += 1
+
+
+def sort_ndjson(output_filename):
+    """Sort an NDJSON output file like save_to_json() does, replacing it atomically."""
+    with open(output_filename, encoding="utf-8") as f:
+        lines = [line for line in f if line.strip()]
+
+    def sort_key(line):
+        post = json.loads(line)
+        return post["sitemap"], datetime.fromisoformat(post["lastmod"])
+
+    lines.sort(key=sort_key, reverse=True)
+    tmp_filename = f"{output_filename}.tmp"
+    with open(tmp_filename, "w", encoding="utf-8") as f:
+        f.writelines(line if line.endswith("\n") else line + "\n" for line in lines)
+    os.replace(tmp_filename, output_filename)
+    logging.info(f"Sorted {len(lines)} post(s) in {output_filename}")
+
+
 def is_date_after_min(lastmod_parsed, lastmod_min):
     """Check if parsed date is after the minimum date."""
     if lastmod_parsed.tzinfo is None:
@@ -246,52 +1811,162 @@ def should_skip_sitemap(sitemap, ignore_list, allow_list):
     return False
 
 def collect_urls_from_sitemaps(sitemaps):
-    """Collect all URLs from a list of sitemaps."""
+    """Collect the UrlRecords of all URLs from a list of sitemaps."""
     all_urls = []
 
     for sitemap in sitemaps:
         urls, _ = get_sitemap_urls(sitemap)
-        for url, lastmod in urls:
-            all_urls.append((url, lastmod, sitemap))
+        all_urls.extend(urls)
     return all_urls
 
 
-def filter_urls_by_lastmod(urls, lastmod_min):
-    """Filter URLs based on lastmod date."""
+def filter_urls_by_lastmod(urls, lastmod_min, url_date_patterns=None):
+    """Filter URLs based on lastmod date.
+
+    With url_date_patterns, URLs whose path holds a date are also dropped when
+    that whole day, month or year (plus URL_DATE_MARGIN) ends before lastmod_min.
+    """
     if not lastmod_min:
         return urls
 
+    # --lastmod_min is naive, URL dates are UTC
+    lastmod_min = make_dt_utc(lastmod_min)
     logging.info(f"Filtering URLs with lastmod on or after {lastmod_min.date()}")
     filtered = {}
+    url_date_skipped = 0
 
-    for url, data in urls.items():
-        if data["lastmod"]:
-            parsed_lastmod = data["lastmod"]
-            if parsed_lastmod and not is_date_after_min(parsed_lastmod, lastmod_min):
+    for url, record in urls.items():
+        if record.lastmod and not is_date_after_min(record.lastmod, lastmod_min):
+            continue
+        if url_date_patterns is not None:
+            period = url_date_period(url, url_date_patterns)
+            if period and not is_date_after_min(period[1] + URL_DATE_MARGIN, lastmod_min):
+                url_date_skipped += 1
                 continue
-        filtered[url] = data
+        filtered[url] = record
 
+    if url_date_skipped:
+        logging.info(f"Skipped {url_date_skipped} URL(s) dated before {lastmod_min.date()} by their path")
     return filtered
 
 
-def url_matches_pattern(url, pattern):
-    return fnmatch(url, pattern)
+# Dates commonly embedded in post URLs: /2024/05/13/slug, /2024/05/slug, /2023-11-slug
+URL_DATE_PATTERNS = [
+    re.compile(r"/(?P<year>(?:19|20)\d{2})/(?P<month>[01]?\d)/(?P<day>[0-3]?\d)(?:/|$)"),
+    re.compile(r"(?<!\d)(?P<year>(?:19|20)\d{2})-(?P<month>[01]\d)-(?P<day>[0-3]\d)(?!\d)"),
+    re.compile(r"/(?P<year>(?:19|20)\d{2})/(?P<month>[01]?\d)(?:/|$)"),
+    re.compile(r"/(?P<year>(?:19|20)\d{2})-(?P<month>[01]\d)(?:[-/]|$)"),
+]
+# Slack for URL dates written in the blog's local time zone
+URL_DATE_MARGIN = timedelta(days=1)
 
 
-def filter_urls_by_paths(urls, ignore_paths=None, allow_paths=None):
-    """Filter URLs based on ignore and allow path lists (supports glob patterns)."""
-    filtered = urls
+def compile_url_date_patterns(patterns):
+    """Compile URL date regexes, which need a named 'year' group and may have 'month' and 'day'.
 
-    # Apply allow list first (if specified, only keep URLs that match)
-    if allow_paths:
-        logging.info("Applying --path_allow_list filter (supports glob patterns)")
-        filtered = {
-            url: data
-            for url, data in filtered.items()
-            if any(url_matches_pattern(url, path) for path in allow_paths)
-        }
-        logging.info(
-            f"{len(filtered)} URL(s) remain after applying --path_allow_list filter"
+    Raises ValueError for an invalid regex or one without a year group.
+    """
+    compiled = []
+    for pattern in patterns:
+        try:
+            pattern = re.compile(pattern)
+        except re.error as e:
+            raise ValueError(f"Invalid URL date pattern {pattern!r}: {e}") from e
+        if "year" not in pattern.groupindex:
+            raise ValueError(
+                f"URL date pattern {pattern.pattern!r} has no (?P<year>...) group"
+            )
+        compiled.append(pattern)
+    return compiled
+
+
+def url_date_period(url, patterns=None):
+    """Return the (start, end) period of the date embedded in a URL's path, or None.
+
+    The period is a day, month or year depending on how much of the date the
+    URL contains; end is exclusive.
+    """
+    path = urlparse(url).path
+    for pattern in patterns or URL_DATE_PATTERNS:
+        match = pattern.search(path)
+        if not match:
+            continue
+        parts = match.groupdict()
+        try:
+            year = int(parts["year"])
+            if parts.get("day"):
+                start = datetime(year, int(parts["month"]), int(parts["day"]), tzinfo=timezone.utc)
+                return start, start + timedelta(days=1)
+            if parts.get("month"):
+                month = int(parts["month"])
+                start = datetime(year, month, 1, tzinfo=timezone.utc)
+                end = datetime(year + month // 12, month % 12 + 1, 1, tzinfo=timezone.utc)
+                return start, end
+            return (
+                datetime(year, 1, 1, tzinfo=timezone.utc),
+                datetime(year + 1, 1, 1, tzinfo=timezone.utc),
+            )
+        except (KeyError, TypeError, ValueError):
+            continue
+    return None
+
+
+def date_from_url(url, patterns=None):
+    """Return the date embedded in a URL's path (start of the period), or None."""
+    period = url_date_period(url, patterns)
+    return period[0] if period else None
+
+
+def url_order_hint(url, lastmod, url_date_patterns=None):
+    """Best guess at when a URL was published: a date in its path, else its sitemap lastmod.
+
+    The URL date comes first because lastmod is a modification date: a
+    site-wide touch would otherwise put old posts first.
+    """
+    return date_from_url(url, url_date_patterns) or lastmod
+
+
+def order_urls_newest_first(urls, url_date_patterns=None):
+    """Reorder URLs so the most recent ones are fetched first.
+
+    URLs without a date hint come first, in sitemap order, since they have to
+    be fetched anyway. Dated URLs follow newest first; the sort is stable, so
+    sitemap order breaks ties.
+    """
+    hints = {
+        url: url_order_hint(url, record.lastmod, url_date_patterns)
+        for url, record in urls.items()
+    }
+    undated = [url for url, hint in hints.items() if hint is None]
+    dated = sorted(
+        (url for url, hint in hints.items() if hint is not None),
+        key=hints.__getitem__,
+        reverse=True,
+    )
+    logging.info(
+        f"Fetching {len(dated)} dated URL(s) newest first, after {len(undated)} undated URL(s)"
+    )
+    return {url: urls[url] for url in undated + dated}
+
+
+def url_matches_pattern(url, pattern):
+    return fnmatch(url, pattern)
+
+
+def filter_urls_by_paths(urls, ignore_paths=None, allow_paths=None):
+    """Filter URLs based on ignore and allow path lists (supports glob patterns)."""
+    filtered = urls
+
+    # Apply allow list first (if specified, only keep URLs that match)
+    if allow_paths:
+        logging.info("Applying --path_allow_list filter (supports glob patterns)")
+        filtered = {
+            url: data
+            for url, data in filtered.items()
+            if any(url_matches_pattern(url, path) for path in allow_paths)
+        }
+        logging.info(
+            f"{len(filtered)} URL(s) remain after applying --path_allow_list filter"
         )
 
     # Apply ignore list (remove URLs that match)
@@ -309,98 +1984,231 @@ def filter_urls_by_paths(urls, ignore_paths=None, allow_paths=None):
     return filtered
 
 
-def fetch_post_titles(urls, remove_404_records=False):
-    """Fetch titles for all URLs in parallel.
+class CanonicalDuplicates:
+    """Spot fetched posts whose <link rel="canonical"> names an already seen page.
+
+    Canonical links to another host or to a site root are ignored, as
+    misconfigured sites point every page there.
+    """
+
+    def __init__(self, canonical_rules=URL_CANONICAL_RULES):
+        self.canonical_rules = canonical_rules or ()
+        self.seen = set()
+        self.collapsed = 0
+
+    def is_duplicate(self, post):
+        """Record a fetched post; return True if its page was already seen."""
+        key = canonicalize_url(post["url"], self.canonical_rules)
+        canonical_link = post.get("canonical_link")
+        if canonical_link:
+            canonical_key = canonicalize_url(
+                urljoin(post["url"], canonical_link), self.canonical_rules
+            )
+            canonical_parts = urlsplit(canonical_key)
+            if canonical_parts.netloc == urlsplit(key).netloc and canonical_parts.path.strip("/"):
+                key = canonical_key
+        if key in self.seen:
+            logging.debug(f"Skipping {post['url']}: duplicate of canonical {key}")
+            self.collapsed += 1
+            return True
+        self.seen.add(key)
+        return False
+
+
+def default_post_date(post):
+    """Publish date of a fetched post: article metadata, then htmldate, then lastmod."""
+    return post.get("publish_date") or post.get("htmldate") or post.get("lastmod")
+
+
+class OlderPostRun:
+    """Count consecutive fetched posts dated before a cutoff, for early termination.
+
+    Only posts whose URL had a date hint count, as only those are fetched
+    newest first; other posts neither extend nor reset the run. Posts are
+    counted in completion order, which follows fetch order closely.
+    """
+
+    def __init__(self, cutoff, run_length, post_date=None, url_date_patterns=None):
+        self.cutoff = make_dt_utc(cutoff)
+        self.run_length = run_length
+        self.post_date = post_date or default_post_date
+        self.url_date_patterns = url_date_patterns
+        self.run = 0
+
+    def update(self, post):
+        """Record a fetched post; return True once enough older posts were seen in a row."""
+        if url_order_hint(post["url"], post["lastmod"], self.url_date_patterns) is None:
+            return False
+        date = self.post_date(post)
+        if date is None:
+            return False
+        if make_dt_utc(date) < self.cutoff:
+            self.run += 1
+        else:
+            self.run = 0
+        return self.run >= self.run_length
+
+
+def iter_post_titles(
+    urls,
+    remove_404_records=False,
+    cancel_event=None,
+    max_in_flight=DEFAULT_MAX_IN_FLIGHT,
+    archive=None,
+    fetch_limits=None,
+):
+    """Fetch titles for all URLs in parallel, yielding each post as it completes.
+
+    Fetches are submitted in a window of at most max_in_flight futures, so
+    memory stays flat however many URLs there are, and a consumer that
+    falls behind pauses submission instead of letting results pile up.
 
     Args:
-        urls: Dictionary of URLs with their metadata
+        urls: Dictionary of URLs with their UrlRecords
         remove_404_records: If True, exclude URLs that return 404
-
-    Returns:
-        List of post dictionaries
+        cancel_event: Optional threading.Event; once set, queued fetches are
+            cancelled and no further posts are yielded
+        max_in_flight: Maximum number of submitted, unfinished fetches
+        archive: Optional PageArchive that extracted pages are written to
+        fetch_limits: Optional FetchLimits applied to every fetch
+
+    Yields:
+        Post dictionaries, in completion order
     """
-    posts = []
+    count = 0
+    url_iter = iter(urls)
+    future_to_url = {}
 
     if remove_404_records:
         logging.info("Fetching post titles (excluding 404 responses)...")
     else:
         logging.info("Fetching post titles...")
 
-    with ThreadPoolExecutor(max_workers=10) as executor:
-        future_to_url = {
-            executor.submit(get_post_title, url, remove_404_records): url
-            for url in urls
-        }
-        for future in as_completed(future_to_url):
-            url = future_to_url[future]
-            try:
-                html_data, is_valid = future.result()
-
-                # Skip if 404 and we're filtering them out
-                if remove_404_records and not is_valid:
-                    continue
-
-                # Skip if title is None (404 case)
-                if html_data is None:
-                    continue
-
-                posts.append(
-                    {
+    with ThreadPoolExecutor(max_workers=DEFAULT_FETCH_WORKERS) as executor:
+
+        def fill():
+            while len(future_to_url) < max_in_flight:
+                url = next(url_iter, None)
+                if url is None:
+                    return
+                future = executor.submit(
+                    profiler.wrap("fetch", get_post_title),
+                    url,
+                    remove_404_records,
+                    archive,
+                    urls[url],
+                    fetch_limits,
+                )
+                future_to_url[future] = url
+
+        fill()
+        try:
+            while future_to_url:
+                done, _ = wait(future_to_url, return_when=FIRST_COMPLETED)
+                for future in done:
+                    if cancel_event is not None and cancel_event.is_set():
+                        logging.info(f"Fetching cancelled after {count} post(s)")
+                        return
+
+                    url = future_to_url.pop(future)
+                    try:
+                        html_data, is_valid = future.result()
+                    except Exception as e:
+                        logging.error(f"Error fetching title for URL {url}: {e}")
+                        continue
+
+                    # Skip if 404 and we're filtering them out
+                    if remove_404_records and not is_valid:
+                        continue
+
+                    # Skip if title is None (404 case)
+                    if html_data is None:
+                        continue
+
+                    count += 1
+                    yield {
                         "url": url,
-                        "lastmod": urls[url]["lastmod"],
-                        "sitemap": urls[url]["sitemap"],
+                        "lastmod": urls[url].lastmod,
+                        "sitemap": urls[url].sitemap,
                         **html_data,
                     }
-                )
-            except Exception as e:
-                logging.error(f"Error fetching title for URL {url}: {e}")
+                fill()
+        finally:
+            # Drop queued fetches if the consumer stopped early or cancelled
+            executor.shutdown(wait=False, cancel_futures=True)
 
     if remove_404_records:
         logging.info(
-            f"{len(posts)} valid post(s) after fetching titles and excluding 404s"
+            f"{count} valid post(s) after fetching titles and excluding 404s"
         )
     else:
-        logging.info(f"{len(posts)} post(s) fetched")
-
-    return posts
+        logging.info(f"{count} post(s) fetched")
 
 
-def crawl_sitemaps(
-    sitemap_urls, crawled=None
+def fetch_post_titles(
+    urls, remove_404_records=False, sink=None, max_in_flight=DEFAULT_MAX_IN_FLIGHT
 ):
-    crawled = crawled or set()
-    retval = set()
+    """Fetch titles for all URLs in parallel.
+
+    Args:
+        urls: Dictionary of URLs with their UrlRecords
+        remove_404_records: If True, exclude URLs that return 404
+        sink: Optional callable; each post is passed to it as it completes
+            instead of being collected
+        max_in_flight: Maximum number of submitted, unfinished fetches
+
+    Returns:
+        List of post dictionaries, or the number of posts passed to sink
+    """
+    posts = iter_post_titles(urls, remove_404_records, max_in_flight=max_in_flight)
+    if sink is None:
+        return list(posts)
+    return drain_to_sink(posts, sink)
+
+
+def drain_to_sink(posts, sink):
+    """Pass each post to sink as it arrives and return how many there were."""
+    count = 0
+    for post in posts:
+        sink(post)
+        count += 1
+    return count
+
+
+def crawl_sitemaps(sitemap_urls, crawled=None, url_sets=None):
+    """Crawl sitemap indexes depth first.
+
+    Returns:
+        Dictionary mapping each URL-set sitemap to its UrlRecords, so the URL
+        sets do not need to be fetched a second time
+    """
+    crawled = set() if crawled is None else crawled
+    url_sets = {} if url_sets is None else url_sets
     for sitemap in sitemap_urls:
         if sitemap in crawled:
             continue
         crawled.add(sitemap)
         posts_or_sitemaps, is_sitemap_index = get_sitemap_urls(sitemap)
         if is_sitemap_index:
-            retval.update(
-                crawl_sitemaps(
-                    posts_or_sitemaps,
-                    crawled=crawled,
-                )
-            )
+            crawl_sitemaps(posts_or_sitemaps, crawled, url_sets)
         else:
-            retval.add(sitemap)
-    return retval
+            url_sets[sitemap] = posts_or_sitemaps
+    return url_sets
 
 
-def sitemap2posts(
-    blog_url,
+def resolve_sitemap_sources(
     sitemap_urls=None,
     sitemap_allow_list=None,
     use_robots_txt=None,
-    lastmod_min=None,
-    path_ignore_list=None,
-    path_allow_list=None,
-    ignore_sitemaps=None,
-    remove_404_records=False,
     robots_allow_list=None,
     robots_sitemap_allow_list=None,
 ):
-    """Main function to crawl sitemaps and extract post information."""
+    """Work out which sitemap sources to crawl.
+
+    Returns:
+        Tuple of (sitemap_urls, sitemap_allow_list, use_robots_txt), or None
+        if robots.txt is disabled and no sitemap URLs were given
+    """
     if sitemap_allow_list is None:
         sitemap_allow_list = (
             robots_allow_list
@@ -417,19 +2225,21 @@ def sitemap2posts(
         logging.error(
             "At least one --sitemap_urls value is required when --no-use-robots-txt is set."
         )
-        return []
+        return None
 
     if use_robots_txt:
         if sitemap_urls:
             logging.info("Combining explicit sitemap URLs with robots.txt sitemaps")
         else:
             logging.info("Using sitemaps from robots.txt")
-        robots_sitemaps = get_sitemaps_from_robots(blog_url, sitemap_allow_list)
-        sitemap_urls.extend(robots_sitemaps)
+    return sitemap_urls, sitemap_allow_list, use_robots_txt
 
-    all_sitemaps = list(
-        crawl_sitemaps(sitemap_urls)
-    )
+
+def select_sitemaps(all_sitemaps, ignore_sitemaps, sitemap_allow_list, use_robots_txt):
+    """Apply sitemap ignore/allow lists to crawled sitemaps.
+
+    Raises FetchSitemapError if no sitemaps remain.
+    """
     logging.info(f"Total sitemaps found after crawling: {len(all_sitemaps)}")
     filtered_sitemaps = []
     for sitemap in all_sitemaps:
@@ -447,25 +2257,763 @@ def sitemap2posts(
             exc_msg = "No sitemaps are defined in this website's robots.txt file, so it cannot be crawled."
         logging.error(exc_msg)
         raise FetchSitemapError(exc_msg)
+    return filtered_sitemaps
+
+
+def is_newer_lastmod(lastmod, known_lastmod):
+    """True if a sitemap lastmod shows the page changed since known_lastmod."""
+    return bool(lastmod and known_lastmod and lastmod > known_lastmod)
 
-    # Collect URLs from all sitemaps
-    all_urls = collect_urls_from_sitemaps(filtered_sitemaps)
 
+def filter_post_urls(
+    all_urls,
+    lastmod_min=None,
+    path_ignore_list=None,
+    path_allow_list=None,
+    url_date_patterns=None,
+    exclude_urls=None,
+    canonical_rules=URL_CANONICAL_RULES,
+):
+    """Deduplicate collected URLs and apply the lastmod, URL date and path filters.
+
+    URLs in exclude_urls (e.g. already processed by an interrupted run) are
+    dropped. When exclude_urls is a {url: lastmod} dict, a URL is kept if
+    its sitemap lastmod is newer than the one recorded for it.
+    """
     # Deduplicate URLs
-    deduped_urls = dedupe_urls(all_urls)
+    deduped_urls = dedupe_urls(all_urls, canonical_rules)
+    if exclude_urls:
+        known_lastmods = exclude_urls if isinstance(exclude_urls, dict) else {}
+        deduped_urls = {
+            url: record
+            for url, record in deduped_urls.items()
+            if url not in exclude_urls
+            or is_newer_lastmod(record.lastmod, known_lastmods.get(url))
+        }
+        logging.info(f"{len(deduped_urls)} URL(s) remain after skipping already processed URLs")
 
     # Apply filters
-    filtered_urls = filter_urls_by_lastmod(deduped_urls, lastmod_min)
+    filtered_urls = filter_urls_by_lastmod(deduped_urls, lastmod_min, url_date_patterns)
     filtered_urls = filter_urls_by_paths(
         filtered_urls, path_ignore_list, path_allow_list
     )
 
     if not filtered_urls:
         logging.warning("No URLs to process after applying filters.")
-        return []
-    
+    return filtered_urls
+
+
+def collect_post_urls(
+    blog_url,
+    sitemap_urls=None,
+    sitemap_allow_list=None,
+    use_robots_txt=None,
+    lastmod_min=None,
+    path_ignore_list=None,
+    path_allow_list=None,
+    ignore_sitemaps=None,
+    robots_allow_list=None,
+    robots_sitemap_allow_list=None,
+    url_date_patterns=None,
+    exclude_urls=None,
+    canonical_rules=URL_CANONICAL_RULES,
+):
+    """Crawl sitemaps and return the filtered post URLs with their metadata."""
+    sources = resolve_sitemap_sources(
+        sitemap_urls,
+        sitemap_allow_list,
+        use_robots_txt,
+        robots_allow_list,
+        robots_sitemap_allow_list,
+    )
+    if sources is None:
+        return {}
+    sitemap_urls, sitemap_allow_list, use_robots_txt = sources
+
+    if use_robots_txt:
+        with metrics.stage("robots"):
+            robots_sitemaps = get_sitemaps_from_robots(blog_url, sitemap_allow_list)
+        sitemap_urls.extend(robots_sitemaps)
+
+    with metrics.stage("sitemaps"):
+        url_sets = crawl_sitemaps(sitemap_urls)
+        filtered_sitemaps = select_sitemaps(
+            list(url_sets), ignore_sitemaps, sitemap_allow_list, use_robots_txt
+        )
+
+    all_urls = [record for sitemap in filtered_sitemaps for record in url_sets[sitemap]]
+
+    with metrics.stage("filter"):
+        return filter_post_urls(
+            all_urls,
+            lastmod_min,
+            path_ignore_list,
+            path_allow_list,
+            url_date_patterns,
+            exclude_urls,
+            canonical_rules,
+        )
+
+
+def iter_posts(
+    blog_url,
+    sitemap_urls=None,
+    sitemap_allow_list=None,
+    use_robots_txt=None,
+    lastmod_min=None,
+    path_ignore_list=None,
+    path_allow_list=None,
+    ignore_sitemaps=None,
+    remove_404_records=False,
+    robots_allow_list=None,
+    robots_sitemap_allow_list=None,
+    cancel_event=None,
+    newest_first=False,
+    stop_after_older=None,
+    post_date=None,
+    url_date_patterns=None,
+    exclude_urls=None,
+    canonical_rules=URL_CANONICAL_RULES,
+    max_in_flight=DEFAULT_MAX_IN_FLIGHT,
+    archive=None,
+    fetch_limits=None,
+):
+    """Crawl sitemaps and yield post information as each article is extracted.
+
+    Takes the same arguments as sitemap2posts(). Posts are yielded in
+    completion order, so callers can persist them progressively or stop
+    early: closing the generator (or breaking out of the loop) cancels the
+    remaining fetches, as does setting cancel_event from another thread.
+
+    With newest_first, URLs are fetched newest first by sitemap lastmod or a
+    date in the URL. stop_after_older=N implies it and, given lastmod_min,
+    stops once N consecutive posts are dated before lastmod_min. post_date
+    picks a post's date (default: default_post_date).
+
+    url_date_patterns enables the URL date prefilter: URLs whose path dates
+    them before lastmod_min are dropped before fetching. Pass
+    URL_DATE_PATTERNS for the built-in patterns, or compiled regexes with
+    year/month/day named groups. They also serve as ordering hints.
+
+    URLs in exclude_urls are never fetched; given a {url: lastmod} dict, they
+    are fetched again once their sitemap lastmod is newer.
+
+    canonical_rules are the canonicalize_url() rules used to deduplicate
+    sitemap URLs and to skip fetched posts whose <link rel="canonical"> names
+    a page already yielded. Pass () to compare URLs exactly.
+
+    At most max_in_flight article fetches are queued or running at a time.
+
+    With archive (a PageArchive), every extracted page is also stored raw,
+    for later re-extraction with iter_archived_posts().
+
+    fetch_limits (a FetchLimits) caps the time and body size of each article
+    fetch and skips hosts that keep timing out; posts it gives up on are
+    logged as errors and left out. Slow URLs are reported in metrics either
+    way.
+
+    Example:
+        for post in itertools.islice(iter_posts(url, use_robots_txt=True), 10):
+            ...
+    """
+    filtered_urls = collect_post_urls(
+        blog_url,
+        sitemap_urls=sitemap_urls,
+        sitemap_allow_list=sitemap_allow_list,
+        use_robots_txt=use_robots_txt,
+        lastmod_min=lastmod_min,
+        path_ignore_list=path_ignore_list,
+        path_allow_list=path_allow_list,
+        ignore_sitemaps=ignore_sitemaps,
+        robots_allow_list=robots_allow_list,
+        robots_sitemap_allow_list=robots_sitemap_allow_list,
+        url_date_patterns=url_date_patterns,
+        exclude_urls=exclude_urls,
+        canonical_rules=canonical_rules,
+    )
+    if not filtered_urls:
+        return
+
+    older_run = None
+    if stop_after_older and lastmod_min:
+        older_run = OlderPostRun(
+            lastmod_min, stop_after_older, post_date, url_date_patterns
+        )
+    if newest_first or older_run:
+        filtered_urls = order_urls_newest_first(filtered_urls, url_date_patterns)
+
     # Fetch post titles (404 check is done during fetch if remove_404_records is True)
-    posts = fetch_post_titles(filtered_urls, remove_404_records)
+    posts = iter_post_titles(
+        filtered_urls,
+        remove_404_records,
+        cancel_event,
+        max_in_flight,
+        archive,
+        fetch_limits,
+    )
+    duplicates = CanonicalDuplicates(canonical_rules)
+    try:
+        # The fetch stage also counts time the caller spends between posts
+        with contextlib.closing(posts), metrics.stage("fetch"):
+            for post in posts:
+                if duplicates.is_duplicate(post):
+                    continue
+                yield post
+                if older_run is not None and older_run.update(post):
+                    logging.info(
+                        f"Stopping after {older_run.run} consecutive post(s) older than {lastmod_min.date()}"
+                    )
+                    return
+    finally:
+        if duplicates.collapsed:
+            logging.info(f"Skipped {duplicates.collapsed} post(s) sharing a canonical URL")
+
+
+def sitemap2posts(
+    blog_url,
+    sitemap_urls=None,
+    sitemap_allow_list=None,
+    use_robots_txt=None,
+    lastmod_min=None,
+    path_ignore_list=None,
+    path_allow_list=None,
+    ignore_sitemaps=None,
+    remove_404_records=False,
+    robots_allow_list=None,
+    robots_sitemap_allow_list=None,
+    newest_first=False,
+    stop_after_older=None,
+    post_date=None,
+    url_date_patterns=None,
+    exclude_urls=None,
+    canonical_rules=URL_CANONICAL_RULES,
+    max_in_flight=DEFAULT_MAX_IN_FLIGHT,
+    archive=None,
+    fetch_limits=None,
+    sink=None,
+):
+    """Main function to crawl sitemaps and extract post information.
+
+    With sink, each post is passed to sink(post) as it is extracted instead
+    of being collected, and the number of posts is returned.
+    """
+    posts = iter_posts(
+        blog_url,
+        sitemap_urls=sitemap_urls,
+        sitemap_allow_list=sitemap_allow_list,
+        use_robots_txt=use_robots_txt,
+        lastmod_min=lastmod_min,
+        path_ignore_list=path_ignore_list,
+        path_allow_list=path_allow_list,
+        ignore_sitemaps=ignore_sitemaps,
+        remove_404_records=remove_404_records,
+        robots_allow_list=robots_allow_list,
+        robots_sitemap_allow_list=robots_sitemap_allow_list,
+        newest_first=newest_first,
+        stop_after_older=stop_after_older,
+        post_date=post_date,
+        url_date_patterns=url_date_patterns,
+        exclude_urls=exclude_urls,
+        canonical_rules=canonical_rules,
+        max_in_flight=max_in_flight,
+        archive=archive,
+        fetch_limits=fetch_limits,
+    )
+    posts = list(posts) if sink is None else drain_to_sink(posts, sink)
+
+    if not posts:
+        logging.warning("No posts to save after fetching titles.")
+    return posts
+
+
+class FetchedResponse:
+    """Minimal stand-in for requests.Response, used for bodies fetched with aiohttp."""
+
+    def __init__(self, url, status_code, reason, headers, content, encoding=None):
+        self.url = url
+        self.status_code = status_code
+        self.reason = reason
+        self.headers = headers
+        self.content = content
+        self.encoding = encoding
+
+    @property
+    def ok(self):
+        return self.status_code < 400
+
+    @property
+    def text(self):
+        return self.content.decode(self.encoding or "utf-8", errors="replace")
+
+    def __bool__(self):
+        return self.ok
+
+
+def import_aiohttp():
+    """Import aiohttp, which is optional and only needed for the async API.
+
+    It takes about half of the import time of this module, so it is only
+    imported once an async session is created or used.
+    """
+    try:
+        import aiohttp
+    except ImportError:
+        raise ImportError("The async API requires aiohttp: pip install aiohttp") from None
+    return aiohttp
+
+
+def create_async_session(pool_size=DEFAULT_POOL_SIZE):
+    """Create an aiohttp session for the async API.
+
+    Pass the same session to several async_iter_posts() calls to crawl many
+    feeds over one connection pool. The caller is responsible for closing it.
+    """
+    aiohttp = import_aiohttp()
+    return aiohttp.ClientSession(
+        # aiohttp keeps its own DNS cache; use the same TTL as dns_cache
+        connector=aiohttp.TCPConnector(
+            limit=pool_size, use_dns_cache=dns_cache.ttl > 0, ttl_dns_cache=dns_cache.ttl
+        ),
+        headers={"User-Agent": USER_AGENT},
+    )
+
+
+async def async_fetch_url(
+    session, url, timeout=DEFAULT_TIMEOUT, headers=None, kind="page", limits=None, sink=None
+):
+    """Fetch URL with an aiohttp session, with error handling, recording it in metrics.
+
+    With limits (FetchLimits), the total timeout is capped by the time budget
+    and bodies over the size limit are abandoned with FetchLimitExceeded.
+    With sink, the body of a successful response is passed to
+    await sink(chunk) as it downloads instead of being kept.
+    """
+    aiohttp = import_aiohttp()
+    start = time.perf_counter()
+    if limits is not None:
+        timeout = limits.timeout(timeout)
+    try:
+        async with session.get(
+            url, timeout=aiohttp.ClientTimeout(total=timeout), headers=headers
+        ) as response:
+            if limits is None and sink is None:
+                content = await response.read()
+                received = len(content)
+            else:
+                content, received = await read_streamed(
+                    url, response, limits, sink if response.ok else None
+                )
+            try:
+                encoding = response.get_encoding()
+            except RuntimeError:
+                encoding = None
+            metrics.record_request(kind, response.status, time.perf_counter() - start, received)
+            return FetchedResponse(
+                url, response.status, response.reason, response.headers, content, encoding
+            )
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+        metrics.record_request(kind, "error", time.perf_counter() - start)
+        raise RuntimeError(f"Error fetching {url}") from e
+    except Exception:
+        metrics.record_request(kind, "error", time.perf_counter() - start)
+        raise
+
+
+async def read_streamed(url, response, limits=None, sink=None):
+    """Read an aiohttp response body in chunks, enforcing limits or passing it to sink.
+
+    Returns (body, bytes received); the body is empty with sink.
+    """
+    if limits is not None:
+        limits.check_size(url, response.content_length or 0)
+    chunks = []
+    size = 0
+    async for chunk in response.content.iter_chunked(FETCH_CHUNK_SIZE):
+        size += len(chunk)
+        if limits is not None:
+            limits.check_size(url, size)
+        if sink is not None:
+            await sink(chunk)
+        else:
+            chunks.append(chunk)
+    return b"".join(chunks), size
+
+
+async def async_get_sitemaps_from_robots(session, url):
+    """Extract sitemap URLs from robots.txt (async)."""
+    logging.info(f"Fetching robots.txt from {url}")
+    robots_url = urljoin(url, "/robots.txt")
+    response = await async_fetch_url(session, robots_url, kind="robots")
+
+    if not response.ok:
+        logging.error(
+            f"Failed to fetch robots.txt from {robots_url}: {response.status_code} {response.reason}"
+        )
+        return []
+
+    logging.info("Successfully fetched robots.txt")
+    return parse_robots_sitemaps(response.text)
+
+
+_sitemap_executor = None
+_sitemap_executor_lock = threading.Lock()
+
+
+def get_sitemap_executor():
+    """Return the worker thread that parses sitemaps for the async API.
+
+    An lxml parser must only be used by the thread that created it, so every
+    async sitemap is parsed in this one thread, shared by all event loops.
+    """
+    global _sitemap_executor
+    with _sitemap_executor_lock:
+        if _sitemap_executor is None:
+            _sitemap_executor = ThreadPoolExecutor(
+                max_workers=1, thread_name_prefix="sitemap-parser"
+            )
+    return _sitemap_executor
+
+
+async def async_get_sitemap_urls(session, sitemap_url):
+    """Fetch a sitemap URL, parsing it as it downloads (async).
+
+    Parsing runs in the thread of get_sitemap_executor().
+    """
+    logging.info(f"Fetching sitemap from {sitemap_url}")
+    loop = asyncio.get_running_loop()
+    executor = get_sitemap_executor()
+    parser = await loop.run_in_executor(executor, SitemapParser, sitemap_url)
+    feed = profiler.wrap("sitemaps", parser.feed)
+
+    async def parse_chunk(chunk):
+        await loop.run_in_executor(executor, feed, chunk)
+
+    response = await async_fetch_url(
+        session,
+        sitemap_url,
+        headers=sitemap_cache.conditional_headers(sitemap_url),
+        kind="sitemap",
+        sink=parse_chunk,
+    )
+    cached = sitemap_cache.lookup(sitemap_url, response)
+    if cached is None and response.ok:
+        result = await loop.run_in_executor(executor, profiler.wrap("sitemaps", parser.close))
+
+    if cached is not None:
+        logging.info(f"{sitemap_url} not modified, using cached copy")
+        metrics.count("sitemap_cache_hits")
+        return cached
+
+    if not response.ok:
+        raise FetchSitemapError(
+            f"Failed to fetch sitemap from {sitemap_url}: {response.status_code} {response.reason}"
+        )
+
+    sitemap_cache.store(sitemap_url, response, result, size=len(result[0]))
+    return result
+
+
+async def async_crawl_sitemaps(session, sitemap_urls, max_concurrency=DEFAULT_FETCH_WORKERS):
+    """Crawl sitemap indexes level by level, fetching each level concurrently.
+
+    At most max_concurrency sitemaps are fetched at once.
+
+    Returns:
+        Dictionary mapping each URL-set sitemap to its (url, lastmod) entries,
+        so the URL sets do not need to be fetched a second time
+    """
+    crawled = set()
+    url_sets = {}
+    frontier = list(dict.fromkeys(sitemap_urls))
+    slots = asyncio.Semaphore(max_concurrency)
+
+    async def fetch(sitemap):
+        async with slots:
+            return await async_get_sitemap_urls(session, sitemap)
+
+    while frontier:
+        crawled.update(frontier)
+        results = await asyncio.gather(*(fetch(sitemap) for sitemap in frontier))
+        next_frontier = []
+        for sitemap, (posts_or_sitemaps, is_sitemap_index) in zip(frontier, results):
+            if is_sitemap_index:
+                next_frontier.extend(
+                    child for child in posts_or_sitemaps if child not in crawled
+                )
+            else:
+                url_sets[sitemap] = posts_or_sitemaps
+        frontier = list(dict.fromkeys(next_frontier))
+    return url_sets
+
+
+async def async_collect_post_urls(
+    session,
+    blog_url,
+    sitemap_urls=None,
+    sitemap_allow_list=None,
+    use_robots_txt=None,
+    lastmod_min=None,
+    path_ignore_list=None,
+    path_allow_list=None,
+    ignore_sitemaps=None,
+    robots_allow_list=None,
+    robots_sitemap_allow_list=None,
+    url_date_patterns=None,
+    exclude_urls=None,
+    canonical_rules=URL_CANONICAL_RULES,
+    max_concurrency=DEFAULT_FETCH_WORKERS,
+):
+    """Crawl sitemaps and return the filtered post URLs with their metadata (async).
+
+    At most max_concurrency sitemaps are fetched at once.
+    """
+    sources = resolve_sitemap_sources(
+        sitemap_urls,
+        sitemap_allow_list,
+        use_robots_txt,
+        robots_allow_list,
+        robots_sitemap_allow_list,
+    )
+    if sources is None:
+        return {}
+    sitemap_urls, sitemap_allow_list, use_robots_txt = sources
+
+    if use_robots_txt:
+        with metrics.stage("robots"):
+            sitemap_urls.extend(await async_get_sitemaps_from_robots(session, blog_url))
+
+    with metrics.stage("sitemaps"):
+        url_sets = await async_crawl_sitemaps(session, sitemap_urls, max_concurrency)
+        filtered_sitemaps = select_sitemaps(
+            list(url_sets), ignore_sitemaps, sitemap_allow_list, use_robots_txt
+        )
+
+    all_urls = [record for sitemap in filtered_sitemaps for record in url_sets[sitemap]]
+    with metrics.stage("filter"):
+        return filter_post_urls(
+            all_urls,
+            lastmod_min,
+            path_ignore_list,
+            path_allow_list,
+            url_date_patterns,
+            exclude_urls,
+            canonical_rules,
+        )
+
+
+async def async_get_post_title(
+    session, url, check_404=False, archive=None, record=None, limits=None
+):
+    """Fetch the title of a post from its URL (async).
+
+    The fetch runs on the event loop; archiving and extraction run in a
+    worker thread.
+
+    Returns:
+        Tuple of (data, is_valid) where is_valid indicates if URL is not 404
+    """
+    logging.debug(f"Fetching post title from {url}")
+    host = record.host if record is not None else urlsplit(url).netloc
+    with track_post_fetch(url, host, limits) as fetch:
+        response = await async_fetch_url(session, url, kind="article", limits=limits)
+        fetch["status"] = response.status_code
+        fetch["size"] = len(response.content)
+
+        if not check_post_response(url, response, check_404):
+            return None, False
+
+        if archive is not None:
+            await asyncio.to_thread(archive.write, url, response, record)
+        start = time.perf_counter()
+        data = await asyncio.to_thread(
+            profiler.wrap("fetch", extract_post_data), url, response.text, response.headers
+        )
+        fetch["extract_seconds"] = time.perf_counter() - start
+        return data, True
+
+
+async def async_iter_post_titles(
+    session,
+    urls,
+    remove_404_records=False,
+    cancel_event=None,
+    max_concurrency=10,
+    archive=None,
+    fetch_limits=None,
+):
+    """Fetch titles for all URLs concurrently, yielding each post as it completes.
+
+    At most max_concurrency fetches are in flight for this call; the
+    session's connector limit caps them across concurrent calls.
+
+    Args:
+        session: aiohttp session from create_async_session()
+        urls: Dictionary of URLs with their UrlRecords
+        remove_404_records: If True, exclude URLs that return 404
+        cancel_event: Optional asyncio.Event; once set, no further fetches start
+        max_concurrency: Maximum number of in-flight fetches
+        archive: Optional PageArchive that extracted pages are written to
+        fetch_limits: Optional FetchLimits applied to every fetch
+
+    Yields:
+        Post dictionaries, in completion order
+    """
+    count = 0
+    url_iter = iter(urls)
+    task_to_url = {}
+
+    def fill():
+        while len(task_to_url) < max_concurrency:
+            url = next(url_iter, None)
+            if url is None:
+                return
+            task = asyncio.ensure_future(
+                async_get_post_title(
+                    session, url, remove_404_records, archive, urls[url], fetch_limits
+                )
+            )
+            task_to_url[task] = url
+
+    if remove_404_records:
+        logging.info("Fetching post titles (excluding 404 responses)...")
+    else:
+        logging.info("Fetching post titles...")
+
+    fill()
+    try:
+        while task_to_url:
+            done, _ = await asyncio.wait(
+                task_to_url, return_when=asyncio.FIRST_COMPLETED
+            )
+            for task in done:
+                url = task_to_url.pop(task)
+                try:
+                    html_data, is_valid = task.result()
+                except Exception as e:
+                    logging.error(f"Error fetching title for URL {url}: {e}")
+                    continue
+
+                if html_data is None or (remove_404_records and not is_valid):
+                    continue
+
+                count += 1
+                yield {
+                    "url": url,
+                    "lastmod": urls[url].lastmod,
+                    "sitemap": urls[url].sitemap,
+                    **html_data,
+                }
+
+            if cancel_event is not None and cancel_event.is_set():
+                logging.info(f"Fetching cancelled after {count} post(s)")
+                return
+            fill()
+    finally:
+        for task in task_to_url:
+            task.cancel()
+
+    logging.info(f"{count} post(s) fetched")
+
+
+async def async_iter_posts(
+    blog_url,
+    sitemap_urls=None,
+    sitemap_allow_list=None,
+    use_robots_txt=None,
+    lastmod_min=None,
+    path_ignore_list=None,
+    path_allow_list=None,
+    ignore_sitemaps=None,
+    remove_404_records=False,
+    robots_allow_list=None,
+    robots_sitemap_allow_list=None,
+    cancel_event=None,
+    session=None,
+    max_concurrency=10,
+    newest_first=False,
+    stop_after_older=None,
+    post_date=None,
+    url_date_patterns=None,
+    exclude_urls=None,
+    canonical_rules=URL_CANONICAL_RULES,
+    archive=None,
+    fetch_limits=None,
+):
+    """Async variant of iter_posts().
+
+    Takes the same arguments, plus an optional shared aiohttp session (one is
+    created and closed per call if omitted) and a per-call concurrency limit.
+
+    Example:
+        async with create_async_session() as session:
+            async for post in async_iter_posts(url, use_robots_txt=True, session=session):
+                ...
+    """
+    own_session = session is None
+    if own_session:
+        session = create_async_session()
+    try:
+        filtered_urls = await async_collect_post_urls(
+            session,
+            blog_url,
+            sitemap_urls=sitemap_urls,
+            sitemap_allow_list=sitemap_allow_list,
+            use_robots_txt=use_robots_txt,
+            lastmod_min=lastmod_min,
+            path_ignore_list=path_ignore_list,
+            path_allow_list=path_allow_list,
+            ignore_sitemaps=ignore_sitemaps,
+            robots_allow_list=robots_allow_list,
+            robots_sitemap_allow_list=robots_sitemap_allow_list,
+            url_date_patterns=url_date_patterns,
+            exclude_urls=exclude_urls,
+            canonical_rules=canonical_rules,
+            max_concurrency=max_concurrency,
+        )
+        if not filtered_urls:
+            return
+
+        older_run = None
+        if stop_after_older and lastmod_min:
+            older_run = OlderPostRun(
+                lastmod_min, stop_after_older, post_date, url_date_patterns
+            )
+        if newest_first or older_run:
+            filtered_urls = order_urls_newest_first(filtered_urls, url_date_patterns)
+
+        posts = async_iter_post_titles(
+            session,
+            filtered_urls,
+            remove_404_records,
+            cancel_event,
+            max_concurrency,
+            archive,
+            fetch_limits,
+        )
+        duplicates = CanonicalDuplicates(canonical_rules)
+        try:
+            with metrics.stage("fetch"):
+                async for post in posts:
+                    if duplicates.is_duplicate(post):
+                        continue
+                    yield post
+                    if older_run is not None and older_run.update(post):
+                        logging.info(
+                            f"Stopping after {older_run.run} consecutive post(s) older than {lastmod_min.date()}"
+                        )
+                        return
+        finally:
+            await posts.aclose()
+            if duplicates.collapsed:
+                logging.info(f"Skipped {duplicates.collapsed} post(s) sharing a canonical URL")
+    finally:
+        if own_session:
+            await session.close()
+
+
+async def async_sitemap2posts(blog_url, **kwargs):
+    """Async variant of sitemap2posts(); accepts the arguments of async_iter_posts()."""
+    posts = [post async for post in async_iter_posts(blog_url, **kwargs)]
 
     if not posts:
         logging.warning("No posts to save after fetching titles.")
@@ -486,7 +3034,8 @@ def parse_cli_arguments():
     parser.add_argument(
         "blog_url",
         type=str,
-        help="Blog URL to extract posts from",
+        nargs="?",
+        help="Blog URL to extract posts from (not needed with --from_archive)",
     )
     parser.add_argument(
         "--output",
@@ -494,6 +3043,22 @@ def parse_cli_arguments():
         default="sitemap_posts.json",
         help="Output JSON file name (default: sitemap_posts.json)",
     )
+    parser.add_argument(
+        "--format",
+        choices=["json", "ndjson"],
+        default="json",
+        help="Output format: a sorted JSON array written at the end (default), or one JSON object per line written as each post is extracted",
+    )
+    parser.add_argument(
+        "--merge",
+        action="store_true",
+        help="Merge into an existing --output file: only fetch URLs missing from it or whose sitemap lastmod is newer, keep the other entries and rewrite the file atomically",
+    )
+    parser.add_argument(
+        "--sort",
+        action="store_true",
+        help="With --format ndjson, sort the file by sitemap and lastmod once the crawl completes",
+    )
     parser.add_argument(
         "--sitemap_urls",
         "--sitemap-urls",
@@ -508,7 +3073,7 @@ def parse_cli_arguments():
         nargs="+",
         help="Allow-list patterns for sitemap URLs discovered in robots.txt and sitemap indexes (supports glob patterns). Example: 'https://example.com/*-sitemap.xml'",
     )
-    use_robots_group = parser.add_mutually_exclusive_group(required=True)
+    use_robots_group = parser.add_mutually_exclusive_group()
     use_robots_group.add_argument(
         "--use-robots-txt",
         "--use_robots_txt",
@@ -552,16 +3117,162 @@ def parse_cli_arguments():
         default=[],
         help="Comma-separated list of specific sitemap URLs to ignore",
     )
+    parser.add_argument(
+        "--url_date_filter",
+        "--url-date-filter",
+        action="store_true",
+        help="With --lastmod_min, skip URLs whose path holds a date (e.g. /2024/05/13/slug) before it, without fetching them",
+    )
+    parser.add_argument(
+        "--url_date_pattern",
+        "--url-date-pattern",
+        type=str,
+        nargs="+",
+        default=None,
+        metavar="REGEX",
+        help="Custom URL date regex(es) with named groups year and optional month/day, e.g. '/posts/(?P<year>\\d{4})(?P<month>\\d{2})/'. Implies --url_date_filter",
+    )
+    parser.add_argument(
+        "--newest_first",
+        "--newest-first",
+        action="store_true",
+        help="Fetch posts newest first, using sitemap lastmod or a date in the URL",
+    )
+    parser.add_argument(
+        "--stop_after_older",
+        "--stop-after-older",
+        type=int,
+        default=None,
+        metavar="N",
+        help="With --lastmod_min, fetch newest first and stop after N consecutive posts published before it. "
+        "URLs without a date in their path are ordered by lastmod, so old posts whose lastmod was "
+        "bumped can stop the crawl early",
+    )
+    parser.add_argument(
+        "--canonical_rules",
+        "--canonical-rules",
+        type=str,
+        nargs="*",
+        choices=URL_CANONICAL_RULES,
+        default=list(URL_CANONICAL_RULES),
+        metavar="RULE",
+        help=f"URL normalization rules used to deduplicate URLs and posts; give none to compare URLs exactly (choices: {', '.join(URL_CANONICAL_RULES)}; default: all)",
+    )
+    parser.add_argument(
+        "--max_in_flight",
+        "--max-in-flight",
+        type=int,
+        default=DEFAULT_MAX_IN_FLIGHT,
+        metavar="N",
+        help=f"Maximum number of article fetches queued or running at once (default: {DEFAULT_MAX_IN_FLIGHT})",
+    )
+    parser.add_argument(
+        "--url_time_budget",
+        "--url-time-budget",
+        type=float,
+        default=None,
+        metavar="SECONDS",
+        help=f"Give up on an article that takes longer than this to fetch, body included (default: none; each read times out after {DEFAULT_TIMEOUT}s)",
+    )
+    parser.add_argument(
+        "--max_body_size",
+        "--max-body-size",
+        type=int,
+        default=None,
+        metavar="BYTES",
+        help="Give up on articles whose body is larger than this (default: no limit)",
+    )
+    parser.add_argument(
+        "--host_timeout_limit",
+        "--host-timeout-limit",
+        type=int,
+        default=None,
+        metavar="N",
+        help="Skip the remaining URLs of a host after N consecutive timeouts (default: never)",
+    )
+    parser.add_argument(
+        "--dns_ttl",
+        "--dns-ttl",
+        type=float,
+        default=DEFAULT_DNS_TTL,
+        metavar="SECONDS",
+        help=f"Reuse resolved host addresses for new connections for this long; 0 resolves every time (default: {DEFAULT_DNS_TTL})",
+    )
     parser.add_argument(
         "--remove_404_records",
         "--remove-404-records",
         action="store_true",
         help="Exclude URLs that return a 404 status code.",
     )
+    parser.add_argument(
+        "--archive",
+        type=str,
+        metavar="DIR",
+        help="Also store every extracted page (headers and gzip-compressed body) in a WARC-style archive in DIR",
+    )
+    parser.add_argument(
+        "--from_archive",
+        "--from-archive",
+        type=str,
+        metavar="DIR",
+        help="Re-extract posts from the pages archived in DIR with --archive, without any network access. Sitemap options are ignored",
+    )
+    parser.add_argument(
+        "--metrics_file",
+        "--metrics-file",
+        type=str,
+        metavar="FILE",
+        help="Write request counts, bytes, latency percentiles, stage times and extraction CPU time to FILE: a Prometheus textfile if it ends in .prom, JSON otherwise",
+    )
+    parser.add_argument(
+        "--profile",
+        type=str,
+        metavar="DIR",
+        help="Profile each stage (robots, sitemaps, filter, fetch) with cProfile and tracemalloc, and write the profiles and a top-N summary to DIR",
+    )
+    parser.add_argument(
+        "--profile_top",
+        "--profile-top",
+        type=int,
+        default=DEFAULT_PROFILE_TOP,
+        metavar="N",
+        help=f"Functions and allocation sites listed per stage in the --profile summary (default: {DEFAULT_PROFILE_TOP})",
+    )
+    parser.set_defaults(use_robots_txt=None)
     args = parser.parse_args()
 
-    if not args.use_robots_txt and not args.sitemap_urls:
+    if args.from_archive:
+        if args.archive:
+            parser.error("--archive cannot be combined with --from_archive")
+    elif not args.blog_url:
+        parser.error("the following arguments are required: blog_url")
+    elif args.use_robots_txt is None:
+        parser.error("one of the arguments --use-robots-txt --no-use-robots-txt is required")
+    elif not args.use_robots_txt and not args.sitemap_urls:
         parser.error("--no-use-robots-txt requires at least one --sitemap_urls value")
+    if args.stop_after_older is not None and (
+        args.stop_after_older < 1 or not args.lastmod_min
+    ):
+        parser.error("--stop_after_older requires --lastmod_min and a positive count")
+    if args.sort and args.format != "ndjson":
+        parser.error("--sort requires --format ndjson (JSON output is always sorted)")
+    if args.max_in_flight < 1:
+        parser.error("--max_in_flight must be a positive count")
+    if args.profile_top < 1:
+        parser.error("--profile_top must be a positive count")
+    for name in ("url_time_budget", "max_body_size", "host_timeout_limit"):
+        if getattr(args, name) is not None and getattr(args, name) <= 0:
+            parser.error(f"--{name} must be positive")
+    if args.dns_ttl < 0:
+        parser.error("--dns_ttl must not be negative")
+    args.url_date_patterns = None
+    if args.url_date_pattern:
+        try:
+            args.url_date_patterns = compile_url_date_patterns(args.url_date_pattern)
+        except ValueError as e:
+            parser.error(str(e))
+    elif args.url_date_filter:
+        args.url_date_patterns = URL_DATE_PATTERNS
 
     return args
 
@@ -569,18 +3280,95 @@ def parse_cli_arguments():
 if __name__ == "__main__":
     args = parse_cli_arguments()
 
-    # Call the function with the URLs and other parameters from CLI input
-    posts = sitemap2posts(
-        args.blog_url,
-        sitemap_urls=args.sitemap_urls,
-        sitemap_allow_list=args.sitemap_allow_list,
-        use_robots_txt=args.use_robots_txt,
-        lastmod_min=args.lastmod_min,
-        path_ignore_list=args.path_ignore_list,
-        path_allow_list=args.path_allow_list,
-        ignore_sitemaps=args.ignore_sitemaps,
-        remove_404_records=args.remove_404_records,
-    )
+    def get_posts(sink=None, exclude_urls=None):
+        """Crawl (or re-extract from --from_archive) with the CLI options."""
+        if args.from_archive:
+            posts = iter_archived_posts(
+                args.from_archive,
+                lastmod_min=args.lastmod_min,
+                path_ignore_list=args.path_ignore_list,
+                path_allow_list=args.path_allow_list,
+                url_date_patterns=args.url_date_patterns,
+                exclude_urls=exclude_urls,
+                canonical_rules=tuple(args.canonical_rules),
+            )
+            return list(posts) if sink is None else drain_to_sink(posts, sink)
+
+        fetch_limits = None
+        if args.url_time_budget or args.max_body_size or args.host_timeout_limit:
+            fetch_limits = FetchLimits(
+                url_time_budget=args.url_time_budget,
+                max_body_bytes=args.max_body_size,
+                host_timeout_limit=args.host_timeout_limit,
+            )
+        with PageArchive(args.archive) if args.archive else contextlib.nullcontext() as archive:
+            return sitemap2posts(
+                args.blog_url,
+                sitemap_urls=args.sitemap_urls,
+                sitemap_allow_list=args.sitemap_allow_list,
+                use_robots_txt=args.use_robots_txt,
+                lastmod_min=args.lastmod_min,
+                path_ignore_list=args.path_ignore_list,
+                path_allow_list=args.path_allow_list,
+                ignore_sitemaps=args.ignore_sitemaps,
+                remove_404_records=args.remove_404_records,
+                newest_first=args.newest_first,
+                stop_after_older=args.stop_after_older,
+                url_date_patterns=args.url_date_patterns,
+                exclude_urls=exclude_urls,
+                canonical_rules=tuple(args.canonical_rules),
+                max_in_flight=args.max_in_flight,
+                archive=archive,
+                fetch_limits=fetch_limits,
+                sink=sink,
+            )
+
+    if args.profile:
+        profiler.enable(args.profile_top)
+    set_dns_ttl(args.dns_ttl)
 
-    save_to_json(posts, args.output)
+    try:
+        # Call the function with the URLs and other parameters from CLI input
+        if args.merge:
+            existing_posts = load_posts(args.output)
+            posts = merge_posts(
+                existing_posts,
+                get_posts(
+                    exclude_urls={
+                        post["url"]: post.get("lastmod") for post in existing_posts
+                    }
+                ),
+            )
+            if args.format == "ndjson":
+                save_to_ndjson(posts, args.output)
+            else:
+                save_to_json(posts, args.output)
+        elif args.format == "ndjson":
+            with NdjsonWriter(args.output) as writer:
+                get_posts(sink=writer)
+            if args.sort:
+                sort_ndjson(args.output)
+        else:
+            save_to_json(get_posts(), args.output)
+    finally:
+        if args.profile:
+            profiler.write(args.profile)
+    if args.metrics_file:
+        metrics.write(args.metrics_file)
+    slowest_urls = metrics.snapshot()["slowest_urls"]
+    if slowest_urls:
+        logging.info("Slowest URLs:")
+        for entry in slowest_urls:
+            line = f"  {entry['seconds']:.2f}s {entry['status']} {entry['bytes']} bytes"
+            if entry["extract_seconds"] is not None:
+                line += f", extracted in {entry['extract_seconds']:.2f}s"
+            logging.info(f"{line}: {entry['url']}")
+    counters = metrics.snapshot()["counters"]
+    if counters.get("dns_cache_misses") or counters.get("tls_full_handshakes"):
+        logging.info(
+            f"New connections: {counters.get('dns_cache_hits', 0)} DNS cache hits, "
+            f"{counters.get('dns_cache_misses', 0)} lookups; "
+            f"{counters.get('tls_sessions_resumed', 0)} TLS sessions resumed, "
+            f"{counters.get('tls_full_handshakes', 0)} full handshakes"
+        )
     logging.info("Sitemap crawling completed successfully")